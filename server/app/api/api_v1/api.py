@@ -1,10 +1,14 @@
 from fastapi import APIRouter
-from app.api.api_v1.routes import assets, predict, seed, train
+from app.api.api_v1.routes import assets, ingest, models, predict, profiles, seed, train, uploads
 
 api_router = APIRouter(prefix="/v1")
 
 api_router.include_router(assets.router)
+api_router.include_router(ingest.router)
+api_router.include_router(models.router)
 api_router.include_router(predict.router)
+api_router.include_router(profiles.router)
 api_router.include_router(seed.router)
 api_router.include_router(train.router)
+api_router.include_router(uploads.router)
 
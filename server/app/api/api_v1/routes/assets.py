@@ -1,17 +1,24 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Callable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db
 from app.crud.assets import (
     get_assets_with_latest_prediction,
     get_latest_prediction_for_asset,
     get_prediction_history_for_asset,
     get_recent_training_samples_for_asset,
 )
+from app.core.services.history_service import HistoryMode, get_asset_history
+from app.core.services.response_cache import FLEET_KEY, asset_key, etag_matches, get_response_cache
 from app.schemas.asset import (
     AssetDetailResponse,
+    AssetHistoryResponse,
     AssetStatus,
     AssetsResponse,
     HistoryPoint,
@@ -22,9 +29,34 @@ from app.schemas.asset import (
 router = APIRouter(tags=["assets"])
 
 
+def _cached_response(request: Request, key: str, build: Callable[[], BaseModel]) -> Response:
+    # Served from the response cache until a write touches `key`; 304 when the client's ETag matches.
+    cache = get_response_cache()
+    entry = cache.get_or_build(key, lambda: build().model_dump_json().encode("utf-8"))
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 @router.get("/assets", response_model=AssetsResponse)
-def list_assets(db: Session = Depends(get_db)) -> AssetsResponse:
-    """Return unique assets joined with their latest prediction (if any)."""
+def list_assets(request: Request, db: Session = Depends(get_read_db)) -> Response:
+    """
+    Return unique assets joined with their latest prediction (if any).
+
+    Cached until the next prediction/training write; send `If-None-Match` to get a 304 when unchanged.
+    """
+    return _cached_response(request, FLEET_KEY, lambda: _assets_response(db))
+
+
+@router.get("/assets/{asset_id}", response_model=AssetDetailResponse)
+def get_asset_detail(asset_id: str, request: Request, db: Session = Depends(get_read_db)) -> Response:
+    """Latest prediction, recent history and metrics snapshot; cached and ETagged per asset."""
+    return _cached_response(request, asset_key(asset_id), lambda: _asset_detail_response(db, asset_id))
+
+
+def _assets_response(db: Session) -> AssetsResponse:
     rows = get_assets_with_latest_prediction(db)
     assets: list[AssetStatus] = []
     for r in rows:
@@ -40,8 +72,7 @@ def list_assets(db: Session = Depends(get_db)) -> AssetsResponse:
     return AssetsResponse(assets=assets)
 
 
-@router.get("/assets/{asset_id}", response_model=AssetDetailResponse)
-def get_asset_detail(asset_id: str, db: Session = Depends(get_db)) -> AssetDetailResponse:
+def _asset_detail_response(db: Session, asset_id: str) -> AssetDetailResponse:
     latest = get_latest_prediction_for_asset(db, asset_id)
     hist = get_prediction_history_for_asset(db, asset_id, limit=200)
     samples = get_recent_training_samples_for_asset(db, asset_id, limit=24)
@@ -82,3 +113,22 @@ def get_asset_detail(asset_id: str, db: Session = Depends(get_db)) -> AssetDetai
         history=history_points,
         metrics=metrics,
     )
+
+
+@router.get("/assets/{asset_id}/history", response_model=AssetHistoryResponse)
+def get_asset_history_route(
+    asset_id: str,
+    start: Optional[datetime] = Query(default=None, description="Inclusive lower bound (UTC if naive)"),
+    end: Optional[datetime] = Query(default=None, description="Exclusive upper bound (UTC if naive)"),
+    mode: HistoryMode = Query(default="raw", description="raw (paginated), lttb or buckets (downsampled)"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous raw page"),
+    limit: int = Query(default=500, ge=1, le=5000, description="Page size for mode=raw"),
+    points: int = Query(default=200, ge=3, le=5000, description="Target point/bucket count when downsampling"),
+    db: Session = Depends(get_read_db),
+) -> AssetHistoryResponse:
+    try:
+        return get_asset_history(
+            db, asset_id, mode=mode, start=start, end=end, cursor=cursor, limit=limit, points=points
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
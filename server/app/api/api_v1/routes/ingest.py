@@ -0,0 +1,142 @@
+import asyncio
+from dataclasses import asdict
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+
+from app.core.config import get_settings
+from app.core.services.ingest_service import (
+    get_ingest_service,
+    iter_ndjson_chunks,
+    parse_json_readings,
+    parse_ndjson_readings,
+)
+from app.core.services.predict_service import AssessmentColumns
+from app.schemas.prediction import IngestBatcherStats, IngestResponse, IngestStatsResponse, PredictResponse
+
+router = APIRouter(tags=["ingest"])
+
+
+def _ingest_response(model_id: str, results: list, error: Optional[str] = None) -> IngestResponse:
+    risk = np.concatenate([r.risk_level for r in results]) if results else np.array([], dtype=object)
+    return IngestResponse(
+        model_id=model_id,
+        readings=int(risk.shape[0]),
+        normal=int(np.sum(risk == "normal")),
+        warning=int(np.sum(risk == "warning")),
+        critical=int(np.sum(risk == "critical")),
+        error=error,
+    )
+
+
+@router.post("/ingest", response_model=IngestResponse, responses={400: {"model": IngestResponse}})
+async def ingest_readings(request: Request, model_id: str = Query(...)) -> Response:
+    """
+    Score a stream of sensor readings sent as NDJSON (one reading per line, same columns as
+    `/predict` CSVs), e.g. with chunked transfer encoding.
+
+    Readings are validated as they arrive and handed to the model's micro-batcher; every reading
+    gets a persisted prediction. The response is sent once all of them are scored.
+
+    Micro-batches are committed as they are scored, so a rejected line cannot undo the readings
+    before it. The stream stops at the first rejected block of lines and the 400 response is an
+    `IngestResponse` counting the readings that were persisted, with `error` set.
+    """
+    service = get_ingest_service()
+    try:
+        await service.ensure_model(model_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    batcher = service.batcher(model_id)
+    futures = []
+    error = None
+    try:
+        async for block in iter_ndjson_chunks(request.stream(), max_lines=batcher.batch_size):
+            try:
+                readings = await run_in_threadpool(parse_ndjson_readings, block)
+            except ValueError as e:
+                error = str(e)
+                break
+            futures.extend(await batcher.submit(readings))
+        results = await asyncio.gather(*futures)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Ingestion failed") from e
+
+    body = _ingest_response(model_id, results, error)
+    if error is not None:
+        return JSONResponse(status_code=400, content=body.model_dump(mode="json"))
+    return JSONResponse(content=body.model_dump(mode="json"))
+
+
+@router.websocket("/ingest/ws")
+async def ingest_websocket(websocket: WebSocket, model_id: str = Query(...)) -> None:
+    """
+    Live ingestion over a WebSocket.
+
+    Each text message holds readings (a JSON object, a JSON array or NDJSON lines). For each
+    message the server sends exactly one text reply, in order: a `PredictResponse` document for
+    all of its readings (however many micro-batches they were scored in), or `{"error": ...}` if
+    they were rejected.
+    """
+    await websocket.accept()
+    service = get_ingest_service()
+    try:
+        await service.ensure_model(model_id)
+    except ValueError as e:
+        await websocket.send_json({"error": str(e)})
+        await websocket.close(code=1008)
+        return
+
+    batcher = service.batcher(model_id)
+    replies: asyncio.Queue = asyncio.Queue(maxsize=get_settings().INGEST_QUEUE_MAX)
+
+    async def _send_replies() -> None:
+        while True:
+            futures = await replies.get()
+            if isinstance(futures, str):
+                await websocket.send_json({"error": futures})
+                continue
+            try:
+                results = await asyncio.gather(*futures)
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+            except Exception:
+                await websocket.send_json({"error": "Ingestion failed"})
+                continue
+            assessments = AssessmentColumns.concat(results).to_assessments() if results else []
+            response = PredictResponse(model_id=model_id, assessments=assessments)
+            await websocket.send_json(response.model_dump(mode="json"))
+
+    sender = asyncio.create_task(_send_replies())
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                readings = await run_in_threadpool(parse_json_readings, text)
+            except ValueError as e:
+                await replies.put(str(e))
+                continue
+            # Both puts wait when scoring falls behind, so we stop reading from the socket.
+            await replies.put(await batcher.submit(readings))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+
+
+@router.get("/ingest/stats", response_model=IngestStatsResponse)
+def get_ingest_stats() -> IngestStatsResponse:
+    settings = get_settings()
+    return IngestStatsResponse(
+        batch_size=settings.INGEST_BATCH_SIZE,
+        max_latency_ms=settings.INGEST_MAX_LATENCY_MS,
+        queue_max=settings.INGEST_QUEUE_MAX,
+        batchers=[IngestBatcherStats(**asdict(s)) for s in get_ingest_service().stats()],
+    )
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+
+from fastapi import APIRouter
+
+from app.core.services.model_cache import get_model_cache
+from app.core.services.predict_service import invalidate_model
+from app.schemas.model_metadata import ModelCacheStatsResponse
+
+router = APIRouter(tags=["models"])
+
+
+@router.get("/models/cache", response_model=ModelCacheStatsResponse)
+def get_model_cache_stats() -> ModelCacheStatsResponse:
+    """Hit/miss counters and memory usage of the in-process model cache."""
+    return ModelCacheStatsResponse(**asdict(get_model_cache().stats()))
+
+
+@router.delete("/models/{model_id}/cache", status_code=204)
+def invalidate_model_cache_entry(model_id: str) -> None:
+    """Evict a model from the in-process cache so the next request reloads it from disk."""
+    invalidate_model(model_id)
@@ -1,10 +1,36 @@
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from contextlib import AsyncExitStack
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.core.services.predict_service import predict_latest_per_asset_from_upload
-from app.crud.prediction import create_predictions_bulk
-from app.schemas.prediction import PredictResponse
+from app.api.deps import get_db_for_async_route
+from app.core.config import get_settings
+from app.core.services.predict_service import (
+    PredictResult,
+    advance_feature_tails,
+    hash_upload,
+    predict_latest_per_asset_for_models,
+    predict_latest_per_asset_from_upload,
+)
+from app.core.services.stage_executor import get_predict_executor
+from app.core.services.upload_cache import get_upload_cache
+from app.crud.prediction import create_predictions_from_columns
+from app.crud.prediction_upload import (
+    claim_prediction_upload,
+    expire_prediction_upload_responses,
+    get_prediction_upload_responses,
+)
+from app.schemas.prediction import (
+    BatchPredictResponse,
+    PredictExecutorStatsResponse,
+    PredictResponse,
+    PredictStageStats,
+)
 
 router = APIRouter(tags=["predict"])
 
@@ -12,8 +38,9 @@ router = APIRouter(tags=["predict"])
 async def predict_risk(
     model_id: str = Form(...),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-) -> PredictResponse:
+    engine: Optional[str] = Form(None),
+    db: Union[Session, AsyncSession] = Depends(get_db_for_async_route),
+) -> Response:
     """
     MVP risk assessment:
     - load the trained model artifact for model_id
@@ -21,14 +48,163 @@ async def predict_risk(
     - select latest timestamp row per asset_id
     - compute failure probability and map to risk level
     - persist predictions and return assessments
+
+    CPU-bound and blocking stages run on the bounded predict executor, not the event loop; with the
+    async database layer (DB_ASYNC) the metadata lookup and inserts are awaited on an AsyncSession.
+    `engine` ("sklearn" or "compiled") overrides the model's default inference engine.
+
+    Idempotent per (upload content, model_id): re-submitting the same file returns the stored
+    response without scoring or storing the predictions again. The `prediction_upload` table
+    enforces this across worker processes; the upload cache only skips the database lookup.
+    Stored responses are kept for PREDICTION_UPLOAD_RESPONSE_DAYS; after that a re-submitted file
+    is scored again for its response, but its predictions are still not stored twice.
+    """
+    executor = get_predict_executor()
+    cache = get_upload_cache()
+    try:
+        digest = await executor.run("hash", hash_upload, file)
+        # The lock keeps identical concurrent requests of this process from scoring twice.
+        async with cache.result_lock(digest, model_id):
+            body = cache.get_result(digest, model_id)
+            if body is None:
+                body = (await _stored_responses(db, executor, digest, [model_id])).get(model_id)
+            if body is None:
+                result = await predict_latest_per_asset_from_upload(
+                    model_id=model_id, file=file, db=db, executor=executor, engine=engine, digest=digest
+                )
+                # Serialized column-wise; same bytes as PredictResponse without per-row models.
+                body = result.columns.to_response_json(model_id)
+                body = (await _persist(db, executor, digest, [result], {model_id: body}))[model_id]
+            cache.put_result(digest, model_id, body)
+            return Response(content=body, media_type="application/json")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Prediction failed") from e
+
+
+def _persist_results(
+    db: Session, digest: str, results: list[PredictResult], bodies: dict[str, bytes]
+) -> dict[str, bytes]:
+    """
+    Store all models' predictions (and asset_status updates) in one transaction, once per
+    (upload digest, model_id); `bodies` are the responses recorded with them.
+
+    Returns the response per model: predictions already stored by an earlier or concurrent
+    request are skipped and answered with the response stored back then (or the freshly computed
+    one once that has expired). The feature tails are advanced past the scored readings, and
+    expired responses are cleared, in the same transaction.
+    """
+    already_stored = []
+    stored = []
+    try:
+        for result in results:
+            if not claim_prediction_upload(db, digest, result.model_id, bodies[result.model_id]):
+                already_stored.append(result.model_id)
+                continue
+            stored.append(result)
+            columns = result.columns
+            create_predictions_from_columns(
+                db,
+                model_id=result.model_id,
+                asset_ids=columns.asset_id,
+                timestamps=columns.timestamp,
+                failure_probabilities=columns.failure_probability,
+                risk_levels=columns.risk_level,
+                commit=False,
+            )
+        advance_feature_tails(db, stored)
+        retention_days = get_settings().PREDICTION_UPLOAD_RESPONSE_DAYS
+        if retention_days > 0:
+            expire_prediction_upload_responses(db, datetime.utcnow() - timedelta(days=retention_days))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {**bodies, **get_prediction_upload_responses(db, digest, already_stored)}
+
+
+async def _persist(
+    db: Union[Session, AsyncSession], executor, digest: str, results: list[PredictResult], bodies: dict[str, bytes]
+) -> dict[str, bytes]:
+    if isinstance(db, AsyncSession):
+        # Async database layer: the inserts are awaited on the event loop instead of an executor thread.
+        return await db.run_sync(_persist_results, digest, results, bodies)
+    return await executor.run("persist", _persist_results, db, digest, results, bodies)
+
+
+async def _stored_responses(
+    db: Union[Session, AsyncSession], executor, digest: str, model_ids: list[str]
+) -> dict[str, bytes]:
+    """Responses of the models whose predictions for this upload content are already stored."""
+    if not model_ids:
+        return {}
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(get_prediction_upload_responses, digest, model_ids)
+    return await executor.run("lookup", get_prediction_upload_responses, db, digest, model_ids)
+
+
+@router.post("/predict/batch", response_model=BatchPredictResponse)
+async def predict_risk_batch(
+    model_ids: list[str] = Form(...),
+    file: UploadFile = File(...),
+    persist: bool = Form(False),
+    engine: Optional[str] = Form(None),
+    db: Union[Session, AsyncSession] = Depends(get_db_for_async_route),
+) -> Response:
+    """
+    Score one upload with several models (repeat `model_ids`, or pass a comma-separated list).
+
+    The CSV is parsed and reduced to the latest rows once, features are built once per feature
+    spec and all models are scored concurrently. With `persist=true` every model's predictions
+    (and the feature tails they advance) are stored in a single transaction; without it nothing
+    is written.
+
+    Models whose predictions for this upload content were already stored (by `/predict` or a
+    persisting batch) are answered with the stored response and not stored again.
     """
+    ids = list(dict.fromkeys(m.strip() for value in model_ids for m in value.split(",") if m.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="At least one model_id is required")
+    executor = get_predict_executor()
+    cache = get_upload_cache()
     try:
-        result = await predict_latest_per_asset_from_upload(model_id=model_id, file=file, db=db)
-        create_predictions_bulk(db, result.to_persist)
-        return PredictResponse(model_id=model_id, assessments=result.assessments)
+        digest = await executor.run("hash", hash_upload, file)
+        async with AsyncExitStack() as stack:
+            if persist:
+                # Sorted, so overlapping batches acquire the locks in the same order.
+                for model_id in sorted(ids):
+                    await stack.enter_async_context(cache.result_lock(digest, model_id))
+            bodies = {m: cache.get_result(digest, m) for m in ids}
+            stored = await _stored_responses(db, executor, digest, [m for m in ids if bodies[m] is None])
+            for model_id, stored_body in stored.items():
+                bodies[model_id] = stored_body
+                cache.put_result(digest, model_id, stored_body)
+            missing = [m for m in ids if bodies[m] is None]
+            if missing:
+                results = await predict_latest_per_asset_for_models(
+                    model_ids=missing, file=file, db=db, executor=executor, engine=engine, digest=digest
+                )
+                computed = {r.model_id: r.columns.to_response_json(r.model_id) for r in results}
+                if persist:
+                    computed = await _persist(db, executor, digest, results, computed)
+                    # Only stored predictions are cached: a cached response means "already persisted".
+                    for model_id, computed_body in computed.items():
+                        cache.put_result(digest, model_id, computed_body)
+                bodies.update(computed)
+        body = b",".join(bodies[m] for m in ids)
+        return Response(content=b'{"results":[' + body + b"]}", media_type="application/json")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail="Prediction failed") from e
 
 
+@router.get("/predict/stats", response_model=PredictExecutorStatsResponse)
+def get_predict_stats() -> PredictExecutorStatsResponse:
+    """Per-stage queueing and run-time counters of the predict executor."""
+    executor = get_predict_executor()
+    return PredictExecutorStatsResponse(
+        max_workers=executor.max_workers,
+        stages=[PredictStageStats(**asdict(s)) for s in executor.stats()],
+    )
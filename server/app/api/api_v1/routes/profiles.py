@@ -0,0 +1,38 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core.config import get_settings
+from app.core.profiling import get_profile_store
+from app.schemas.profile import ProfileInfoResponse, ProfileListResponse
+
+router = APIRouter(tags=["profiles"])
+
+
+@router.get("/profiles", response_model=ProfileListResponse)
+def list_profiles() -> ProfileListResponse:
+    """Stored request profiles, newest first (requests sent with `X-Profile` while PROFILING_ENABLED)."""
+    return ProfileListResponse(
+        enabled=get_settings().PROFILING_ENABLED,
+        profiles=[ProfileInfoResponse(**asdict(p)) for p in get_profile_store().list()],
+    )
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str) -> FileResponse:
+    """
+    Download a profile: collapsed stacks (`.collapsed`, for flamegraph.pl or speedscope) or
+    pstats (`.pstats`, for `python -m pstats` or snakeviz).
+    """
+    path = get_profile_store().path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/plain" if path.suffix == ".collapsed" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=path.name)
+
+
+@router.delete("/profiles/{profile_id}", status_code=204)
+def delete_profile(profile_id: str) -> None:
+    if not get_profile_store().delete(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
@@ -4,14 +4,18 @@ from __future__ import annotations
 
 import random
 from datetime import datetime, timedelta
+from typing import Iterator, Optional
 
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
+from app.core.config import get_settings
+from app.core.services.synthetic_data import FleetSpec, iter_sensor_readings, load_synthetic_fleet
 from app.crud.model_metadata import get_all_models
-from app.models.prediction import Prediction
+from app.crud.prediction import create_predictions_from_columns
 
 router = APIRouter(tags=["seed"])
 
@@ -21,6 +25,25 @@ class SeedResponse(BaseModel):
     predictions_added: int
 
 
+class SyntheticFleetRequest(BaseModel):
+    assets: int = Field(default=100, ge=1)
+    hours: int = Field(default=168, ge=1)
+    interval_minutes: int = Field(default=60, ge=1)
+    seed: int = 42
+    # Python 3.9 compatibility: use Optional instead of `str | None`.
+    model_id: Optional[str] = None
+    predictions: bool = True
+    training_data: bool = False
+
+
+class SyntheticFleetResponse(BaseModel):
+    model_id: str
+    assets: int
+    predictions_added: int
+    training_rows_added: int
+    seconds: float
+
+
 def _risk_from_probability(p: float) -> str:
     if p < 0.5:
         return "normal"
@@ -29,6 +52,13 @@ def _risk_from_probability(p: float) -> str:
     return "critical"
 
 
+def _add_series(series: dict[str, list], asset_id: str, points: list[tuple[datetime, float]]) -> None:
+    for ts, prob in points:
+        series["asset_id"].append(asset_id)
+        series["timestamp"].append(ts)
+        series["failure_probability"].append(prob)
+
+
 @router.post("/seed-demo-data", response_model=SeedResponse)
 def seed_demo_prediction_history(db: Session = Depends(get_db)) -> SeedResponse:
     """
@@ -43,7 +73,7 @@ def seed_demo_prediction_history(db: Session = Depends(get_db)) -> SeedResponse:
 
     model_id = models[0].model_id
     now = datetime.utcnow()
-    predictions_to_add = []
+    series: dict[str, list] = {"asset_id": [], "timestamp": [], "failure_probability": []}
 
     # PUMP_003: Escalating risk scenario (starts normal, becomes critical)
     # Simulates a degrading pump over 24 hours
@@ -56,16 +86,7 @@ def seed_demo_prediction_history(db: Session = Depends(get_db)) -> SeedResponse:
         prob = max(0.05, min(0.95, base_prob + noise))
         pump_003_data.append((ts, prob))
 
-    for ts, prob in pump_003_data:
-        predictions_to_add.append(
-            Prediction(
-                asset_id="PUMP_003",
-                model_id=model_id,
-                timestamp=ts,
-                failure_probability=prob,
-                risk_level=_risk_from_probability(prob),
-            )
-        )
+    _add_series(series, "PUMP_003", pump_003_data)
 
     # PUMP_001: Normal operation with occasional spikes
     # Simulates a healthy pump with minor fluctuations
@@ -80,16 +101,7 @@ def seed_demo_prediction_history(db: Session = Depends(get_db)) -> SeedResponse:
         prob = max(0.05, min(0.45, base_prob + noise))
         pump_001_data.append((ts, prob))
 
-    for ts, prob in pump_001_data:
-        predictions_to_add.append(
-            Prediction(
-                asset_id="PUMP_001",
-                model_id=model_id,
-                timestamp=ts,
-                failure_probability=prob,
-                risk_level=_risk_from_probability(prob),
-            )
-        )
+    _add_series(series, "PUMP_001", pump_001_data)
 
     # PUMP_002: Warning zone fluctuation
     # Simulates a pump that's been hovering around the warning threshold
@@ -102,16 +114,7 @@ def seed_demo_prediction_history(db: Session = Depends(get_db)) -> SeedResponse:
         prob = max(0.25, min(0.75, base_prob + noise))
         pump_002_data.append((ts, prob))
 
-    for ts, prob in pump_002_data:
-        predictions_to_add.append(
-            Prediction(
-                asset_id="PUMP_002",
-                model_id=model_id,
-                timestamp=ts,
-                failure_probability=prob,
-                risk_level=_risk_from_probability(prob),
-            )
-        )
+    _add_series(series, "PUMP_002", pump_002_data)
 
     # MOTOR_001: Recovery scenario (was critical, now recovering)
     motor_001_data = []
@@ -123,23 +126,82 @@ def seed_demo_prediction_history(db: Session = Depends(get_db)) -> SeedResponse:
         prob = max(0.1, min(0.9, base_prob + noise))
         motor_001_data.append((ts, prob))
 
-    for ts, prob in motor_001_data:
-        predictions_to_add.append(
-            Prediction(
-                asset_id="MOTOR_001",
-                model_id=model_id,
-                timestamp=ts,
-                failure_probability=prob,
-                risk_level=_risk_from_probability(prob),
-            )
-        )
+    _add_series(series, "MOTOR_001", motor_001_data)
 
-    # Add all predictions to the database
-    db.add_all(predictions_to_add)
-    db.commit()
+    # Add all predictions to the database in one bulk insert
+    stats = create_predictions_from_columns(
+        db,
+        model_id=model_id,
+        asset_ids=series["asset_id"],
+        timestamps=series["timestamp"],
+        failure_probabilities=series["failure_probability"],
+        risk_levels=[_risk_from_probability(p) for p in series["failure_probability"]],
+    )
 
     return SeedResponse(
         message="Demo prediction history seeded successfully",
-        predictions_added=len(predictions_to_add),
+        predictions_added=stats.rows,
+    )
+
+
+
+def _fleet_spec(assets: int, hours: int, interval_minutes: int, seed: int) -> FleetSpec:
+    spec = FleetSpec(assets=assets, hours=hours, interval_minutes=interval_minutes, seed=seed)
+    max_rows = get_settings().SYNTHETIC_MAX_ROWS
+    if spec.rows > max_rows:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Synthetic fleet of {spec.rows} rows exceeds SYNTHETIC_MAX_ROWS ({max_rows}); use the CLI instead",
+        )
+    return spec
+
+
+@router.post("/seed-synthetic-fleet", response_model=SyntheticFleetResponse)
+def seed_synthetic_fleet(payload: SyntheticFleetRequest, db: Session = Depends(get_db)) -> SyntheticFleetResponse:
+    """
+    Bulk-load a deterministic synthetic fleet (see `synthetic_data`) for load testing:
+    prediction history and, optionally, labelled sensor readings as training rows.
+    Rows are attributed to `model_id` (default: the first stored model).
+    """
+    spec = _fleet_spec(payload.assets, payload.hours, payload.interval_minutes, payload.seed)
+    try:
+        result = load_synthetic_fleet(
+            db,
+            spec,
+            model_id=payload.model_id,
+            predictions=payload.predictions,
+            training_data=payload.training_data,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return SyntheticFleetResponse(
+        model_id=result.model_id,
+        assets=result.assets,
+        predictions_added=result.predictions,
+        training_rows_added=result.training_rows,
+        seconds=result.seconds,
     )
 
+
+@router.get("/synthetic-fleet.csv")
+def download_synthetic_fleet(
+    assets: int = Query(default=100, ge=1),
+    hours: int = Query(default=168, ge=1),
+    interval_minutes: int = Query(default=60, ge=1),
+    seed: int = 42,
+    labels: bool = True,
+) -> StreamingResponse:
+    """
+    Stream a synthetic fleet's sensor readings as an upload-ready CSV (with `label` for /train,
+    without for /predict). Generated chunk by chunk, so memory stays flat for large fleets.
+    """
+    spec = _fleet_spec(assets, hours, interval_minutes, seed)
+
+    def body() -> Iterator[bytes]:
+        for i, df in enumerate(iter_sensor_readings(spec, with_labels=labels)):
+            yield df.to_csv(header=i == 0, index=False).encode("utf-8")
+
+    filename = f"fleet_{assets}x{hours}h_seed{seed}.csv"
+    return StreamingResponse(
+        body(), media_type="text/csv", headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,27 +1,182 @@
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy.orm import Session
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
 
-from app.api.deps import get_db
-from app.core.services.training_workflow_service import train_and_persist_from_upload
-from app.schemas.train import TrainResponse
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.services.estimators import ESTIMATORS, get_estimator_backend
+from app.core.services.model_search import parse_search_options
+from app.core.services.streaming_training import OUT_OF_CORE_MODES
+from app.core.services.training_jobs import TrainingQueueFullError, get_training_job_manager
+from app.schemas.train import (
+    EstimatorInfo,
+    EstimatorListResponse,
+    RetrainRequest,
+    TrainJobListResponse,
+    TrainJobResponse,
+    TrainResponse,
+)
 
 router = APIRouter(tags=["train"])
 
 
+def _training_options(
+    estimator: Optional[str] = Form(None),
+    search: Optional[str] = Form(None, description="Hyperparameter search: grid or random"),
+    cv_folds: int = Form(5),
+    n_iter: int = Form(10, description="Candidates sampled by random search"),
+    scoring: str = Form("roc_auc"),
+    early_stopping: bool = Form(False, description="Drop the worse half of candidates after each fold"),
+    param_grid: Optional[str] = Form(None, description="JSON object: parameter -> list of values"),
+    out_of_core: Optional[str] = Form(
+        None, description="Stream the upload in chunks: sample (reservoir sample) or incremental (partial_fit)"
+    ),
+) -> dict:
+    """Training options shared by the train endpoints; validated before the upload is spooled."""
+    if out_of_core and out_of_core not in OUT_OF_CORE_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown out-of-core mode: {out_of_core} (expected one of: {', '.join(OUT_OF_CORE_MODES)})",
+        )
+    if out_of_core == "incremental" and estimator is None:
+        estimator = "sgd_logistic"
+    try:
+        options = {"estimator": get_estimator_backend(estimator).name}
+        # A custom grid is checked against the backend here, so a bad grid is a 400 and not a failed job.
+        options["search"] = parse_search_options(
+            mode=search,
+            cv_folds=cv_folds,
+            n_iter=n_iter,
+            scoring=scoring,
+            early_stopping=early_stopping,
+            param_grid_json=param_grid,
+            estimator=options["estimator"],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if out_of_core:
+        options["out_of_core"] = out_of_core
+    return options
+
+
+async def _submit_upload(file: UploadFile, options: dict):
+    if not (file.filename or "").lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Please upload a .csv file")
+    try:
+        # Spooling the upload to the job directory is blocking file I/O.
+        return await run_in_threadpool(get_training_job_manager().submit, file.file, options=options)
+    except TrainingQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
+
 @router.post("/train", response_model=TrainResponse)
 async def train_model(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    file: UploadFile = File(...), options: dict = Depends(_training_options)
 ) -> TrainResponse:
     """
     Upload + train in one call (MVP).
 
-    This endpoint is intentionally thin: it delegates parsing/validation and ML training to services.
+    This endpoint is intentionally thin: parsing/validation and ML training run as a background
+    training job in a worker process; we only await its result, so the event loop stays free.
+    `estimator` picks the backend (see `GET /train/estimators`); `search` adds a cross-validated
+    hyperparameter search: `metrics` summarizes it and `search_candidates` lists every candidate's
+    scores and fit time (stored in the model's metadata metrics as `search_table`).
     """
+    _, future = await _submit_upload(file, options)
     try:
-        return await train_and_persist_from_upload(file=file, db=db)
+        return await asyncio.wrap_future(future)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         # If persistence fails, surface a clear message (still a server error).
         raise HTTPException(status_code=500, detail="Training failed") from e
+
+
+@router.post("/train/jobs", response_model=TrainJobResponse, status_code=202)
+async def submit_training_job(
+    file: UploadFile = File(...), options: dict = Depends(_training_options)
+) -> TrainJobResponse:
+    """Queue a training run and return its job id immediately; poll `GET /train/jobs/{job_id}`."""
+    job, _ = await _submit_upload(file, options)
+    return TrainJobResponse.model_validate(job)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored rows use naive UTC `created_at` values.
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _retrain_options(payload: RetrainRequest) -> dict:
+    if payload.estimator is not None and payload.warm_start_model_id:
+        raise HTTPException(status_code=400, detail="estimator cannot be combined with warm_start_model_id")
+    try:
+        estimator = get_estimator_backend(payload.estimator).name if not payload.warm_start_model_id else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {
+        "model_ids": payload.model_ids,
+        "asset_ids": payload.asset_ids,
+        "since": _naive_utc(payload.since),
+        "until": _naive_utc(payload.until),
+        "estimator": estimator,
+        "warm_start_model_id": payload.warm_start_model_id,
+        "add_estimators": payload.add_estimators,
+    }
+
+
+def _submit_retrain(payload: RetrainRequest):
+    options = _retrain_options(payload)
+    try:
+        return get_training_job_manager().submit_retrain(options)
+    except TrainingQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
+
+@router.post("/train/retrain", response_model=TrainResponse)
+async def retrain_model(payload: RetrainRequest) -> TrainResponse:
+    """
+    Train a new model from stored `training_data` rows (requires `STORE_TRAINING_DATA`).
+
+    Rows are selected by model_ids, assets and a stored-at window and streamed from the database
+    in chunks; `warm_start_model_id` grows an existing forest with `add_estimators` new trees.
+    """
+    _, future = _submit_retrain(payload)
+    try:
+        return await asyncio.wrap_future(future)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Training failed") from e
+
+
+@router.post("/train/retrain/jobs", response_model=TrainJobResponse, status_code=202)
+def submit_retrain_job(payload: RetrainRequest) -> TrainJobResponse:
+    """Queue a retrain from stored rows and return its job id; poll `GET /train/jobs/{job_id}`."""
+    job, _ = _submit_retrain(payload)
+    return TrainJobResponse.model_validate(job)
+
+
+@router.get("/train/estimators", response_model=EstimatorListResponse)
+def list_estimators() -> EstimatorListResponse:
+    return EstimatorListResponse(
+        default=get_settings().TRAIN_ESTIMATOR,
+        estimators=[EstimatorInfo(name=b.name, description=b.description) for b in ESTIMATORS.values()],
+    )
+
+
+@router.get("/train/jobs", response_model=TrainJobListResponse)
+def list_training_jobs() -> TrainJobListResponse:
+    jobs = get_training_job_manager().list()
+    return TrainJobListResponse(jobs=[TrainJobResponse.model_validate(j) for j in jobs])
+
+
+@router.get("/train/jobs/{job_id}", response_model=TrainJobResponse)
+def get_training_job(job_id: str) -> TrainJobResponse:
+    job = get_training_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown training job")
+    return TrainJobResponse.model_validate(job)
@@ -0,0 +1,31 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter
+
+from app.core.services.upload_cache import get_upload_cache
+from app.schemas.upload import UploadCacheStatsResponse
+
+router = APIRouter(tags=["uploads"])
+
+
+def _stats_response() -> UploadCacheStatsResponse:
+    stats = get_upload_cache().stats()
+    return UploadCacheStatsResponse(
+        **asdict(stats), frame_hit_rate=stats.frame_hit_rate, result_hit_rate=stats.result_hit_rate
+    )
+
+
+@router.get("/uploads/cache", response_model=UploadCacheStatsResponse)
+def get_upload_cache_stats() -> UploadCacheStatsResponse:
+    """Size and hit rates of the upload cache (parsed uploads and predict responses), as seen by this worker."""
+    return _stats_response()
+
+
+@router.delete("/uploads/cache", response_model=UploadCacheStatsResponse)
+def clear_upload_cache() -> UploadCacheStatsResponse:
+    """
+    Drop all cache entries. Re-submitted uploads are parsed again; predictions that were already
+    stored are not stored again (their stored responses are returned).
+    """
+    get_upload_cache().clear()
+    return _stats_response()
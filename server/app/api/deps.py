@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from typing import Union
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.db.dp import SessionLocal
+from app.core.db.async_db import async_db_enabled, get_async_sessionmaker
+from app.core.db.dp import ReadSessionLocal, SessionLocal
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -15,3 +19,33 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_read_db() -> Generator[Session, None, None]:
+    """Read-only session (READ_DATABASE_URL replica, or a separate pool on the primary database)."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """An `AsyncSession` on the async engine (requires the async driver to be installed)."""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_db_for_async_route() -> AsyncGenerator[Union[Session, AsyncSession], None]:
+    """
+    Session for async routes: an `AsyncSession` when the async database layer is enabled,
+    otherwise a sync `Session` the route must only use from executor threads.
+    """
+    if async_db_enabled():
+        async with get_async_sessionmaker()() as db:
+            yield db
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        # close() returns the connection to the pool (a rollback): keep it off the event loop.
+        await run_in_threadpool(db.close)
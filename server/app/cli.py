@@ -0,0 +1,128 @@
+"""
+Maintenance commands, e.g. `python -m app.cli rebuild-asset-status` (run from `server/`).
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Optional, Sequence
+
+from app.core.db.dp import Base, SessionLocal, engine
+from app.core.services.model_artifacts import default_artifact_path, forest_sidecar_path, write_forest_sidecar
+from app.core.services.synthetic_data import EXPORT_FORMATS, FleetSpec, load_synthetic_fleet, write_sensor_readings
+from app.crud.asset_status import rebuild_asset_status
+from app.crud.model_metadata import get_all_models
+from app.models import AssetStatus, ModelMetadata, Prediction, TrainingData  # noqa: F401
+
+
+def _rebuild_asset_status(_: argparse.Namespace) -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = rebuild_asset_status(db)
+    finally:
+        db.close()
+    print(f"asset_status rebuilt: {count} assets")
+
+
+def _compile_artifacts(args: argparse.Namespace) -> None:
+    import joblib
+
+    db = SessionLocal()
+    try:
+        models = get_all_models(db, limit=1_000_000)
+    finally:
+        db.close()
+
+    written = 0
+    for meta in models:
+        path = Path(meta.model_path) if meta.model_path else default_artifact_path(meta.model_id)
+        if not path.exists() or (forest_sidecar_path(path).exists() and not args.force):
+            continue
+        if write_forest_sidecar(joblib.load(path), path) is not None:
+            written += 1
+    print(f"compiled forest sidecars written: {written}")
+
+
+def _synthetic_fleet(args: argparse.Namespace) -> None:
+    if not args.output and not args.load:
+        raise SystemExit("synthetic-fleet: pass --output and/or --load")
+    spec = FleetSpec(assets=args.assets, hours=args.hours, interval_minutes=args.interval_minutes, seed=args.seed)
+    print(f"fleet: {spec.assets} assets x {spec.steps} readings = {spec.rows} rows (seed {spec.seed})")
+
+    if args.output:
+        fmt = args.format or ("parquet" if Path(args.output).suffix == ".parquet" else "csv")
+        try:
+            rows = write_sensor_readings(
+                spec, args.output, fmt=fmt, with_labels=not args.no_labels, assets_per_chunk=args.chunk_assets
+            )
+        except ValueError as e:
+            raise SystemExit(f"synthetic-fleet: {e}") from e
+        print(f"sensor readings written: {rows} rows -> {args.output}")
+
+    if args.load:
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            result = load_synthetic_fleet(
+                db,
+                spec,
+                model_id=args.model_id,
+                predictions=True,
+                training_data=args.training_data,
+                assets_per_chunk=args.chunk_assets,
+                on_chunk=lambda rows: print(f"  {rows} rows loaded", flush=True),
+            )
+        except ValueError as e:
+            raise SystemExit(f"synthetic-fleet: {e}") from e
+        finally:
+            db.close()
+        total = result.predictions + result.training_rows
+        print(
+            f"loaded for model {result.model_id}: {result.predictions} predictions, "
+            f"{result.training_rows} training rows in {result.seconds:.1f}s "
+            f"({total / result.seconds if result.seconds > 0 else 0:,.0f} rows/s)"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-asset-status",
+        help="Recompute the asset_status table from the full prediction/training history",
+    )
+    rebuild.set_defaults(func=_rebuild_asset_status)
+
+    compile_cmd = commands.add_parser(
+        "compile-artifacts",
+        help="Write memory-mappable compiled forest sidecars for existing model artifacts",
+    )
+    compile_cmd.add_argument("--force", action="store_true", help="rewrite existing sidecars")
+    compile_cmd.set_defaults(func=_compile_artifacts)
+
+    fleet = commands.add_parser(
+        "synthetic-fleet",
+        help="Generate a deterministic synthetic fleet as an upload file and/or bulk-load it into the database",
+    )
+    fleet.add_argument("--assets", type=int, default=1000)
+    fleet.add_argument("--hours", type=int, default=720)
+    fleet.add_argument("--interval-minutes", type=int, default=60)
+    fleet.add_argument("--seed", type=int, default=42)
+    fleet.add_argument("--output", help="write sensor readings to this .csv/.parquet file")
+    fleet.add_argument("--format", choices=EXPORT_FORMATS, help="output format (default: from the file suffix)")
+    fleet.add_argument("--no-labels", action="store_true", help="omit the label column (inference uploads)")
+    fleet.add_argument("--load", action="store_true", help="bulk-load prediction history into the database")
+    fleet.add_argument("--training-data", action="store_true", help="with --load, also load labelled training rows")
+    fleet.add_argument("--model-id", help="model the loaded rows belong to (default: the first stored model)")
+    fleet.add_argument("--chunk-assets", type=int, default=None, help="assets generated/written per chunk")
+    fleet.set_defaults(func=_synthetic_fleet)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,15 @@ def _parse_bool(value: str | None, default: bool) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "y", "on"}
 
 
+def _parse_int(value: str | None, default: int) -> int:
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value.strip())
+    except ValueError:
+        return default
+
+
 @dataclass(frozen=True)
 class Settings:
     """
@@ -20,8 +29,116 @@ class Settings:
     """
 
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./maintenance_predictor.db")
+    # Async engine/sessions for async routes (aiosqlite / asyncpg, see core/db/async_db.py). Also
+    # enabled when DATABASE_URL itself names an async driver, e.g. sqlite+aiosqlite:///...
+    DB_ASYNC: bool = _parse_bool(os.getenv("DB_ASYNC"), default=False)
+    # Read-only sessions (GET /assets routes): a replica's URL, or empty for a separate connection
+    # pool on DATABASE_URL. Either way the connections refuse writes.
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL", "")
+    # Engine profile (see core/db/engine_profile.py). SQLite pragmas applied on connect (empty skips
+    # one); WAL keeps dashboard reads from waiting on prediction writes. cache_size < 0 is in KiB.
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_CACHE_SIZE: int = _parse_int(os.getenv("SQLITE_CACHE_SIZE"), default=-64_000)
+    # Connection pool per engine and process for server databases (Postgres, ...); recycle in seconds.
+    DB_POOL_SIZE: int = _parse_int(os.getenv("DB_POOL_SIZE"), default=5)
+    DB_MAX_OVERFLOW: int = _parse_int(os.getenv("DB_MAX_OVERFLOW"), default=10)
+    DB_POOL_RECYCLE: int = _parse_int(os.getenv("DB_POOL_RECYCLE"), default=1800)
+    DB_POOL_PRE_PING: bool = _parse_bool(os.getenv("DB_POOL_PRE_PING"), default=True)
+
     STORE_TRAINING_DATA: bool = _parse_bool(os.getenv("STORE_TRAINING_DATA"), default=True)
 
+    # Rows per chunk when streaming CSV uploads (bounds peak memory of chunked ingestion).
+    CSV_CHUNK_ROWS: int = _parse_int(os.getenv("CSV_CHUNK_ROWS"), default=100_000)
+    # Content-addressed cache of parsed uploads and predict responses (see core/services/upload_cache.py).
+    UPLOAD_CACHE_ENABLED: bool = _parse_bool(os.getenv("UPLOAD_CACHE_ENABLED"), default=True)
+    UPLOAD_CACHE_MAX_BYTES: int = _parse_int(os.getenv("UPLOAD_CACHE_MAX_BYTES"), default=1024 * 1024 * 1024)
+    # Cache directory; empty means app/core/artifacts/upload_cache.
+    UPLOAD_CACHE_DIR: str = os.getenv("UPLOAD_CACHE_DIR", "")
+    # Days a stored POST /predict response (prediction_upload table) is kept for re-submitted uploads.
+    # Later re-submissions are scored again but their predictions are still not stored twice. 0 keeps them.
+    PREDICTION_UPLOAD_RESPONSE_DAYS: int = _parse_int(os.getenv("PREDICTION_UPLOAD_RESPONSE_DAYS"), default=7)
+
+    # In-memory cache of GET /assets and /assets/{asset_id} responses (see core/services/response_cache.py).
+    # Writes in this process invalidate it right away; the TTL bounds staleness from other processes.
+    RESPONSE_CACHE_ENABLED: bool = _parse_bool(os.getenv("RESPONSE_CACHE_ENABLED"), default=True)
+    RESPONSE_CACHE_TTL_SECONDS: int = _parse_int(os.getenv("RESPONSE_CACHE_TTL_SECONDS"), default=30)
+    RESPONSE_CACHE_MAX_ENTRIES: int = _parse_int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES"), default=4096)
+    RESPONSE_CACHE_MAX_BYTES: int = _parse_int(os.getenv("RESPONSE_CACHE_MAX_BYTES"), default=64 * 1024 * 1024)
+
+    # Out-of-core training: max rows kept in the stratified reservoir sample of a streamed upload.
+    TRAIN_SAMPLE_ROWS: int = _parse_int(os.getenv("TRAIN_SAMPLE_ROWS"), default=250_000)
+    # Memory budget (bytes) for the in-process cache of loaded model artifacts. 0 disables caching.
+    MODEL_CACHE_MAX_BYTES: int = _parse_int(os.getenv("MODEL_CACHE_MAX_BYTES"), default=512 * 1024 * 1024)
+
+    # Serve forest artifacts from memory-mapped compiled arrays (shared between worker processes),
+    # whatever INFERENCE_ENGINE they were trained with; only an explicit engine=sklearn loads the estimator.
+    MODEL_MMAP: bool = _parse_bool(os.getenv("MODEL_MMAP"), default=True)
+    # Comma-separated model_ids loaded before gunicorn forks its workers (see gunicorn.conf.py).
+    PRELOAD_MODEL_IDS: str = os.getenv("PRELOAD_MODEL_IDS", "")
+
+    # Estimator backend for training requests that do not pick one (see core/services/estimators.py).
+    TRAIN_ESTIMATOR: str = os.getenv("TRAIN_ESTIMATOR", "random_forest")
+
+    # Worker processes for hyperparameter search fits (each (candidate, fold) fit is one task). Inside
+    # background training jobs this is capped at cpu_count // TRAIN_WORKERS per job.
+    SEARCH_WORKERS: int = _parse_int(os.getenv("SEARCH_WORKERS"), default=os.cpu_count() or 1)
+
+    # Background training: worker processes, max queued/running jobs, finished jobs kept for status queries.
+    TRAIN_WORKERS: int = _parse_int(os.getenv("TRAIN_WORKERS"), default=2)
+    TRAIN_QUEUE_MAX_DEPTH: int = _parse_int(os.getenv("TRAIN_QUEUE_MAX_DEPTH"), default=8)
+    TRAIN_JOB_HISTORY: int = _parse_int(os.getenv("TRAIN_JOB_HISTORY"), default=100)
+
+    # Rows fetched per server-side cursor batch when retraining from stored training_data rows.
+    RETRAIN_FETCH_ROWS: int = _parse_int(os.getenv("RETRAIN_FETCH_ROWS"), default=50_000)
+
+    # Rows per executemany batch for bulk inserts (predictions, training rows, seeding).
+    BULK_INSERT_BATCH_SIZE: int = _parse_int(os.getenv("BULK_INSERT_BATCH_SIZE"), default=5_000)
+    # Max rows per synthetic fleet request (/seed-synthetic-fleet); the CLI generator is not capped.
+    SYNTHETIC_MAX_ROWS: int = _parse_int(os.getenv("SYNTHETIC_MAX_ROWS"), default=5_000_000)
+
+    # Opt-in per-request profiling (see core/profiling.py): requests with `X-Profile: sample|cprofile`
+    # (plus `X-Profile-Token` when PROFILE_TOKEN is set) are profiled. Stored profiles are capped by
+    # count and total bytes; PROFILE_DIR empty means app/core/artifacts/profiles.
+    PROFILING_ENABLED: bool = _parse_bool(os.getenv("PROFILING_ENABLED"), default=False)
+    PROFILE_TOKEN: str = os.getenv("PROFILE_TOKEN", "")
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "")
+    PROFILE_MAX_FILES: int = _parse_int(os.getenv("PROFILE_MAX_FILES"), default=50)
+    PROFILE_MAX_BYTES: int = _parse_int(os.getenv("PROFILE_MAX_BYTES"), default=100 * 1024 * 1024)
+    PROFILE_SAMPLE_INTERVAL_MS: int = _parse_int(os.getenv("PROFILE_SAMPLE_INTERVAL_MS"), default=5)
+
+    # Stage timers, DB call timings and the Prometheus `/metrics` endpoint (see core/metrics.py).
+    METRICS_ENABLED: bool = _parse_bool(os.getenv("METRICS_ENABLED"), default=True)
+
+    # Worker threads for CPU-bound/blocking stages of /predict (parsing, model load, predict_proba, persistence).
+    PREDICT_EXECUTOR_WORKERS: int = _parse_int(
+        os.getenv("PREDICT_EXECUTOR_WORKERS"), default=min(4, os.cpu_count() or 1)
+    )
+
+    # Time-series features for newly trained models (rolling window length, comma-separated lags).
+    # Opt-in: by default new models train on the four raw sensor columns, as before. Existing models
+    # keep the spec they were trained with.
+    FEATURES_ENABLED: bool = _parse_bool(os.getenv("FEATURES_ENABLED"), default=False)
+    FEATURE_WINDOW: int = _parse_int(os.getenv("FEATURE_WINDOW"), default=6)
+    FEATURE_LAGS: str = os.getenv("FEATURE_LAGS", "1,2")
+    # Recent readings stored per asset (asset_reading_tail table) when scoring with window/lag features,
+    # so uploads get history from earlier uploads in any worker process.
+    FEATURE_TAIL_ROWS: int = _parse_int(os.getenv("FEATURE_TAIL_ROWS"), default=16)
+
+    # Default inference engine stored on newly trained models: "sklearn" (default) or "compiled"
+    # (opt-in flat-array forest, much lower latency for small batches). Forests served memory-mapped
+    # (MODEL_MMAP) always use the compiled engine. Requests can still pick one explicitly.
+    INFERENCE_ENGINE: str = os.getenv("INFERENCE_ENGINE", "sklearn")
+    # Batches larger than this use sklearn even with the compiled engine (see benchmarks/bench_tree_engine.py),
+    # except on memory-mapped forests (MODEL_MMAP), which score every batch from the shared arrays.
+    COMPILED_ENGINE_MAX_ROWS: int = _parse_int(os.getenv("COMPILED_ENGINE_MAX_ROWS"), default=256)
+
+    # Live ingestion micro-batching: flush at this many readings or this long after the first one,
+    # and at most this many pending chunks per model before producers have to wait (backpressure).
+    INGEST_BATCH_SIZE: int = _parse_int(os.getenv("INGEST_BATCH_SIZE"), default=1_000)
+    INGEST_MAX_LATENCY_MS: int = _parse_int(os.getenv("INGEST_MAX_LATENCY_MS"), default=200)
+    INGEST_QUEUE_MAX: int = _parse_int(os.getenv("INGEST_QUEUE_MAX"), default=32)
+
 
 @lru_cache
 def get_settings() -> Settings:
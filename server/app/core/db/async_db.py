@@ -0,0 +1,77 @@
+"""
+Optional async database layer (SQLAlchemy asyncio) for async routes.
+
+Enabled with `DB_ASYNC=true`, or by giving `DATABASE_URL` an async driver
+(`sqlite+aiosqlite://...`, `postgresql+asyncpg://...`). Both engines point at the same database:
+the async engine serves async routes, while the sync engine in `dp.py` keeps serving sync routes,
+the CLI and the training/ingestion workers, which run off the event loop anyway.
+
+Needs `aiosqlite` (SQLite) or `asyncpg` (Postgres) plus `greenlet`; the engine is only created (and
+the driver imported) when the async layer is first used.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import get_settings
+from app.core.db.engine_profile import configure_connections, engine_options
+from app.core.metrics import instrument_engine
+
+# backend -> async driver used when DATABASE_URL names a sync driver (or none).
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+# Drivers that are async-only; the sync engine falls back to the backend's default driver.
+_ASYNC_ONLY_DRIVERS = frozenset({"aiosqlite", "asyncpg"})
+
+
+def is_async_url(url: str) -> bool:
+    return make_url(url).get_driver_name() in _ASYNC_ONLY_DRIVERS
+
+
+def sync_database_url(url: str) -> str:
+    """`url` with an async-only driver replaced by the backend's default (sync) driver."""
+    parsed = make_url(url)
+    if parsed.get_driver_name() in _ASYNC_ONLY_DRIVERS:
+        parsed = parsed.set(drivername=parsed.get_backend_name())
+    return parsed.render_as_string(hide_password=False)
+
+
+def async_database_url(url: str) -> str:
+    """`url` with its driver replaced by an async one (aiosqlite / asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.get_driver_name() in _ASYNC_ONLY_DRIVERS:
+        return url
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def async_db_enabled() -> bool:
+    settings = get_settings()
+    return settings.DB_ASYNC or is_async_url(settings.DATABASE_URL)
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    url = async_database_url(get_settings().DATABASE_URL)
+    engine = create_async_engine(url, **engine_options(url))
+    configure_connections(engine.sync_engine)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    # expire_on_commit=False: attributes of committed objects stay readable without an implicit
+    # (and, under asyncio, disallowed) lazy refresh.
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (on shutdown); a no-op when the engine was never created."""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
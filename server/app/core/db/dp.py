@@ -4,16 +4,41 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.core.config import get_settings
+from app.core.db.async_db import sync_database_url
+from app.core.db.engine_profile import configure_connections, engine_options, is_memory_sqlite
+from app.core.metrics import instrument_engine
 
 settings = get_settings()
 
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    # Need for SQLite and FastAPI threading
-    connect_args = {"check_same_thread": False}
+# An async DATABASE_URL (see async_db.py) still gets a sync engine for sync routes and workers.
+database_url = sync_database_url(settings.DATABASE_URL)
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+engine = create_engine(database_url, **engine_options(database_url))
+configure_connections(engine)
+instrument_engine(engine)
+
+# Read-only engine for GET routes: a replica, or its own pool on the primary (with WAL, SQLite
+# readers then never queue behind write connections). An in-memory SQLite database cannot be
+# opened twice, so it shares the primary engine.
+read_database_url = sync_database_url(settings.READ_DATABASE_URL or settings.DATABASE_URL)
+if is_memory_sqlite(read_database_url):
+    read_engine = engine
+else:
+    read_engine = create_engine(read_database_url, **engine_options(read_database_url))
+    configure_connections(read_engine, read_only=True)
+    instrument_engine(read_engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
+
+def create_missing_indexes() -> None:
+    """
+    Create indexes declared on models that are missing from existing tables.
+
+    `Base.metadata.create_all` only creates indexes together with new tables.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
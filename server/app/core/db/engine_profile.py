@@ -0,0 +1,80 @@
+"""
+Engine profile from `Settings`: per-connection SQLite pragmas and pool sizing for server databases.
+
+SQLite connections get `journal_mode` (WAL by default: readers are not blocked by a writer and
+vice versa), `synchronous` and `cache_size` on connect. Other databases get a sized, recycled and
+pre-pinged connection pool. Read-only engines additionally refuse writes at the connection level
+(`PRAGMA query_only` / `SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY`).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+from app.core.config import get_settings
+
+_JOURNAL_MODES = frozenset({"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"})
+_SYNCHRONOUS = frozenset({"OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3"})
+
+
+def is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """`create_engine` / `create_async_engine` keyword arguments for `url`."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # Need for SQLite and FastAPI threading
+        return {"connect_args": {"check_same_thread": False}}
+    settings = get_settings()
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def connect_statements(dialect: str, *, read_only: bool = False) -> list[str]:
+    """Statements run on every new DBAPI connection of an engine for `dialect`."""
+    settings = get_settings()
+    statements = []
+    if dialect == "sqlite":
+        journal_mode = settings.SQLITE_JOURNAL_MODE.strip().upper()
+        # WAL persists in the database file: the primary engine sets it, read-only engines inherit it.
+        if journal_mode and not read_only:
+            if journal_mode not in _JOURNAL_MODES:
+                raise ValueError(f"Unsupported SQLITE_JOURNAL_MODE: {settings.SQLITE_JOURNAL_MODE}")
+            statements.append(f"PRAGMA journal_mode={journal_mode}")
+        synchronous = settings.SQLITE_SYNCHRONOUS.strip().upper()
+        if synchronous:
+            if synchronous not in _SYNCHRONOUS:
+                raise ValueError(f"Unsupported SQLITE_SYNCHRONOUS: {settings.SQLITE_SYNCHRONOUS}")
+            statements.append(f"PRAGMA synchronous={synchronous}")
+        if settings.SQLITE_CACHE_SIZE:
+            statements.append(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        if read_only:
+            statements.append("PRAGMA query_only=ON")
+    elif dialect == "postgresql" and read_only:
+        statements.append("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+    return statements
+
+
+def configure_connections(engine: Engine, *, read_only: bool = False) -> None:
+    """Run `connect_statements` on every new connection of `engine` (sync, or an async engine's `sync_engine`)."""
+    statements = connect_statements(engine.dialect.name, read_only=read_only)
+    if not statements:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
@@ -0,0 +1,398 @@
+"""
+Lightweight in-process metrics: stage timers, counters and a Prometheus text exposition.
+
+Hot paths only bump pre-bucketed counters under a lock (two `perf_counter` calls and a bisect per
+observation). Everything else, including the stats of caches, executors and the ingest service,
+is collected when `/metrics` is scraped. Metrics are per process: with several workers, Prometheus
+scrapes each one (or aggregates by instance).
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import math
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, TypeVar
+
+from app.core.config import get_settings
+
+# Latency buckets (seconds) from sub-millisecond lookups to multi-minute training fits.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+_PREFIX = "predictor_"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# (labels, value) samples of one metric family, as returned by collectors.
+Samples = Iterable[tuple[dict[str, str], float]]
+
+
+@dataclass(frozen=True)
+class MetricFamily:
+    name: str
+    kind: str  # "counter" or "gauge"
+    help: str
+    samples: Samples
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str]) -> None:
+        self.name, self.help, self.labelnames = _PREFIX + name, help, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, labels: tuple[str, ...], value: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in values)
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name, self.help, self.labelnames = _PREFIX + name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> per-bucket counts (non-cumulative, last slot is +Inf), sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][slot] += 1
+            series[1][0] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((k, (list(counts), total[0])) for k, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                lines.append(f"{self.name}_bucket{_labels((*self.labelnames, 'le'), (*key, le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class StageTimer:
+    """Handle yielded by `stage_timer`; set `rows`/`bytes` to count what the stage processed."""
+
+    __slots__ = ("rows", "bytes")
+
+    def __init__(self) -> None:
+        self.rows: Optional[int] = None
+        self.bytes: Optional[int] = None
+
+
+class MetricsRegistry:
+    """
+    Stage latency histograms, rows/bytes counters, DB call and HTTP request timings.
+
+    `collectors` are called on every render and return extra families (e.g. cache stats) read
+    from the components that already keep them, so those cost nothing between scrapes.
+    """
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.stage_seconds = Histogram("stage_duration_seconds", "Service stage latency", ["stage"])
+        self.stage_failures = Counter("stage_failures_total", "Service stages that raised", ["stage"])
+        self.stage_rows = Counter("stage_rows_total", "Rows processed by service stages", ["stage"])
+        self.stage_bytes = Counter("stage_bytes_total", "Bytes read by service stages", ["stage"])
+        self.db_seconds = Histogram("db_query_duration_seconds", "Database call latency", ["operation"])
+        self.db_rows = Counter("db_rows_written_total", "Rows sent in INSERT/UPDATE/DELETE calls", ["operation"])
+        self.http_seconds = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+        self.http_requests = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+        self.collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTimer]:
+        timer = StageTimer()
+        if not self.enabled:
+            yield timer
+            return
+        started = perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            self.stage_failures.inc((name,))
+            raise
+        finally:
+            self.stage_seconds.observe((name,), perf_counter() - started)
+            if timer.rows is not None:
+                self.stage_rows.inc((name,), timer.rows)
+            if timer.bytes is not None:
+                self.stage_bytes.inc((name,), timer.bytes)
+
+    def observe_stage(self, name: str, seconds: float, *, rows: Optional[int] = None) -> None:
+        """Record a stage timed elsewhere (e.g. in a training worker process)."""
+        if not self.enabled:
+            return
+        self.stage_seconds.observe((name,), seconds)
+        if rows is not None:
+            self.stage_rows.inc((name,), rows)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in (
+            self.stage_seconds,
+            self.stage_failures,
+            self.stage_rows,
+            self.stage_bytes,
+            self.db_seconds,
+            self.db_rows,
+            self.http_seconds,
+            self.http_requests,
+        ):
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            for family in collect():
+                name = _PREFIX + family.name
+                lines.append(f"# HELP {name} {family.help}")
+                lines.append(f"# TYPE {name} {family.kind}")
+                for labels, value in family.samples:
+                    lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    registry = MetricsRegistry(enabled=get_settings().METRICS_ENABLED)
+    registry.collectors.append(_service_metrics)
+    return registry
+
+
+def stage_timer(name: str):
+    """`with stage_timer("predict_proba") as t: ...; t.rows = n` on the process-wide registry."""
+    return get_metrics().stage(name)
+
+
+def timed_stage(name: str, *, rows: Optional[Callable[[Any], int]] = None) -> Callable[[F], F]:
+    """Decorator form of `stage_timer`; `rows(result)` counts the rows the call produced."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage_timer(name) as timer:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    timer.rows = rows(result)
+                return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def instrument_engine(engine: Any) -> None:
+    """Time every DB call of `engine` (one observation per execute/executemany)."""
+    from sqlalchemy import event
+
+    registry = get_metrics()
+    if not registry.enabled:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("metrics_started", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info["metrics_started"].pop()
+        operation = _operation(statement)
+        registry.db_seconds.observe((operation,), perf_counter() - started)
+        if operation in ("INSERT", "UPDATE", "DELETE"):
+            registry.db_rows.inc((operation,), len(parameters) if executemany else 1)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context) -> None:
+        stack = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if stack:
+            stack.pop()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing HTTP requests per route template (e.g. /api/v1/assets/{asset_id}),
+    so ids in paths do not create new series. Requests that match no route share one label.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        registry = get_metrics()
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            registry.http_seconds.observe((method, route), perf_counter() - started)
+            registry.http_requests.inc((method, route, str(status["code"])))
+
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip()[:16].split(None, 1)
+    return words[0].upper() if words else "OTHER"
+
+
+def _service_metrics() -> Iterator[MetricFamily]:
+    # Imported here: these services import this module for their stage timers.
+    from app.core.services.ingest_service import get_ingest_service
+    from app.core.services.model_cache import get_model_cache
+    from app.core.services.response_cache import get_response_cache
+    from app.core.services.stage_executor import get_predict_executor
+    from app.core.services.training_jobs import get_training_job_manager
+    from app.core.services.upload_cache import get_upload_cache
+
+    stages = get_predict_executor().stats()
+    yield MetricFamily(
+        "executor_stage_completed_total",
+        "counter",
+        "Predict executor stages completed",
+        [({"stage": s.stage}, s.completed) for s in stages],
+    )
+    yield MetricFamily(
+        "executor_stage_failed_total",
+        "counter",
+        "Predict executor stages failed",
+        [({"stage": s.stage}, s.failed) for s in stages],
+    )
+    yield MetricFamily(
+        "executor_stage_queue_seconds_total",
+        "counter",
+        "Time predict executor stages waited for a worker",
+        [({"stage": s.stage}, s.queue_seconds_total) for s in stages],
+    )
+    yield MetricFamily(
+        "executor_stage_in_flight",
+        "gauge",
+        "Predict executor stages queued or running",
+        [({"stage": s.stage}, s.queued + s.in_flight) for s in stages],
+    )
+
+    model_cache = get_model_cache().stats()
+    yield MetricFamily(
+        "model_cache_requests_total",
+        "counter",
+        "Model cache lookups",
+        [({"result": "hit"}, model_cache.hits), ({"result": "miss"}, model_cache.misses)],
+    )
+    yield MetricFamily("model_cache_bytes", "gauge", "Bytes of cached models", [({}, model_cache.current_bytes)])
+
+    upload_cache = get_upload_cache().stats()
+    yield MetricFamily(
+        "upload_cache_requests_total",
+        "counter",
+        "Upload cache lookups",
+        [
+            ({"kind": "frame", "result": "hit"}, upload_cache.frame_hits),
+            ({"kind": "frame", "result": "miss"}, upload_cache.frame_misses),
+            ({"kind": "result", "result": "hit"}, upload_cache.result_hits),
+            ({"kind": "result", "result": "miss"}, upload_cache.result_misses),
+        ],
+    )
+    yield MetricFamily("upload_cache_bytes", "gauge", "Bytes in the upload cache", [({}, upload_cache.bytes)])
+
+    response_cache = get_response_cache().stats()
+    yield MetricFamily(
+        "response_cache_requests_total",
+        "counter",
+        "Asset response cache lookups (not_modified: 304s sent on a matching If-None-Match)",
+        [
+            ({"result": "hit"}, response_cache.hits),
+            ({"result": "miss"}, response_cache.misses),
+            ({"result": "not_modified"}, response_cache.not_modified),
+        ],
+    )
+    yield MetricFamily(
+        "response_cache_invalidations_total",
+        "counter",
+        "Asset response cache entries invalidated by writes",
+        [({}, response_cache.invalidations)],
+    )
+    yield MetricFamily("response_cache_bytes", "gauge", "Bytes in the asset response cache", [({}, response_cache.bytes)])
+
+    ingest = get_ingest_service().stats()
+    yield MetricFamily(
+        "ingest_readings_total",
+        "counter",
+        "Readings scored by live ingestion",
+        [({"model_id": s.model_id}, s.readings) for s in ingest],
+    )
+    yield MetricFamily(
+        "ingest_queued_chunks",
+        "gauge",
+        "Ingestion chunks waiting for a micro-batch",
+        [({"model_id": s.model_id}, s.queued_chunks) for s in ingest],
+    )
+
+    jobs: dict[str, int] = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+    for job in get_training_job_manager().list():
+        jobs[job.state] = jobs.get(job.state, 0) + 1
+    yield MetricFamily(
+        "training_jobs",
+        "gauge",
+        "Training jobs by state (finished jobs within TRAIN_JOB_HISTORY)",
+        [({"state": state}, n) for state, n in jobs.items()],
+    )
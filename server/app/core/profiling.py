@@ -0,0 +1,266 @@
+"""
+Opt-in per-request profiling of `/api/v1` routes.
+
+With `PROFILING_ENABLED`, a request carrying `X-Profile: sample` (or `cprofile`) is profiled and
+the profile is stored under the request id (`X-Request-ID`, or a generated one returned in
+`X-Profile-Id`). Profiles are listed and downloaded through `/api/v1/profiles`.
+
+- "sample": a background thread samples the stacks of every thread every
+  `PROFILE_SAMPLE_INTERVAL_MS` and writes collapsed stacks (flamegraph.pl / speedscope input).
+  Covers work the request hands to executor and threadpool threads; concurrent requests show up
+  too, under their own thread names.
+- "cprofile": deterministic `cProfile` of the thread serving the request, saved as pstats. For
+  async routes that is the event-loop thread only (executor stages appear as awaits), including
+  other coroutines interleaved with the request. One at a time per process.
+
+Stored profiles are capped by count and total size (oldest deleted first).
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Optional
+from uuid import uuid4
+
+from app.core.config import get_settings
+
+PROFILE_MODES: tuple[str, ...] = ("sample", "cprofile")
+
+_SUFFIXES = {"sample": ".collapsed", "cprofile": ".pstats"}
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# Stack leaves of threads that are parked, not working (idle pool workers, the event loop's select).
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+# One deterministic profiler per process at a time; overlapping cprofile requests run unprofiled.
+_CPROFILE_LOCK = threading.Lock()
+
+
+def default_profile_dir() -> Path:
+    return Path(__file__).resolve().parent / "artifacts" / "profiles"
+
+
+@dataclass(frozen=True)
+class ProfileInfo:
+    profile_id: str
+    mode: str
+    method: str
+    path: str
+    status: int
+    seconds: float
+    bytes: int
+    created_at: datetime
+
+
+class StackSampler:
+    """Samples all threads' Python stacks at a fixed interval and aggregates collapsed stacks."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval = max(float(interval_seconds), 0.0005)
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> bytes:
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(self.stacks.items())).encode("utf-8")
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(frames))] += 1
+
+
+def _short_path(filename: str) -> str:
+    # Keep stacks readable: paths relative to site-packages or the app package.
+    idx = filename.rfind("site-packages/")
+    if idx != -1:
+        return filename[idx + len("site-packages/") :]
+    idx = filename.rfind("/app/")
+    if idx != -1:
+        return filename[idx + 1 :]
+    return os.path.basename(filename)
+
+
+class ProfileStore:
+    """Profiles on disk (`{id}{suffix}` plus `{id}.json` metadata), capped by count and bytes."""
+
+    def __init__(self, root: Path, *, max_files: int, max_bytes: int) -> None:
+        self.root = root
+        self.max_files = max(int(max_files), 1)
+        self.max_bytes = max(int(max_bytes), 0)
+        self._lock = threading.Lock()
+
+    def save(self, info: ProfileInfo, data: bytes) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._delete(info.profile_id)
+            (self.root / f"{info.profile_id}{_SUFFIXES[info.mode]}").write_bytes(data)
+            meta = asdict(info)
+            meta["created_at"] = info.created_at.isoformat()
+            (self.root / f"{info.profile_id}.json").write_text(json.dumps(meta), encoding="utf-8")
+            self._enforce_retention()
+
+    def list(self) -> list[ProfileInfo]:
+        infos = []
+        for meta_path in self.root.glob("*.json") if self.root.exists() else ():
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                meta["created_at"] = datetime.fromisoformat(meta["created_at"])
+                infos.append(ProfileInfo(**meta))
+            except (OSError, ValueError, TypeError):
+                continue
+        return sorted(infos, key=lambda i: i.created_at, reverse=True)
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        if not _REQUEST_ID.match(profile_id):
+            return None
+        for suffix in _SUFFIXES.values():
+            candidate = self.root / f"{profile_id}{suffix}"
+            if candidate.exists():
+                return candidate
+        return None
+
+    def delete(self, profile_id: str) -> bool:
+        if not _REQUEST_ID.match(profile_id):
+            return False
+        with self._lock:
+            return self._delete(profile_id)
+
+    def _delete(self, profile_id: str) -> bool:
+        found = False
+        for suffix in (*_SUFFIXES.values(), ".json"):
+            path = self.root / f"{profile_id}{suffix}"
+            if path.exists():
+                path.unlink(missing_ok=True)
+                found = True
+        return found
+
+    def _enforce_retention(self) -> None:
+        infos = sorted(self.list(), key=lambda i: i.created_at)
+        total = sum(i.bytes for i in infos)
+        while infos and (len(infos) > self.max_files or total > self.max_bytes):
+            oldest = infos.pop(0)
+            total -= oldest.bytes
+            self._delete(oldest.profile_id)
+
+
+@lru_cache
+def get_profile_store() -> ProfileStore:
+    settings = get_settings()
+    return ProfileStore(
+        Path(settings.PROFILE_DIR) if settings.PROFILE_DIR else default_profile_dir(),
+        max_files=settings.PROFILE_MAX_FILES,
+        max_bytes=settings.PROFILE_MAX_BYTES,
+    )
+
+
+def _header(scope: dict, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1").strip()
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling opted-in `/api/v1` requests (see module docstring)."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        settings = get_settings()
+        mode = _header(scope, b"x-profile") if scope["type"] == "http" and settings.PROFILING_ENABLED else None
+        path = scope.get("path", "") if mode else ""
+        if not mode or not path.startswith("/api/v1") or path.startswith("/api/v1/profiles"):
+            await self.app(scope, receive, send)
+            return
+        if settings.PROFILE_TOKEN and _header(scope, b"x-profile-token") != settings.PROFILE_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        mode = "sample" if mode.lower() in ("1", "true", "sample") else mode.lower()
+        if mode not in PROFILE_MODES or (mode == "cprofile" and not _CPROFILE_LOCK.acquire(blocking=False)):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _header(scope, b"x-request-id") or ""
+        profile_id = request_id if _REQUEST_ID.match(request_id) else uuid4().hex
+        status = {"code": 500}
+
+        async def send_wrapper(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000) if mode == "sample" else None
+        profiler = cProfile.Profile() if mode == "cprofile" else None
+        started = perf_counter()
+        if sampler is not None:
+            sampler.start()
+        else:
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = perf_counter() - started
+            if sampler is not None:
+                sampler.stop()
+                data = sampler.collapsed()
+            else:
+                profiler.disable()
+                _CPROFILE_LOCK.release()
+                data = _pstats_bytes(profiler)
+            get_profile_store().save(
+                ProfileInfo(
+                    profile_id=profile_id,
+                    mode=mode,
+                    method=scope.get("method", ""),
+                    path=path,
+                    status=status["code"],
+                    seconds=seconds,
+                    bytes=len(data),
+                    created_at=datetime.utcnow(),
+                ),
+                data,
+            )
+
+
+def _pstats_bytes(profiler: cProfile.Profile) -> bytes:
+    import marshal
+
+    # Same format as `Profile.dump_stats` (loadable with pstats.Stats / snakeviz).
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.core.config import get_settings
+
+
+@dataclass(frozen=True)
+class EstimatorBackend:
+    name: str
+    description: str
+    build: Callable[[], Any]
+    # Default search space for `model_search` (estimator parameter -> candidate values).
+    param_grid: dict[str, list[Any]] = field(default_factory=dict)
+    # Can be trained chunk by chunk (`partial_fit`) by out-of-core training (see `streaming_training`).
+    incremental: bool = False
+
+
+def _random_forest() -> Any:
+    return RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1)
+
+
+def _hist_gradient_boosting() -> Any:
+    # Bins features once (256 bins) and grows trees on histograms: fit time is roughly linear in
+    # rows and the model stays small, so it scales to multi-million-row datasets.
+    return HistGradientBoostingClassifier(max_iter=200, learning_rate=0.1, early_stopping="auto", random_state=42)
+
+
+def _logistic() -> Any:
+    return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1_000))
+
+
+def _sgd_logistic() -> Any:
+    # Logistic loss fitted by SGD: supports `partial_fit`, so it can learn from chunks of an
+    # upload that does not fit in memory.
+    return make_pipeline(StandardScaler(), SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42))
+
+
+ESTIMATORS: dict[str, EstimatorBackend] = {
+    b.name: b
+    for b in (
+        EstimatorBackend(
+            "random_forest",
+            "Random forest, 200 trees (default)",
+            _random_forest,
+            {"n_estimators": [100, 200], "min_samples_leaf": [1, 5, 20], "max_features": [0.3, 0.6, 1.0]},
+        ),
+        EstimatorBackend(
+            "hist_gradient_boosting",
+            "Histogram gradient boosting, fast on large datasets",
+            _hist_gradient_boosting,
+            {"learning_rate": [0.05, 0.1, 0.2], "max_leaf_nodes": [15, 31, 63], "l2_regularization": [0.0, 1.0]},
+        ),
+        EstimatorBackend(
+            "logistic",
+            "Standardized logistic regression, compact linear baseline",
+            _logistic,
+            {"logisticregression__C": [0.01, 0.1, 1.0, 10.0]},
+        ),
+        EstimatorBackend(
+            "sgd_logistic",
+            "Logistic regression fitted by SGD, trainable chunk by chunk (out-of-core)",
+            _sgd_logistic,
+            {"sgdclassifier__alpha": [1e-5, 1e-4, 1e-3]},
+            incremental=True,
+        ),
+    )
+}
+
+
+def get_estimator_backend(name: Optional[str] = None) -> EstimatorBackend:
+    """Backend by name (defaults to `TRAIN_ESTIMATOR`); ValueError for unknown names."""
+    name = name or get_settings().TRAIN_ESTIMATOR
+    backend = ESTIMATORS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown estimator: {name} (expected one of: {', '.join(ESTIMATORS)})")
+    return backend
+
+
+def backend_name_for_model(model: Any) -> Optional[str]:
+    """
+    Name of the backend `model` was trained with (None if unknown).
+
+    Read from the `estimator_name_` attribute stored at training time. Artifacts saved before it
+    existed are matched by estimator type, comparing pipeline steps too (so "logistic" and
+    "sgd_logistic" pipelines are told apart).
+    """
+    name = getattr(model, "estimator_name_", None)
+    if name:
+        return name
+    signature = _estimator_signature(model)
+    for backend in ESTIMATORS.values():
+        if _estimator_signature(backend.build()) == signature:
+            return backend.name
+    return None
+
+
+def _estimator_signature(model: Any) -> tuple[type, ...]:
+    steps = getattr(model, "steps", None)
+    if steps is not None:
+        return (type(model), *(type(step) for _, step in steps))
+    return (type(model),)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+
+SENSOR_COLUMNS: tuple[str, ...] = ("temperature", "vibration", "pressure", "current")
+# Columns of the per-asset reading tails (see `FeatureTailStore`).
+TAIL_COLUMNS: tuple[str, ...] = ("timestamp", "asset_id", *SENSOR_COLUMNS)
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    Time-series features computed per asset from the raw sensor columns.
+
+    For every sensor: the raw value, rolling mean/std/min/max over the last `window` readings,
+    lagged values and the average per-reading slope across the window. Early rows use whatever
+    history is available (partial windows; lags fall back to the current value).
+
+    The spec used for training is stored on the model artifact (`feature_spec_`), so prediction
+    recomputes exactly the same features.
+    """
+
+    window: int = 6
+    lags: tuple[int, ...] = (1, 2)
+
+    @property
+    def feature_names(self) -> list[str]:
+        names = list(SENSOR_COLUMNS)
+        for col in SENSOR_COLUMNS:
+            names += [f"{col}_mean_{self.window}", f"{col}_std_{self.window}"]
+            names += [f"{col}_min_{self.window}", f"{col}_max_{self.window}"]
+            names += [f"{col}_lag_{k}" for k in self.lags]
+            names.append(f"{col}_slope_{self.window}")
+        return names
+
+    @property
+    def history_rows(self) -> int:
+        """Readings before a row that its features depend on."""
+        return max([self.window - 1, *self.lags])
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"window": self.window, "lags": list(self.lags)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "FeatureSpec":
+        return cls(window=int(data["window"]), lags=tuple(int(k) for k in data["lags"]))
+
+
+def default_feature_spec() -> Optional[FeatureSpec]:
+    """Spec for new training runs, or None for the raw four sensor columns."""
+    settings = get_settings()
+    if not settings.FEATURES_ENABLED:
+        return None
+    lags = tuple(int(k) for k in settings.FEATURE_LAGS.split(",") if k.strip())
+    return FeatureSpec(window=max(settings.FEATURE_WINDOW, 1), lags=lags)
+
+
+def feature_spec_for_model(model: Any) -> Optional[FeatureSpec]:
+    """Feature spec a model was trained with; None for models trained on the raw columns."""
+    data = getattr(model, "feature_spec_", None)
+    return FeatureSpec.from_dict(data) if data else None
+
+
+def attach_feature_spec(model: Any, spec: Optional[FeatureSpec]) -> None:
+    model.feature_spec_ = spec.to_dict() if spec is not None else None
+
+
+def sort_for_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Order rows by (asset_id, timestamp) so each asset's readings are contiguous and in time order."""
+    return df.sort_values(["asset_id", "timestamp"], kind="stable").reset_index(drop=True)
+
+
+def compute_feature_matrix(df: pd.DataFrame, spec: Optional[FeatureSpec]) -> np.ndarray:
+    """
+    Feature matrix (float64, one row per input row) for a frame sorted by `sort_for_features`.
+
+    Vectorized: rolling stats use groupby-rolling, lags/slopes use positional offsets inside each
+    contiguous asset block.
+    """
+    raw = df.loc[:, list(SENSOR_COLUMNS)].to_numpy(dtype=float)
+    if spec is None:
+        return raw
+
+    n = raw.shape[0]
+    groups = df["asset_id"].to_numpy()
+    # Position of each row inside its asset block (input is sorted by asset).
+    block_start = np.r_[True, groups[1:] != groups[:-1]] if n else np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(block_start)
+    pos = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+
+    grouped = pd.DataFrame(raw, columns=list(SENSOR_COLUMNS)).groupby(groups, sort=False)
+    rolling = grouped.rolling(spec.window, min_periods=1)
+
+    def _stat(name: str) -> np.ndarray:
+        out = getattr(rolling, name)()
+        return out.reset_index(level=0, drop=True).sort_index().to_numpy(dtype=float)
+
+    mean, std, vmin, vmax = _stat("mean"), _stat("std"), _stat("min"), _stat("max")
+    std = np.nan_to_num(std, nan=0.0)
+
+    rows = np.arange(n)
+    lagged = []
+    for k in spec.lags:
+        offset = np.minimum(pos, k)
+        lagged.append(raw[rows - offset])
+
+    span = np.minimum(pos, spec.window - 1)
+    slope = (raw - raw[rows - span]) / np.where(span > 0, span, 1)[:, None]
+
+    columns = [raw]
+    for j in range(len(SENSOR_COLUMNS)):
+        columns += [mean[:, j : j + 1], std[:, j : j + 1], vmin[:, j : j + 1], vmax[:, j : j + 1]]
+        columns += [lag[:, j : j + 1] for lag in lagged]
+        columns.append(slope[:, j : j + 1])
+    return np.hstack(columns)
+
+
+def compute_features_in_input_order(df: pd.DataFrame, spec: Optional[FeatureSpec]) -> np.ndarray:
+    """Like `compute_feature_matrix`, for a frame in any row order; rows stay aligned with `df`."""
+    if spec is None:
+        return compute_feature_matrix(df, None)
+    ordered = sort_for_features(df.reset_index(drop=True).rename_axis("_row").reset_index())
+    X = np.empty((len(ordered), len(spec.feature_names)), dtype=float)
+    X[ordered["_row"].to_numpy()] = compute_feature_matrix(ordered, spec)
+    return X
+
+
+class FeatureTailStore:
+    """
+    Compact per-asset buffer of the most recent raw readings, kept in memory.
+
+    Lets a new frame compute window/lag features for its first readings without re-reading the
+    full history: the stored tail is prepended before computing features. Every tail keeps the
+    newest `max_rows` readings by timestamp, whatever order frames arrive in. Process-local (e.g.
+    chunk-to-chunk history within one streamed training upload); predictions use the database-backed
+    `DatabaseFeatureTailStore`.
+    """
+
+    def __init__(self, max_rows: int) -> None:
+        self.max_rows = max(int(max_rows), 0)
+        self._tails: dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def with_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """`df` with the stored tails of its assets prepended (only readings older than the frame)."""
+        if self.max_rows == 0 or df.empty:
+            return df
+        with self._lock, self._transaction() as tx:
+            return _prepend_tails(df, self._read(tx, df["asset_id"].unique().tolist()))
+
+    def update(self, df: pd.DataFrame, *, tx: Any = None) -> None:
+        """
+        Merge the readings of `df` into the stored tails, keeping the newest `max_rows` per asset.
+
+        With `tx` (a Session for `DatabaseFeatureTailStore`), the write joins that transaction and
+        is committed (or rolled back) by its owner, e.g. together with the predictions it backs.
+        """
+        if self.max_rows == 0 or df.empty:
+            return
+        with self._lock, (nullcontext(tx) if tx is not None else self._transaction()) as tx:
+            stored = self._read(tx, df["asset_id"].unique().tolist())
+            self._write(tx, stored, _newest_rows(stored, df, self.max_rows))
+
+    def extend(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        `with_history(df)` followed by `update` with the result, as one step: no other update of
+        the same store lands in between, so concurrent requests never read a tail that is then
+        overwritten with older rows.
+        """
+        if self.max_rows == 0 or df.empty:
+            return df
+        with self._lock, self._transaction() as tx:
+            stored = self._read(tx, df["asset_id"].unique().tolist())
+            combined = _prepend_tails(df, stored)
+            self._write(tx, stored, _newest_rows(stored, combined, self.max_rows))
+        return combined
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tails)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Any]:
+        yield None
+
+    def _read(self, tx: Any, asset_ids: list[str]) -> pd.DataFrame:
+        tails = [tail for a in asset_ids if (tail := self._tails.get(str(a))) is not None]
+        if not tails:
+            return pd.DataFrame(columns=list(TAIL_COLUMNS))
+        return pd.concat(tails, ignore_index=True)
+
+    def _write(self, tx: Any, stored: pd.DataFrame, newest: pd.DataFrame) -> None:
+        for asset_id, tail in newest.groupby("asset_id", sort=False):
+            self._tails[str(asset_id)] = tail.reset_index(drop=True)
+
+
+class DatabaseFeatureTailStore(FeatureTailStore):
+    """
+    `FeatureTailStore` backed by the `asset_reading_tail` table, shared by every worker process.
+
+    `extend` reads and writes the tails in one transaction; the table keeps the newest readings by
+    timestamp even when several processes write the same asset at once (see
+    `add_reading_tails`). Survives restarts.
+    """
+
+    def __init__(self, max_rows: int, session_factory: Callable[[], Any]) -> None:
+        super().__init__(max_rows)
+        self._session_factory = session_factory
+
+    def __len__(self) -> int:
+        from sqlalchemy import func, select
+
+        from app.models.asset_reading_tail import AssetReadingTail
+
+        with self._session_factory() as db:
+            return int(db.scalar(select(func.count(func.distinct(AssetReadingTail.asset_id)))) or 0)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Any]:
+        db = self._session_factory()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _read(self, tx: Any, asset_ids: list[str]) -> pd.DataFrame:
+        from app.crud.asset_reading_tail import get_reading_tails
+
+        return get_reading_tails(tx, asset_ids)
+
+    def _write(self, tx: Any, stored: pd.DataFrame, newest: pd.DataFrame) -> None:
+        from app.crud.asset_reading_tail import add_reading_tails
+
+        if not stored.empty:
+            known = pd.MultiIndex.from_frame(stored.loc[:, ["asset_id", "timestamp"]])
+            newest = newest[~pd.MultiIndex.from_frame(newest.loc[:, ["asset_id", "timestamp"]]).isin(known)]
+        add_reading_tails(tx, newest, max_rows=self.max_rows)
+
+
+def _prepend_tails(df: pd.DataFrame, stored: pd.DataFrame) -> pd.DataFrame:
+    # Only stored readings older than each asset's first reading in `df` are history.
+    if stored.empty:
+        return df
+    first_ts = df.groupby("asset_id", sort=False)["timestamp"].min()
+    older = stored[stored["timestamp"] < stored["asset_id"].map(first_ts)]
+    if older.empty:
+        return df
+    return pd.concat([older, df.loc[:, list(TAIL_COLUMNS)]], ignore_index=True)
+
+
+def _newest_rows(stored: pd.DataFrame, df: pd.DataFrame, max_rows: int) -> pd.DataFrame:
+    # Newest `max_rows` readings per asset of stored tails + `df` (by timestamp; `df` wins ties).
+    frames = [f.loc[:, list(TAIL_COLUMNS)] for f in (stored, df) if not f.empty]
+    merged = pd.concat(frames, ignore_index=True).drop_duplicates(["asset_id", "timestamp"], keep="last")
+    return sort_for_features(merged).groupby("asset_id", sort=False).tail(max_rows).reset_index(drop=True)
+
+
+@lru_cache
+def get_feature_tail_store() -> FeatureTailStore:
+    from app.core.db.dp import SessionLocal
+
+    return DatabaseFeatureTailStore(max_rows=get_settings().FEATURE_TAIL_ROWS, session_factory=SessionLocal)
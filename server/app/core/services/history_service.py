@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime, timezone
+from typing import Literal, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.services.predict_service import risk_levels_from_probabilities
+from app.crud.assets import (
+    count_prediction_history,
+    get_prediction_history_bounds,
+    get_prediction_history_buckets,
+    get_prediction_history_extremes,
+    get_prediction_history_page,
+    get_predictions_by_ids,
+    iter_prediction_history_points,
+)
+from app.schemas.asset import AssetHistoryResponse, HistoryBucket, HistoryPoint
+
+HistoryMode = Literal["raw", "lttb", "buckets"]
+
+_EPOCH = datetime(1970, 1, 1)
+
+# LTTB runs over the per-bucket min/max rows of `points * _LTTB_BUCKETS_PER_POINT` SQL buckets.
+_LTTB_BUCKETS_PER_POINT = 4
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{ts.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ts_text, id_text = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(ts_text), int(id_text)
+    except Exception as e:
+        raise ValueError("Invalid history cursor") from e
+
+
+def _naive_utc(ts: Optional[datetime]) -> Optional[datetime]:
+    # Prediction timestamps are stored as naive UTC.
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of `n_out` points that preserve the
+    visual shape of the (x, y) series. Keeps the first and last point.
+    """
+    n = int(x.shape[0])
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("LTTB needs at least 3 output points")
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex.
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+def _history_point(p) -> HistoryPoint:
+    return HistoryPoint(
+        model_id=p.model_id,
+        timestamp=p.timestamp,
+        risk_level=p.risk_level,  # type: ignore[arg-type]
+        failure_probability=p.failure_probability,
+    )
+
+
+def get_asset_history(
+    db: Session,
+    asset_id: str,
+    *,
+    mode: HistoryMode = "raw",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 500,
+    points: int = 200,
+) -> AssetHistoryResponse:
+    """
+    Prediction history for one asset in [start, end).
+
+    - raw: keyset-paginated rows (`limit` per page, `cursor` from the previous `next_cursor`).
+    - buckets: `points` equal-width time buckets with min/max/mean, aggregated in SQL, so the cost
+      in rows returned is bounded by `points` regardless of history length.
+    - lttb: `points` representative rows chosen with LTTB. Long ranges are first reduced in SQL to
+      the lowest- and highest-probability row of `points * 4` time buckets, so at most `8 * points`
+      rows reach Python; shorter ranges are streamed whole.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise ValueError("start must be before end")
+
+    if mode == "raw":
+        after = decode_cursor(cursor) if cursor else None
+        rows = get_prediction_history_page(db, asset_id, start=start, end=end, after=after, limit=limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+        return AssetHistoryResponse(
+            asset_id=asset_id, mode=mode, points=[_history_point(p) for p in rows], next_cursor=next_cursor
+        )
+
+    if mode == "buckets":
+        first, last = get_prediction_history_bounds(db, asset_id, start=start, end=end)
+        if first is None or last is None:
+            return AssetHistoryResponse(asset_id=asset_id, mode=mode)
+        rows = get_prediction_history_buckets(db, asset_id, start=first, end=last, buckets=points)
+        max_p = np.array([r.max_p for r in rows], dtype=float)
+        risks = risk_levels_from_probabilities(max_p)
+        return AssetHistoryResponse(
+            asset_id=asset_id,
+            mode=mode,
+            buckets=[
+                HistoryBucket(
+                    start=r.first_ts,
+                    end=r.last_ts,
+                    count=r.count,
+                    min_failure_probability=r.min_p,
+                    max_failure_probability=r.max_p,
+                    mean_failure_probability=r.mean_p,
+                    risk_level=risk,
+                )
+                for r, risk in zip(rows, risks.tolist())
+            ],
+        )
+
+    budget = points * _LTTB_BUCKETS_PER_POINT
+    if count_prediction_history(db, asset_id, start=start, end=end) <= 2 * budget:
+        candidates = iter_prediction_history_points(db, asset_id, start=start, end=end)
+    else:
+        first, last = get_prediction_history_bounds(db, asset_id, start=start, end=end)
+        candidates = get_prediction_history_extremes(db, asset_id, start=first, end=last, buckets=budget)
+
+    ids, xs, ys = [], [], []
+    for row_id, ts, p in candidates:
+        ids.append(row_id)
+        xs.append((ts - _EPOCH).total_seconds())
+        ys.append(p)
+    if not ids:
+        return AssetHistoryResponse(asset_id=asset_id, mode=mode)
+    keep = lttb_indices(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float), points)
+    id_arr = np.asarray(ids, dtype=np.int64)
+    rows = get_predictions_by_ids(db, id_arr[keep].tolist())
+    return AssetHistoryResponse(asset_id=asset_id, mode=mode, points=[_history_point(p) for p in rows])
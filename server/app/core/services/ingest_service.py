@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Optional
+
+import pandas as pd
+
+from app.core.config import get_settings
+from app.core.db.dp import SessionLocal
+from app.core.services.predict_service import (
+    REQUIRED_INFERENCE_COLUMNS,
+    AssessmentColumns,
+    advance_feature_tails,
+    load_model,
+    score_readings,
+    validate_inference_dataframe,
+)
+from app.core.services.stage_executor import StageExecutor, get_predict_executor
+from app.crud.prediction import create_predictions_from_columns
+
+
+@dataclass(frozen=True)
+class IngestStats:
+    model_id: str
+    queued_chunks: int
+    batches: int
+    readings: int
+    failed_batches: int
+
+
+def parse_ndjson_readings(payload: bytes) -> pd.DataFrame:
+    """
+    Parse NDJSON readings (one JSON object per line, `REQUIRED_INFERENCE_COLUMNS` keys) and
+    validate them like an inference CSV. Blank lines are ignored.
+    """
+    if not payload.strip():
+        return validate_inference_dataframe(pd.DataFrame(columns=list(REQUIRED_INFERENCE_COLUMNS)))
+    try:
+        df = pd.read_json(io.BytesIO(payload), lines=True, dtype={"asset_id": str}, convert_dates=False)
+    except ValueError as e:
+        raise ValueError("Unable to parse NDJSON readings") from e
+    return validate_inference_dataframe(df)
+
+
+def parse_json_readings(text: str) -> pd.DataFrame:
+    """Readings sent as one JSON object, a JSON array of objects, or NDJSON lines."""
+    stripped = text.strip()
+    if stripped.startswith("["):
+        try:
+            records = json.loads(stripped)
+        except ValueError as e:
+            raise ValueError("Unable to parse JSON readings") from e
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise ValueError("Expected a JSON array of reading objects")
+        df = pd.DataFrame.from_records(records)
+        if "asset_id" in df.columns:
+            df["asset_id"] = df["asset_id"].astype(str)
+        return validate_inference_dataframe(df)
+    return parse_ndjson_readings(stripped.encode("utf-8"))
+
+
+async def iter_ndjson_chunks(stream: AsyncIterator[bytes], *, max_lines: int) -> AsyncIterator[bytes]:
+    """Regroup a byte stream into blocks of at most `max_lines` complete NDJSON lines."""
+    pending = b""
+    lines: list[bytes] = []
+    async for data in stream:
+        pending += data
+        *complete, pending = pending.split(b"\n")
+        lines.extend(complete)
+        while len(lines) >= max_lines:
+            yield b"\n".join(lines[:max_lines])
+            lines = lines[max_lines:]
+    if pending.strip():
+        lines.append(pending)
+    if lines:
+        yield b"\n".join(lines)
+
+
+@dataclass
+class _Pending:
+    readings: pd.DataFrame
+    future: asyncio.Future
+
+
+class MicroBatcher:
+    """
+    Collects validated readings for one model into micro-batches and scores them.
+
+    A batch is flushed once it holds `batch_size` readings or `max_latency_ms` after its first
+    reading arrived, whichever comes first. Each batch runs one `predict_proba` call on the
+    cached model and one bulk insert, on the predict executor. Submitters wait on a bounded
+    queue of `queue_max` chunks, so slow scoring pushes back on producers instead of buffering
+    without limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_id: str,
+        batch_size: int,
+        max_latency_ms: int,
+        queue_max: int,
+        executor: StageExecutor,
+    ) -> None:
+        self.model_id = model_id
+        self.batch_size = max(int(batch_size), 1)
+        self.max_latency = max(int(max_latency_ms), 0) / 1000.0
+        self._executor = executor
+        self._queue: asyncio.Queue[_Pending] = asyncio.Queue(maxsize=max(int(queue_max), 1))
+        self._task: Optional[asyncio.Task] = None
+        self._batches = 0
+        self._readings = 0
+        self._failed_batches = 0
+
+    async def submit(self, readings: pd.DataFrame) -> list[asyncio.Future]:
+        """
+        Queue validated readings (split into chunks of at most `batch_size`).
+
+        Returns one future per chunk, resolved with its `AssessmentColumns` once the batch holding
+        it has been scored and persisted. Waits while the queue is full.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"ingest-{self.model_id}")
+        loop = asyncio.get_running_loop()
+        futures = []
+        for start in range(0, len(readings), self.batch_size):
+            pending = _Pending(readings.iloc[start : start + self.batch_size], loop.create_future())
+            await self._queue.put(pending)
+            futures.append(pending.future)
+        return futures
+
+    def stats(self) -> IngestStats:
+        return IngestStats(
+            model_id=self.model_id,
+            queued_chunks=self._queue.qsize(),
+            batches=self._batches,
+            readings=self._readings,
+            failed_batches=self._failed_batches,
+        )
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        while not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Ingestion stopped"))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0].readings)
+            deadline = loop.time() + self.max_latency
+            while size < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(pending)
+                size += len(pending.readings)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[_Pending]) -> None:
+        readings = pd.concat([p.readings for p in batch], ignore_index=True)
+        try:
+            columns = await self._executor.run("ingest_batch", self._score_and_persist, readings)
+        except Exception as e:
+            self._failed_batches += 1
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+
+        self._batches += 1
+        self._readings += len(readings)
+        offset = 0
+        for p in batch:
+            n = len(p.readings)
+            if not p.future.done():
+                p.future.set_result(columns.slice(offset, offset + n))
+            offset += n
+
+    def _score_and_persist(self, readings: pd.DataFrame) -> AssessmentColumns:
+        db = SessionLocal()
+        try:
+            model = load_model(model_id=self.model_id, db=db)
+            result = score_readings(model=model, model_id=self.model_id, df=readings)
+            columns = result.columns
+            create_predictions_from_columns(
+                db,
+                model_id=self.model_id,
+                asset_ids=columns.asset_id,
+                timestamps=columns.timestamp,
+                failure_probabilities=columns.failure_probability,
+                risk_levels=columns.risk_level,
+                commit=False,
+            )
+            # The feature tails move in the same transaction as the predictions.
+            advance_feature_tails(db, [result])
+            db.commit()
+            return columns
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+class IngestService:
+    """One `MicroBatcher` per model_id, created on first use (all on the running event loop)."""
+
+    def __init__(self) -> None:
+        self._batchers: dict[str, MicroBatcher] = {}
+        self._lock = threading.Lock()
+
+    def batcher(self, model_id: str) -> MicroBatcher:
+        with self._lock:
+            batcher = self._batchers.get(model_id)
+            if batcher is None:
+                settings = get_settings()
+                batcher = self._batchers[model_id] = MicroBatcher(
+                    model_id=model_id,
+                    batch_size=settings.INGEST_BATCH_SIZE,
+                    max_latency_ms=settings.INGEST_MAX_LATENCY_MS,
+                    queue_max=settings.INGEST_QUEUE_MAX,
+                    executor=get_predict_executor(),
+                )
+            return batcher
+
+    async def ensure_model(self, model_id: str) -> None:
+        """Fail fast (ValueError) for unknown model_ids; also warms the model cache."""
+
+        def _load() -> Any:
+            db = SessionLocal()
+            try:
+                return load_model(model_id=model_id, db=db)
+            finally:
+                db.close()
+
+        await get_predict_executor().run("load_model", _load)
+
+    def stats(self) -> list[IngestStats]:
+        with self._lock:
+            batchers = sorted(self._batchers.values(), key=lambda b: b.model_id)
+        return [b.stats() for b in batchers]
+
+    async def close(self) -> None:
+        with self._lock:
+            batchers = list(self._batchers.values())
+            self._batchers.clear()
+        for b in batchers:
+            await b.close()
+
+
+@lru_cache
+def get_ingest_service() -> IngestService:
+    return IngestService()
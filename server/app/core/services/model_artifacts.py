@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.services.model_cache import get_model_cache
+from app.core.services.tree_engine import CompiledForest, compile_forest, load_compiled_forest, save_compiled_forest
+
+ARTIFACTS_DIR = Path(__file__).resolve().parents[1] / "artifacts" / "models"
+
+# Estimator attributes the serving path needs without loading the full estimator.
+_SERVING_ATTRIBUTES: tuple[str, ...] = ("feature_spec_", "inference_engine_")
+
+
+def default_artifact_path(model_id: str) -> Path:
+    return ARTIFACTS_DIR / f"{model_id}.joblib"
+
+
+def forest_sidecar_path(model_path: Path) -> Path:
+    """Directory holding the memory-mappable compiled forest of a `.joblib` artifact."""
+    return model_path.with_suffix(".forest")
+
+
+def write_forest_sidecar(model: Any, model_path: Path) -> Optional[Path]:
+    """
+    Store the compiled form of a tree ensemble next to its artifact (None for other estimators).
+
+    Written to a temporary directory and renamed, so readers never see a partial sidecar.
+    """
+    try:
+        compiled = compile_forest(model)
+    except ValueError:
+        return None
+    target = forest_sidecar_path(model_path)
+    tmp = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    save_compiled_forest(compiled, tmp)
+    attributes = {name: getattr(model, name, None) for name in _SERVING_ATTRIBUTES}
+    (tmp / "attributes.json").write_text(json.dumps(attributes), encoding="utf-8")
+    shutil.rmtree(target, ignore_errors=True)
+    tmp.rename(target)
+    return target
+
+
+def save_model_artifact(model: Any, model_id: str) -> Path:
+    """
+    Persist a trained model: an uncompressed joblib dump, plus a memory-mappable compiled
+    forest sidecar for tree ensembles.
+    """
+    ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+    model_path = default_artifact_path(model_id)
+    joblib.dump(model, model_path)
+    if get_settings().MODEL_MMAP:
+        write_forest_sidecar(model, model_path)
+    return model_path
+
+
+def artifact_size_bytes(model_path: Path) -> int:
+    """Bytes on disk for an artifact, including its compiled forest sidecar."""
+    size = model_path.stat().st_size
+    sidecar = forest_sidecar_path(model_path)
+    if sidecar.exists():
+        size += sum(f.stat().st_size for f in sidecar.iterdir())
+    return size
+
+
+class MappedForestModel:
+    """
+    Serving view of a forest artifact backed by its memory-mapped compiled sidecar.
+
+    Batches of any size are scored from the shared, read-only mapped arrays (see `tree_engine`),
+    so N workers x M hot models do not each hold a private copy of every forest. The engine stored
+    on the artifact only applies when it is loaded without its sidecar: the compiled arrays give
+    the same probabilities as sklearn, so the full estimator is only loaded when a request asks for
+    `engine=sklearn` explicitly; its size is then added to the model's model-cache entry.
+    """
+
+    def __init__(self, *, compiled: CompiledForest, attributes: dict[str, Any], model_path: Path) -> None:
+        self.compiled_forest_ = compiled
+        self.classes_ = compiled.classes
+        self.n_features_in_ = compiled.n_features
+        self.feature_spec_ = attributes.get("feature_spec_")
+        # Always the compiled engine, whatever was stored: that is what keeps memory shared.
+        self.inference_engine_ = "compiled"
+        self.model_path = model_path
+        self._estimator: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def estimator(self) -> Any:
+        if self._estimator is None:
+            with self._lock:
+                if self._estimator is None:
+                    self._estimator = joblib.load(self.model_path, mmap_mode="r")
+                    # A private copy in this worker: charge it to the model cache budget.
+                    get_model_cache().charge(self, self.model_path.stat().st_size)
+        return self._estimator
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.estimator.predict_proba(X)
+
+
+def load_estimator(model_path: Path) -> Any:
+    """Private, writable copy of the full sklearn estimator (e.g. to continue training it)."""
+    return joblib.load(model_path)
+
+
+def load_model_artifact(model_path: Path) -> tuple[Any, int]:
+    """
+    Load a model artifact; returns (model, bytes to charge to the model cache).
+
+    With `MODEL_MMAP` and a compiled sidecar, returns a `MappedForestModel` over memory-mapped
+    arrays; otherwise the joblib artifact, with numpy arrays memory-mapped where joblib can.
+    """
+    sidecar = forest_sidecar_path(model_path)
+    if get_settings().MODEL_MMAP and (sidecar / "meta.json").exists():
+        compiled = load_compiled_forest(sidecar, mmap_mode="r")
+        attributes_file = sidecar / "attributes.json"
+        attributes = json.loads(attributes_file.read_text(encoding="utf-8")) if attributes_file.exists() else {}
+        return MappedForestModel(compiled=compiled, attributes=attributes, model_path=model_path), compiled.nbytes
+    model = joblib.load(model_path, mmap_mode="r" if get_settings().MODEL_MMAP else None)
+    return model, model_path.stat().st_size
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
+
+from app.core.config import get_settings
+
+
+@dataclass(frozen=True)
+class ModelCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    current_bytes: int
+    max_bytes: int
+
+
+@dataclass
+class _CacheEntry:
+    model: Any
+    nbytes: int
+
+
+class ModelCache:
+    """
+    Process-wide LRU cache of loaded model artifacts, keyed by model_id.
+
+    The budget is expressed in bytes and uses the artifact size on disk as the
+    memory estimate (joblib dumps are uncompressed, so this tracks the in-memory
+    footprint closely); memory a cached model allocates later is added with `charge`.
+    Concurrent misses for the same model_id are collapsed into a single load; other callers
+    wait for it and then read the cached entry.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(int(max_bytes), 0)
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        # One lock per model_id currently being loaded (single-flight loading).
+        self._load_locks: dict[str, threading.Lock] = {}
+        # Bumped on invalidation so an in-flight load cannot re-insert a stale model.
+        self._generations: dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.model
+
+    def get_or_load(self, key: str, loader: Callable[[], tuple[Any, int]]) -> Any:
+        """
+        Return the cached model for `key`, calling `loader()` on a miss.
+
+        `loader` must return `(model, nbytes)`.
+        """
+        model = self.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    # Another caller finished loading while we were waiting.
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry.model
+                self._misses += 1
+                generation = self._generations.get(key, 0)
+
+            try:
+                model, nbytes = loader()
+            except BaseException:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+                raise
+
+            # Insert before releasing the key: a caller arriving now finds either the entry or
+            # this load lock, never neither (which would start a second load).
+            with self._lock:
+                if self._generations.get(key, 0) == generation:
+                    self._insert(key, model, int(nbytes))
+                self._load_locks.pop(key, None)
+            return model
+
+    def charge(self, model: Any, nbytes: int) -> bool:
+        """
+        Add `nbytes` to the entry holding `model` (memory it allocated after being cached, e.g. a
+        lazily loaded estimator), evicting other entries to stay within budget. An entry that no
+        longer fits is dropped. Returns whether `model` is still cached.
+        """
+        with self._lock:
+            key = next((k for k, e in self._entries.items() if e.model is model), None)
+            if key is None:
+                return False
+            entry = self._entries.pop(key)
+            self._current_bytes -= entry.nbytes
+            self._insert(key, model, entry.nbytes + int(nbytes))
+            return key in self._entries
+
+    def invalidate(self, key: str) -> bool:
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._current_bytes -= entry.nbytes
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in self._entries:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> ModelCacheStats:
+        with self._lock:
+            return ModelCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                current_bytes=self._current_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def _insert(self, key: str, model: Any, nbytes: int) -> None:
+        # Models larger than the whole budget are served but never cached.
+        if nbytes > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._current_bytes -= previous.nbytes
+
+        while self._entries and self._current_bytes + nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._current_bytes -= evicted.nbytes
+            self._evictions += 1
+
+        self._entries[key] = _CacheEntry(model=model, nbytes=nbytes)
+        self._current_bytes += nbytes
+
+
+@lru_cache
+def get_model_cache() -> ModelCache:
+    return ModelCache(max_bytes=get_settings().MODEL_CACHE_MAX_BYTES)
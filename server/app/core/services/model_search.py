@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import json
+import math
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Literal, Optional
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+
+from app.core.config import get_settings
+from app.core.services.estimators import get_estimator_backend
+
+# Per-process cap on search workers, set in training job worker processes (see `limit_search_workers`).
+_search_workers_cap: Optional[int] = None
+
+
+def limit_search_workers(cap: Optional[int]) -> None:
+    """
+    Cap the search pool of this process at `cap` workers (None: `SEARCH_WORKERS` only).
+
+    Training job workers call this at start-up with their share of the cores, so TRAIN_WORKERS
+    concurrent jobs do not each start a pool of `SEARCH_WORKERS` (by default one per core).
+    """
+    global _search_workers_cap
+    _search_workers_cap = None if cap is None else max(int(cap), 1)
+
+
+def search_workers() -> int:
+    """Worker processes of the next search pool: `SEARCH_WORKERS`, within this process's cap."""
+    workers = max(get_settings().SEARCH_WORKERS, 1)
+    if _search_workers_cap is not None:
+        workers = min(workers, _search_workers_cap)
+    return workers
+
+
+@dataclass(frozen=True)
+class SearchConfig:
+    """
+    Opt-in hyperparameter search for a training run.
+
+    `param_grid` maps estimator parameters to candidate values (defaults to the backend's grid).
+    "grid" tries every combination, "random" samples `n_iter` of them. With `early_stopping`,
+    folds are evaluated in rounds and after each round only the better half of the candidates
+    (by mean score so far) continues.
+    """
+
+    mode: Literal["grid", "random"] = "grid"
+    cv_folds: int = 5
+    n_iter: int = 10
+    scoring: str = "roc_auc"
+    early_stopping: bool = False
+    param_grid: Optional[dict[str, list[Any]]] = None
+    random_state: int = 42
+
+
+@dataclass
+class CandidateResult:
+    params: dict[str, Any]
+    fold_scores: list[float] = field(default_factory=list)
+    fit_seconds: list[float] = field(default_factory=list)
+    pruned_after_fold: Optional[int] = None
+
+    @property
+    def mean_score(self) -> float:
+        """Mean fold score; -inf before any fold, NaN when a fold could not be scored."""
+        return float(np.mean(self.fold_scores)) if self.fold_scores else float("-inf")
+
+    @property
+    def rank_score(self) -> float:
+        # Candidates without a finite score rank last.
+        score = self.mean_score
+        return score if math.isfinite(score) else float("-inf")
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-safe row of the search table (non-finite scores become None)."""
+        return {
+            "params": {k: v.item() if isinstance(v, np.generic) else v for k, v in self.params.items()},
+            "mean_score": _finite_or_none(self.mean_score),
+            "fold_scores": [_finite_or_none(s) for s in self.fold_scores],
+            "fit_seconds": float(np.sum(self.fit_seconds)),
+            "folds_evaluated": len(self.fold_scores),
+            "pruned_after_fold": self.pruned_after_fold,
+        }
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    best_params: dict[str, Any]
+    best_score: float
+    candidates: list[CandidateResult]
+    folds: int
+    seconds: float
+
+    def to_metrics(self) -> dict[str, float]:
+        """
+        Summary of the search for `ModelMetadata.metrics`: counts, timing and the best candidate
+        (floats only; non-numeric params are left out). The per-candidate table is `to_table()`,
+        stored next to these under the `search_table` key.
+        """
+        metrics = {
+            "search_candidates": float(len(self.candidates)),
+            "search_folds": float(self.folds),
+            "search_seconds": float(self.seconds),
+        }
+        if math.isfinite(self.best_score):
+            metrics["search_best_score"] = float(self.best_score)
+        metrics.update({f"search_best_{k}": v for k, v in _numeric_params(self.best_params).items()})
+        return metrics
+
+    def to_table(self) -> list[dict[str, Any]]:
+        """One JSON-safe row per candidate, in evaluation order."""
+        return [c.to_dict() for c in self.candidates]
+
+
+def _finite_or_none(value: float) -> Optional[float]:
+    return float(value) if math.isfinite(value) else None
+
+
+def _numeric_params(params: dict[str, Any]) -> dict[str, float]:
+    return {
+        k: float(v)
+        for k, v in params.items()
+        if isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) and math.isfinite(v)
+    }
+
+
+def validate_param_grid(estimator: str, grid: dict[str, list[Any]]) -> None:
+    """
+    Reject unknown parameter names and invalid values for the `estimator` backend (ValueError).
+
+    Every value is set on a fresh estimator and checked against the parameter constraints of the
+    estimator that owns it (pipeline steps included), so bad grids fail the request with a 400
+    instead of failing inside the search pool.
+    """
+    backend = get_estimator_backend(estimator)
+    valid = backend.build().get_params()
+    for name, values in grid.items():
+        if name not in valid:
+            raise ValueError(f"Invalid search parameter for {backend.name}: {name}")
+        owner_name, _, _ = name.rpartition("__")
+        for value in values:
+            model = backend.build()
+            try:
+                model.set_params(**{name: value})
+                owner = model.get_params()[owner_name] if owner_name else model
+                if hasattr(owner, "_validate_params"):
+                    owner._validate_params()
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid value for search parameter {name}: {value!r} ({e})") from e
+
+
+def _candidates(config: SearchConfig, grid: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    if config.mode == "grid":
+        return list(ParameterGrid(grid))
+    if config.mode == "random":
+        return list(ParameterSampler(grid, n_iter=max(config.n_iter, 1), random_state=config.random_state))
+    raise ValueError(f"Unknown search mode: {config.mode} (expected grid or random)")
+
+
+def _evaluate_fold(
+    estimator: str,
+    params: dict[str, Any],
+    x_path: str,
+    y_path: str,
+    n_splits: int,
+    fold: int,
+    random_state: int,
+    scoring: str,
+) -> tuple[float, float]:
+    # Runs in a pool worker: X/y are opened as read-only memory maps, never copied per task.
+    X = np.load(x_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r")
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    train_idx, val_idx = list(splitter.split(np.zeros(y.shape[0]), y))[fold]
+
+    model = get_estimator_backend(estimator).build()
+    model.set_params(**params)
+    if "n_jobs" in model.get_params():
+        # Parallelism comes from the pool; avoid oversubscribing cores.
+        model.set_params(n_jobs=1)
+
+    started = perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_seconds = perf_counter() - started
+    score = float(get_scorer(scoring)(model, X[val_idx], y[val_idx]))
+    return score, fit_seconds
+
+
+def run_search(X: np.ndarray, y: np.ndarray, *, estimator: str, config: SearchConfig) -> SearchResult:
+    """
+    Cross-validated search over `config` for the `estimator` backend.
+
+    (candidate, fold) fits run on a process pool of `search_workers()`; the feature matrix is
+    written once to a temporary .npy file that every worker memory-maps.
+    """
+    started = perf_counter()
+    backend = get_estimator_backend(estimator)
+    grid = config.param_grid or backend.param_grid
+    if not grid:
+        raise ValueError(f"No search space defined for estimator: {backend.name}")
+
+    n_splits = min(int(config.cv_folds), int(np.bincount(y).min()))
+    if n_splits < 2:
+        raise ValueError("Not enough rows per class for k-fold cross-validation")
+
+    # Request grids are validated before the job is submitted; this covers direct callers.
+    validate_param_grid(backend.name, grid)
+    candidates = [CandidateResult(params=p) for p in _candidates(config, grid)]
+
+    active = list(range(len(candidates)))
+    with tempfile.TemporaryDirectory(prefix="search-") as tmp:
+        x_path, y_path = str(Path(tmp) / "X.npy"), str(Path(tmp) / "y.npy")
+        np.save(x_path, np.ascontiguousarray(X, dtype=np.float64))
+        np.save(y_path, np.asarray(y))
+
+        with Parallel(n_jobs=search_workers()) as parallel:
+            for fold in range(n_splits):
+                results = parallel(
+                    delayed(_evaluate_fold)(
+                        backend.name,
+                        candidates[i].params,
+                        x_path,
+                        y_path,
+                        n_splits,
+                        fold,
+                        config.random_state,
+                        config.scoring,
+                    )
+                    for i in active
+                )
+                for i, (score, fit_seconds) in zip(active, results):
+                    candidates[i].fold_scores.append(score)
+                    candidates[i].fit_seconds.append(fit_seconds)
+
+                if config.early_stopping and fold < n_splits - 1 and len(active) > 1:
+                    ranked = sorted(active, key=lambda i: candidates[i].rank_score, reverse=True)
+                    keep = ranked[: math.ceil(len(ranked) / 2)]
+                    for i in ranked[len(keep) :]:
+                        candidates[i].pruned_after_fold = fold
+                    active = sorted(keep)
+
+    best = max(active, key=lambda i: candidates[i].rank_score)
+    return SearchResult(
+        best_params=candidates[best].params,
+        best_score=candidates[best].mean_score,
+        candidates=candidates,
+        folds=n_splits,
+        seconds=perf_counter() - started,
+    )
+
+
+def parse_search_options(
+    *,
+    mode: Optional[str],
+    cv_folds: int = 5,
+    n_iter: int = 10,
+    scoring: str = "roc_auc",
+    early_stopping: bool = False,
+    param_grid_json: Optional[str] = None,
+    estimator: Optional[str] = None,
+) -> Optional[SearchConfig]:
+    """
+    Build a `SearchConfig` from request options (None when no search was requested).
+
+    With `estimator`, a custom `param_grid` is validated against that backend's parameters.
+    """
+    if not mode:
+        return None
+    if mode not in ("grid", "random"):
+        raise ValueError(f"Unknown search mode: {mode} (expected grid or random)")
+    if cv_folds < 2:
+        raise ValueError("cv_folds must be at least 2")
+    try:
+        get_scorer(scoring)
+    except ValueError as e:
+        raise ValueError(f"Unknown scoring: {scoring}") from e
+
+    param_grid = None
+    if param_grid_json:
+        try:
+            param_grid = json.loads(param_grid_json)
+        except ValueError as e:
+            raise ValueError("param_grid must be a JSON object") from e
+        if not isinstance(param_grid, dict) or not all(isinstance(v, list) and v for v in param_grid.values()):
+            raise ValueError("param_grid must map parameter names to non-empty lists of values")
+        if estimator is not None:
+            validate_param_grid(estimator, param_grid)
+
+    return SearchConfig(
+        mode=mode,
+        cv_folds=cv_folds,
+        n_iter=n_iter,
+        scoring=scoring,
+        early_stopping=early_stopping,
+        param_grid=param_grid,
+    )
@@ -1,17 +1,37 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import asyncio
+from dataclasses import dataclass, fields, replace
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable
 
-import joblib
+import numpy as np
 import pandas as pd
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.services.processing_service import read_csv_upload
+from app.core.db.dp import SessionLocal
+from app.core.metrics import stage_timer, timed_stage
+from app.core.services.feature_service import (
+    FeatureSpec,
+    FeatureTailStore,
+    compute_feature_matrix,
+    compute_features_in_input_order,
+    feature_spec_for_model,
+    get_feature_tail_store,
+    sort_for_features,
+)
+from app.core.services.model_artifacts import default_artifact_path, load_model_artifact
+from app.core.services.model_cache import get_model_cache
+from app.core.services.processing_service import InvalidValuesError, read_validated_csv_upload
+from app.core.services.stage_executor import StageExecutor, get_predict_executor
+from app.core.services.tree_engine import predict_proba
+from app.core.services.upload_cache import get_upload_cache, hash_file
+from app.crud.aio import model_metadata as aio_model_metadata
 from app.crud.model_metadata import get_model_by_id
-from app.schemas.prediction import AssetAssessment, PredictionCreate, RiskLevel
+from app.models.model_metadata import ModelMetadata
+from app.schemas.prediction import AssetAssessment, RiskLevel
 
 
 REQUIRED_INFERENCE_COLUMNS: tuple[str, ...] = (
@@ -24,32 +44,141 @@ REQUIRED_INFERENCE_COLUMNS: tuple[str, ...] = (
 )
 
 
+@dataclass(frozen=True)
+class AssessmentColumns:
+    """
+    Per-asset assessment results kept as parallel arrays (one entry per asset).
+
+    Avoids building an `AssetAssessment` + `PredictionCreate` + ORM object per row: the rows are
+    persisted straight from these arrays and the response JSON is serialized column-wise.
+    """
+
+    asset_id: np.ndarray
+    # Naive UTC, microsecond precision (matches what we store in SQLite).
+    timestamp: np.ndarray
+    temperature: np.ndarray
+    vibration: np.ndarray
+    pressure: np.ndarray
+    current: np.ndarray
+    failure_probability: np.ndarray
+    risk_level: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.asset_id.shape[0])
+
+    def slice(self, start: int, stop: int) -> "AssessmentColumns":
+        return AssessmentColumns(**{f.name: getattr(self, f.name)[start:stop] for f in fields(self)})
+
+    @classmethod
+    def concat(cls, parts: Iterable["AssessmentColumns"]) -> "AssessmentColumns":
+        """Join results (e.g. the micro-batch chunks of one message) into one, in order."""
+        parts = list(parts)
+        if len(parts) == 1:
+            return parts[0]
+        return cls(**{f.name: np.concatenate([getattr(p, f.name) for p in parts]) for f in fields(cls)})
+
+    def to_assessments(self) -> list[AssetAssessment]:
+        """Materialize per-row schema objects (only for callers that really need them)."""
+        return [
+            AssetAssessment(
+                asset_id=a,
+                timestamp=ts,
+                temperature=t,
+                vibration=v,
+                pressure=pr,
+                current=c,
+                failure_probability=p,
+                risk_level=r,
+            )
+            for a, ts, t, v, pr, c, p, r in zip(
+                self.asset_id.tolist(),
+                self.timestamp.tolist(),
+                self.temperature.tolist(),
+                self.vibration.tolist(),
+                self.pressure.tolist(),
+                self.current.tolist(),
+                self.failure_probability.tolist(),
+                self.risk_level.tolist(),
+            )
+        ]
+
+    def to_response_json(self, model_id: str) -> bytes:
+        """
+        Serialize as a `PredictResponse` JSON document.
+
+        Byte-identical to `PredictResponse(...).model_dump_json()`: values are encoded with
+        pydantic-core's own JSON serializer, one column at a time.
+        """
+        head = b'{"model_id":' + to_json(model_id) + b',"assessments":['
+        if len(self) == 0:
+            return head + b"]}"
+
+        rows = zip(
+            [to_json(a) for a in self.asset_id.tolist()],
+            _json_datetimes(self.timestamp),
+            _json_floats(self.temperature),
+            _json_floats(self.vibration),
+            _json_floats(self.pressure),
+            _json_floats(self.current),
+            _json_floats(self.failure_probability),
+            [_RISK_JSON[r] for r in self.risk_level.tolist()],
+        )
+        body = b",".join(
+            b'{"asset_id":%s,"timestamp":%s,"temperature":%s,"vibration":%s,"pressure":%s,'
+            b'"current":%s,"failure_probability":%s,"risk_level":%s}' % row
+            for row in rows
+        )
+        return head + body + b"]}"
+
+
 @dataclass(frozen=True)
 class PredictResult:
     model_id: str
-    assessments: list[AssetAssessment]
-    to_persist: list[PredictionCreate]
+    columns: AssessmentColumns
+    # Readings to merge into the feature tails once the predictions are stored (see
+    # `advance_feature_tails`); None for models without window/lag features.
+    readings: pd.DataFrame | None = None
 
+    @property
+    def assessments(self) -> list[AssetAssessment]:
+        return self.columns.to_assessments()
 
-def _default_artifacts_path(model_id: str) -> Path:
-    artifacts_dir = Path(__file__).resolve().parents[1] / "artifacts" / "models"
-    return artifacts_dir / f"{model_id}.joblib"
 
+_RISK_LEVELS: tuple[RiskLevel, ...] = ("normal", "warning", "critical")
+_RISK_JSON: dict[str, bytes] = {r: to_json(r) for r in _RISK_LEVELS}
 
-def load_model(*, model_id: str, db: Session):
-    meta = get_model_by_id(db, model_id=model_id)
+
+def _json_floats(values: np.ndarray) -> list[bytes]:
+    # Floats never contain commas, so one pydantic-core call per column is enough.
+    # Non-finite values become null, like pydantic's default `ser_json_inf_nan`.
+    return to_json(values.tolist(), inf_nan_mode="null")[1:-1].split(b",")
+
+
+def _json_datetimes(values: np.ndarray) -> list[bytes]:
+    # Same ISO format pydantic uses for naive datetimes: microseconds only when non-zero.
+    with_us = np.datetime_as_string(values, unit="us")
+    whole_seconds = values == values.astype("datetime64[s]")
+    text = np.where(whole_seconds, np.datetime_as_string(values, unit="s"), with_us)
+    return [b'"%s"' % t.encode() for t in text.tolist()]
+
+
+def _load_model_from_disk(*, model_id: str, db: Session) -> tuple[Any, int]:
+    return _load_artifact_for(model_id, get_model_by_id(db, model_id=model_id))
+
+
+def _load_artifact_for(model_id: str, meta: ModelMetadata | None) -> tuple[Any, int]:
     if not meta:
         raise ValueError(f"Unknown model_id: {model_id}")
 
     candidate_paths: list[Path] = []
     if meta.model_path:
         candidate_paths.append(Path(meta.model_path))
-    candidate_paths.append(_default_artifacts_path(model_id))
+    candidate_paths.append(default_artifact_path(model_id))
 
     for p in candidate_paths:
         try:
             if p.exists():
-                return joblib.load(p)
+                return load_model_artifact(p)
         except Exception:
             # Try the next candidate (fall back to default artifacts path).
             continue
@@ -57,6 +186,68 @@ def load_model(*, model_id: str, db: Session):
     raise ValueError("Model artifact not found on disk for this model_id")
 
 
+@timed_stage("load_model")
+def load_model(*, model_id: str, db: Session):
+    """
+    Return the trained model for `model_id`.
+
+    Served from the process-wide model cache when possible; a cache hit skips both the
+    metadata lookup and the artifact load.
+    """
+    return get_model_cache().get_or_load(
+        model_id, lambda: _load_model_from_disk(model_id=model_id, db=db)
+    )
+
+
+async def load_model_async(*, model_id: str, db: AsyncSession, executor: StageExecutor):
+    """
+    `load_model` for the async database layer: the metadata lookup is awaited on `db`, only the
+    artifact load (on a cache miss) runs on the executor.
+    """
+    cache = get_model_cache()
+    model = cache.get(model_id)
+    if model is not None:
+        return model
+    meta = await aio_model_metadata.get_model_by_id(db, model_id)
+    return await executor.run(
+        "load_model", cache.get_or_load, model_id, lambda: _load_artifact_for(model_id, meta)
+    )
+
+
+async def _load_model_for_route(model_id: str, db: Session | AsyncSession, executor: StageExecutor):
+    if isinstance(db, AsyncSession):
+        return await load_model_async(model_id=model_id, db=db, executor=executor)
+    return await executor.run("load_model", load_model, model_id=model_id, db=db)
+
+
+def preload_models(model_ids: Iterable[str]) -> list[str]:
+    """
+    Load models into this process's model cache ahead of traffic.
+
+    Called from the gunicorn master (`gunicorn.conf.py`) so forked workers start with the models
+    already loaded; memory-mapped artifacts are shared with the workers through the page cache.
+    Unknown ids are skipped. Returns the ids that were loaded.
+    """
+    loaded = []
+    db = SessionLocal()
+    try:
+        for model_id in model_ids:
+            try:
+                load_model(model_id=model_id, db=db)
+            except ValueError:
+                continue
+            loaded.append(model_id)
+    finally:
+        db.close()
+    return loaded
+
+
+def invalidate_model(model_id: str) -> bool:
+    """Drop `model_id` from the model cache (e.g. after its artifact was replaced)."""
+    return get_model_cache().invalidate(model_id)
+
+
+@timed_stage("validate_inference", rows=len)
 def validate_inference_dataframe(
     df: pd.DataFrame, required_cols: Iterable[str] = REQUIRED_INFERENCE_COLUMNS
 ) -> pd.DataFrame:
@@ -82,86 +273,254 @@ def validate_inference_dataframe(
     bad_sensor = int(out[["temperature", "vibration", "pressure", "current"]].isna().any(axis=1).sum())
 
     if bad_ts or bad_sensor:
-        raise ValueError(
-            "Invalid values detected after parsing. "
-            f"bad_timestamp_rows={bad_ts}, bad_sensor_rows={bad_sensor}"
-        )
+        raise InvalidValuesError({"bad_timestamp_rows": bad_ts, "bad_sensor_rows": bad_sensor})
 
     return out
 
 
-def _risk_from_probability(p: float) -> RiskLevel:
-    if p < 0.5:
-        return "normal"
-    if p < 0.8:
-        return "warning"
-    return "critical"
+def risk_levels_from_probabilities(p: np.ndarray) -> np.ndarray:
+    """Map failure probabilities to risk levels: < 0.5 normal, < 0.8 warning, else critical."""
+    return np.select([p < 0.5, p < 0.8], ["normal", "warning"], default="critical").astype(object)
 
 
-def _normalize_ts(ts: pd.Timestamp) -> datetime:
+def _normalize_ts_column(ts: pd.Series) -> np.ndarray:
     # Store as naive UTC for SQLite simplicity; UI can treat it as UTC.
-    dt = ts.to_pydatetime()
-    if dt.tzinfo is not None:
-        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-    return dt
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+    return ts.to_numpy(dtype="datetime64[us]")
 
 
-async def predict_latest_per_asset_from_upload(*, model_id: str, file, db: Session) -> PredictResult:
-    df = await read_csv_upload(file)
-    df = validate_inference_dataframe(df)
-
+def parse_inference_upload(file) -> pd.DataFrame:
+    df = read_validated_csv_upload(file, validate_inference_dataframe)
     if df.empty:
         raise ValueError("CSV contains no rows")
+    return df
+
+
+def hash_upload(file) -> str:
+    """Content digest (sha256) of a CSV upload, the key of the upload cache."""
+    if not (file.filename or "").lower().endswith(".csv"):
+        raise ValueError("Please upload a .csv file")
+    with stage_timer("hash_upload") as timer:
+        digest = hash_file(file.file)
+        file.file.seek(0, 2)
+        timer.bytes = file.file.tell()
+        file.file.seek(0)
+    return digest
+
 
+def parse_inference_upload_cached(file, digest: str | None = None) -> tuple[str, pd.DataFrame]:
+    """
+    `parse_inference_upload` through the upload cache: returns (content digest, validated frame).
+
+    A re-submitted file is loaded from the cached typed frame instead of being parsed and
+    validated again.
+    """
+    cache = get_upload_cache()
+    digest = digest or hash_upload(file)
+    df = cache.get_frame("inference", digest)
+    if df is None:
+        df = parse_inference_upload(file)
+        cache.put_frame("inference", digest, df)
+    return digest, df
+
+
+def select_latest_per_asset(df: pd.DataFrame) -> pd.DataFrame:
     # Pick the latest timestamp row per asset_id.
     df_sorted = df.sort_values(["asset_id", "timestamp"])
-    latest = df_sorted.groupby("asset_id", as_index=False).tail(1).reset_index(drop=True)
+    return df_sorted.groupby("asset_id", as_index=False).tail(1).reset_index(drop=True)
+
 
-    features = ["temperature", "vibration", "pressure", "current"]
-    X = latest[features].to_numpy(dtype=float)
+def recent_rows_for_features(
+    df: pd.DataFrame, history_rows: int, tails: FeatureTailStore | None = None
+) -> pd.DataFrame:
+    """
+    Last `history_rows + 1` readings per asset (sorted by asset, timestamp), tails included.
 
-    model = load_model(model_id=model_id, db=db)
-    if not hasattr(model, "predict_proba"):
-        raise ValueError("Loaded model does not support probability predictions (predict_proba)")
+    Stored per-asset tails are prepended so window/lag features see readings from earlier
+    uploads. The tails are only read here; storing the predictions advances them
+    (`advance_feature_tails`). Models without window/lag features (`history_rows == 0`) do not
+    read them.
+    """
+    with stage_timer("select_recent_rows") as timer:
+        if history_rows > 0:
+            tails = tails if tails is not None else get_feature_tail_store()
+            df = tails.with_history(df)
+        recent = sort_for_features(df)
+        recent = recent.groupby("asset_id", sort=False).tail(history_rows + 1).reset_index(drop=True)
+        timer.rows = int(df.shape[0])
+    return recent
+
+
+def latest_features(recent: pd.DataFrame, spec: FeatureSpec | None) -> tuple[pd.DataFrame, np.ndarray]:
+    """Latest row per asset of `recent_rows_for_features` output, with its feature vector."""
+    with stage_timer("features") as timer:
+        X = compute_feature_matrix(recent, spec)
+        timer.rows = int(X.shape[0])
+    asset_ids = recent["asset_id"].to_numpy()
+    is_last = np.r_[asset_ids[1:] != asset_ids[:-1], True]
+    return recent.loc[is_last].reset_index(drop=True), X[is_last]
+
+
+def latest_rows_with_features(
+    df: pd.DataFrame, spec: FeatureSpec | None, tails: FeatureTailStore | None = None
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Latest row per asset plus its feature vector, computed like at training time."""
+    recent = recent_rows_for_features(df, spec.history_rows if spec is not None else 0, tails)
+    return latest_features(recent, spec)
+
+
+def score_readings(
+    *, model, model_id: str, df: pd.DataFrame, tails: FeatureTailStore | None = None
+) -> PredictResult:
+    """
+    Score every row of validated readings (input order kept), e.g. a live-ingestion micro-batch.
 
-    proba = model.predict_proba(X)
+    Window/lag features see the stored per-asset tails; `advance_feature_tails` moves them past
+    these rows when the predictions are stored.
+    """
+    spec = feature_spec_for_model(model)
+    combined = df
+    if spec is not None:
+        tails = tails if tails is not None else get_feature_tail_store()
+        combined = tails.with_history(df)
+    n_history = len(combined) - len(df)
+    X = compute_features_in_input_order(combined, spec)[n_history:]
+    rows = combined.iloc[n_history:].reset_index(drop=True)
+    result = score_latest_rows(model=model, model_id=model_id, latest=rows, X=X)
+    return replace(result, readings=df) if spec is not None else result
+
+
+def advance_feature_tails(db: Session, results: Iterable[PredictResult], tails: FeatureTailStore | None = None) -> None:
+    """
+    Merge the readings behind `results` into the stored feature tails, in `db`'s transaction
+    (not committed), so the tails only move when the predictions are stored with them.
+    """
+    # Results scored from one upload share its frame: merge each frame once.
+    frames = {id(r.readings): r.readings for r in results if r.readings is not None}
+    if not frames:
+        return
+    tails = tails if tails is not None else get_feature_tail_store()
+    for df in frames.values():
+        tails.update(df, tx=db)
+
+
+def score_latest_rows(
+    *,
+    model,
+    model_id: str,
+    latest: pd.DataFrame,
+    X: np.ndarray | None = None,
+    engine: str | None = None,
+) -> PredictResult:
+    if X is None:
+        X = compute_feature_matrix(latest, feature_spec_for_model(model))
+
+    # `engine` picks sklearn or the compiled flat-array forest (see tree_engine).
+    with stage_timer("predict_proba") as timer:
+        proba = predict_proba(model, X, engine=engine)
+        timer.rows = int(X.shape[0])
     if proba.ndim != 2 or proba.shape[1] < 2:
         raise ValueError("Model probability output is not compatible with binary classification")
 
     failure_probs = proba[:, 1].astype(float)
 
-    assessments: list[AssetAssessment] = []
-    to_persist: list[PredictionCreate] = []
-
-    # Python 3.9 note: zip(strict=...) is only available in Python 3.10+.
     if int(latest.shape[0]) != int(failure_probs.shape[0]):
         raise ValueError("Prediction output length does not match number of assessed rows")
 
-    for row, p in zip(latest.itertuples(index=False), failure_probs):
-        ts = _normalize_ts(getattr(row, "timestamp"))
-        risk = _risk_from_probability(float(p))
-
-        assessment = AssetAssessment(
-            asset_id=str(getattr(row, "asset_id")),
-            timestamp=ts,
-            temperature=float(getattr(row, "temperature")),
-            vibration=float(getattr(row, "vibration")),
-            pressure=float(getattr(row, "pressure")),
-            current=float(getattr(row, "current")),
-            failure_probability=float(p),
-            risk_level=risk,
-        )
-        assessments.append(assessment)
-        to_persist.append(
-            PredictionCreate(
-                asset_id=assessment.asset_id,
-                model_id=model_id,
-                timestamp=assessment.timestamp,
-                failure_probability=assessment.failure_probability,
-                risk_level=assessment.risk_level,
-            )
-        )
-
-    return PredictResult(model_id=model_id, assessments=assessments, to_persist=to_persist)
+    columns = AssessmentColumns(
+        asset_id=latest["asset_id"].astype(str).to_numpy(dtype=object),
+        timestamp=_normalize_ts_column(latest["timestamp"]),
+        temperature=latest["temperature"].to_numpy(dtype=float),
+        vibration=latest["vibration"].to_numpy(dtype=float),
+        pressure=latest["pressure"].to_numpy(dtype=float),
+        current=latest["current"].to_numpy(dtype=float),
+        failure_probability=failure_probs,
+        risk_level=risk_levels_from_probabilities(failure_probs),
+    )
+    return PredictResult(model_id=model_id, columns=columns)
+
+
+async def predict_latest_per_asset_from_upload(
+    *,
+    model_id: str,
+    file,
+    db: Session | AsyncSession,
+    executor: StageExecutor | None = None,
+    engine: str | None = None,
+    digest: str | None = None,
+) -> PredictResult:
+    """
+    Score the latest row per asset of an uploaded CSV.
 
+    Every CPU-bound or blocking stage runs on the bounded predict executor, so the event loop
+    only coordinates. Stages run sequentially, so sharing `db` across worker threads is safe. With
+    an `AsyncSession` (async database layer) the metadata lookup is awaited instead.
+    The parsed upload comes from the upload cache when its content (`digest`) was seen before.
+    """
+    executor = executor or get_predict_executor()
+    _, df = await executor.run("parse", parse_inference_upload_cached, file, digest)
+    model = await _load_model_for_route(model_id, db, executor)
+    spec = feature_spec_for_model(model)
+    latest, X = await executor.run("features", latest_rows_with_features, df, spec)
+    result = await executor.run(
+        "predict_proba", score_latest_rows, model=model, model_id=model_id, latest=latest, X=X, engine=engine
+    )
+    return replace(result, readings=df) if spec is not None and spec.history_rows > 0 else result
+
+
+async def predict_latest_per_asset_for_models(
+    *,
+    model_ids: list[str],
+    file,
+    db: Session | AsyncSession,
+    executor: StageExecutor | None = None,
+    engine: str | None = None,
+    digest: str | None = None,
+) -> list[PredictResult]:
+    """
+    Score the latest row per asset of one uploaded CSV with several models.
 
+    The upload is parsed, sorted and reduced to recent rows once; features are computed once per
+    distinct feature spec and the models are scored concurrently on the predict executor.
+    Results follow the order of `model_ids`.
+    """
+    executor = executor or get_predict_executor()
+    model_ids = list(dict.fromkeys(model_ids))
+    if not model_ids:
+        raise ValueError("At least one model_id is required")
+
+    _, df = await executor.run("parse", parse_inference_upload_cached, file, digest)
+    # Model loads share `db`, so they run one after another (usually cache hits).
+    models = [await _load_model_for_route(m, db, executor) for m in model_ids]
+    specs = [feature_spec_for_model(m) for m in models]
+
+    history_rows = max(s.history_rows if s is not None else 0 for s in specs)
+    recent = await executor.run("select_latest", recent_rows_for_features, df, history_rows)
+
+    distinct_specs = list(dict.fromkeys(specs))
+    features = await asyncio.gather(
+        *(executor.run("features", latest_features, recent, spec) for spec in distinct_specs)
+    )
+    by_spec = dict(zip(distinct_specs, features))
+
+    results = list(
+        await asyncio.gather(
+            *(
+                executor.run(
+                    "predict_proba",
+                    score_latest_rows,
+                    model=model,
+                    model_id=model_id,
+                    latest=by_spec[spec][0],
+                    X=by_spec[spec][1],
+                    engine=engine,
+                )
+                for model_id, model, spec in zip(model_ids, models, specs)
+            )
+        )
+    )
+    return [
+        replace(r, readings=df) if spec is not None and spec.history_rows > 0 else r
+        for r, spec in zip(results, specs)
+    ]
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from io import StringIO
-from typing import Iterable
+from typing import BinaryIO, Callable, Iterable, Iterator
 
 import pandas as pd
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.metrics import stage_timer, timed_stage
 
 
 REQUIRED_TRAIN_COLUMNS: tuple[str, ...] = (
@@ -17,29 +20,183 @@ REQUIRED_TRAIN_COLUMNS: tuple[str, ...] = (
     "label",
 )
 
+# Applied by every CSV reader (whole-file and chunked), so "01" and "1" stay distinct asset ids
+# whichever path parsed the upload.
+CSV_DTYPES: dict[str, type] = {"asset_id": str}
 
-async def read_csv_upload(file: UploadFile) -> pd.DataFrame:
+
+class InvalidValuesError(ValueError):
     """
-    Read a CSV UploadFile into a DataFrame.
+    Rows whose values failed type coercion, counted per kind (`bad_timestamp_rows`, ...).
 
-    MVP note: we decode UTF-8 and rely on pandas for CSV parsing.
+    Chunked readers add up the counts of every chunk (`read_validated_csv`) or name the chunk's
+    rows (`iter_csv_chunks`), so the message never passes one chunk's counts off as the file's.
     """
+
+    def __init__(self, counts: dict[str, int], *, rows: tuple[int, int] | None = None) -> None:
+        self.counts = dict(counts)
+        self.rows = rows
+        message = "Invalid values detected after parsing. " + ", ".join(f"{k}={v}" for k, v in self.counts.items())
+        if rows is not None:
+            message += f" (in rows {rows[0]}-{rows[1]}; later rows not checked)"
+        super().__init__(message)
+
+    def __reduce__(self):
+        # Raised in training job processes and re-raised in the server.
+        return _invalid_values_error, (self.counts, self.rows)
+
+
+def _invalid_values_error(counts: dict[str, int], rows: tuple[int, int] | None) -> InvalidValuesError:
+    return InvalidValuesError(counts, rows=rows)
+
+
+def _csv_handle(file: UploadFile) -> BinaryIO:
     filename = (file.filename or "").lower()
     if not filename.endswith(".csv"):
         raise ValueError("Please upload a .csv file")
 
-    content = await file.read()
+    # UploadFile spools to a temporary file; parse straight from it instead of copying
+    # the payload into bytes, then str, then StringIO.
+    handle = file.file
+    handle.seek(0)
+    return handle
+
+
+async def read_csv_upload(file: UploadFile) -> pd.DataFrame:
+    """
+    Read a CSV UploadFile into a DataFrame.
+
+    MVP note: we decode UTF-8 and rely on pandas for CSV parsing. Parsing runs on a worker
+    thread, so the event loop stays free.
+    """
+    return await run_in_threadpool(parse_csv_upload, file)
+
+
+def parse_csv_upload(file: UploadFile) -> pd.DataFrame:
+    """Blocking variant of `read_csv_upload`, for use from worker threads."""
+    handle = _csv_handle(file)
+    with stage_timer("read_csv_upload") as timer:
+        try:
+            df = pd.read_csv(handle, encoding="utf-8", dtype=CSV_DTYPES)
+        except UnicodeDecodeError as e:
+            raise ValueError("CSV is not UTF-8 encoded") from e
+        except Exception as e:
+            raise ValueError("Unable to parse CSV") from e
+        timer.rows, timer.bytes = int(df.shape[0]), handle.tell()
+    return df
+
+
+def iter_csv_upload_chunks(
+    file: UploadFile,
+    validate: Callable[[pd.DataFrame], pd.DataFrame],
+    *,
+    chunk_rows: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV UploadFile as validated, typed DataFrame chunks of at most `chunk_rows` rows.
+
+    Each chunk goes through `validate` (e.g. `validate_training_dataframe` or
+    `validate_inference_dataframe`), so callers see the same columns/dtypes and the same
+    ValueError messages as the whole-file path. Peak memory is bounded by the chunk size,
+    not the upload size.
+    """
+    return iter_csv_chunks(_csv_handle(file), validate, chunk_rows=chunk_rows)
+
+
+def iter_csv_chunks(
+    handle: BinaryIO | str,
+    validate: Callable[[pd.DataFrame], pd.DataFrame],
+    *,
+    chunk_rows: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    `iter_csv_upload_chunks` for an open binary file or a path (e.g. a spooled training upload).
+
+    An `InvalidValuesError` names the rows of the chunk it counted (1-based data rows).
+    """
+    start = 1
+    for chunk in _iter_raw_chunks(handle, chunk_rows):
+        try:
+            yield validate(chunk)
+        except InvalidValuesError as e:
+            raise InvalidValuesError(e.counts, rows=(start, start + len(chunk) - 1)) from e
+        start += len(chunk)
+
+
+def _iter_raw_chunks(handle: BinaryIO | str, chunk_rows: int | None) -> Iterator[pd.DataFrame]:
+    chunk_rows = chunk_rows or get_settings().CSV_CHUNK_ROWS
+
     try:
-        text = content.decode("utf-8")
+        reader = pd.read_csv(handle, encoding="utf-8", chunksize=chunk_rows, dtype=CSV_DTYPES)
     except UnicodeDecodeError as e:
         raise ValueError("CSV is not UTF-8 encoded") from e
-
-    try:
-        return pd.read_csv(StringIO(text))
     except Exception as e:
         raise ValueError("Unable to parse CSV") from e
 
+    with reader:
+        while True:
+            with stage_timer("read_csv_chunk") as timer:
+                try:
+                    chunk = next(reader)
+                except StopIteration:
+                    return
+                except UnicodeDecodeError as e:
+                    raise ValueError("CSV is not UTF-8 encoded") from e
+                except Exception as e:
+                    raise ValueError("Unable to parse CSV") from e
+                timer.rows = int(chunk.shape[0])
+            yield chunk
+
+
+def read_validated_csv(
+    handle: BinaryIO | str,
+    validate: Callable[[pd.DataFrame], pd.DataFrame],
+    *,
+    chunk_rows: int | None = None,
+) -> pd.DataFrame:
+    """
+    Whole-file counterpart of `iter_csv_chunks`: the validated chunks concatenated into one frame.
 
+    Only one raw (untyped, string-heavy) chunk is alive at a time, so peak memory is the typed
+    result plus one chunk rather than the raw and the typed copy of the whole file. Invalid values
+    are counted over the whole file, like a single-frame validation: once a chunk fails, the
+    remaining chunks are only validated to add up the counts.
+    """
+    chunks = []
+    invalid: dict[str, int] = {}
+    for chunk in _iter_raw_chunks(handle, chunk_rows):
+        try:
+            validated = validate(chunk)
+        except InvalidValuesError as e:
+            for kind, count in e.counts.items():
+                invalid[kind] = invalid.get(kind, 0) + count
+            chunks.clear()
+            continue
+        except ValueError:
+            # A whole-file validation reports invalid values first.
+            if invalid:
+                continue
+            raise
+        if not invalid:
+            chunks.append(validated)
+    if invalid:
+        raise InvalidValuesError(invalid)
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_validated_csv_upload(
+    file: UploadFile,
+    validate: Callable[[pd.DataFrame], pd.DataFrame],
+    *,
+    chunk_rows: int | None = None,
+) -> pd.DataFrame:
+    """`read_validated_csv` for a CSV UploadFile (blocking; run it off the event loop)."""
+    return read_validated_csv(_csv_handle(file), validate, chunk_rows=chunk_rows)
+
+
+@timed_stage("validate_training", rows=len)
 def validate_training_dataframe(df: pd.DataFrame, required_cols: Iterable[str] = REQUIRED_TRAIN_COLUMNS) -> pd.DataFrame:
     """
     Validate and coerce the training dataframe to expected types.
@@ -67,9 +224,8 @@ def validate_training_dataframe(df: pd.DataFrame, required_cols: Iterable[str] =
     bad_label = int(out["label"].isna().sum())
 
     if bad_ts or bad_sensor or bad_label:
-        raise ValueError(
-            "Invalid values detected after parsing. "
-            f"bad_timestamp_rows={bad_ts}, bad_sensor_rows={bad_sensor}, bad_label_rows={bad_label}"
+        raise InvalidValuesError(
+            {"bad_timestamp_rows": bad_ts, "bad_sensor_rows": bad_sensor, "bad_label_rows": bad_label}
         )
 
     labels = out["label"].astype(int)
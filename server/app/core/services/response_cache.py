@@ -0,0 +1,180 @@
+"""
+In-memory cache of the asset read endpoints (`GET /assets`, `GET /assets/{asset_id}`), with ETags.
+
+Entries are scoped: one for the fleet list and one per asset. Committed prediction and training
+writes invalidate the assets they touched (plus the fleet list) through a session hook in
+`crud/asset_status.py`. Every key has a version, captured before its response is built and
+checked on every hit, so a response computed while a write committed is never served as current.
+Other assets' entries stay valid.
+
+Writes this process cannot observe (sessions in training worker processes, other gunicorn
+workers, the CLI, a lagging READ_DATABASE_URL replica) are bounded by the TTL. Finished training
+jobs invalidate everything. ETags hash the body, so a 304 always means "identical to what
+would be served".
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from time import monotonic
+from typing import Callable, Iterable, Optional
+
+from app.core.config import get_settings
+
+FLEET_KEY = "assets"
+
+
+def asset_key(asset_id: str) -> str:
+    return f"asset:{asset_id}"
+
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an `If-None-Match` header value matches `etag` (weak comparison, `*` matches all)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    version: tuple[int, int]
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class ResponseCacheStats:
+    enabled: bool
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    hits: int
+    misses: int
+    not_modified: int
+    invalidations: int
+    evictions: int
+
+
+class ResponseCache:
+    """
+    LRU of serialized responses bounded by entry count and total bytes, with a TTL per entry.
+
+    A key's version is (generation, counter): `invalidate` bumps the counter of the given keys,
+    `invalidate_all` the generation of every key.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int, max_bytes: int, enabled: bool = True) -> None:
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(int(max_entries), 0)
+        self.max_bytes = max(int(max_bytes), 0)
+        self.enabled = enabled and self.ttl_seconds > 0 and self.max_entries > 0 and self.max_bytes > 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._generation = 0
+        self._bytes = 0
+        self._hits = self._misses = self._not_modified = 0
+        self._invalidations = self._evictions = 0
+
+    def version(self, key: str) -> tuple[int, int]:
+        with self._lock:
+            return self._generation, self._counters.get(key, 0)
+
+    def get_or_build(self, key: str, build: Callable[[], bytes]) -> CachedResponse:
+        """Cached response for `key`, or `build()` (stored when the cache is enabled)."""
+        version = self.version(key)
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(key) if self.enabled else None
+            if entry is not None and entry.version == version and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            self._misses += 1
+
+        body = build()
+        entry = CachedResponse(body=body, etag=body_etag(body), version=version, expires_at=now + self.ttl_seconds)
+        if self.enabled and len(body) <= self.max_bytes:
+            with self._lock:
+                self._remove(key)
+                # A write committed while building: keep the entry out rather than cache it as stale.
+                if (self._generation, self._counters.get(key, 0)) == version:
+                    self._entries[key] = entry
+                    self._bytes += len(body)
+                    self._evict()
+        return entry
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self._not_modified += 1
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._counters[key] = self._counters.get(key, 0) + 1
+                self._remove(key)
+                self._invalidations += 1
+
+    def invalidate_assets(self, asset_ids: Iterable[str]) -> None:
+        """Drop the given assets' detail responses and the fleet list."""
+        self.invalidate([FLEET_KEY, *(asset_key(a) for a in asset_ids)])
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> ResponseCacheStats:
+        with self._lock:
+            return ResponseCacheStats(
+                enabled=self.enabled,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                not_modified=self._not_modified,
+                invalidations=self._invalidations,
+                evictions=self._evictions,
+            )
+
+    def _remove(self, key: str) -> None:
+        # Caller holds the lock.
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    def _evict(self) -> None:
+        # Caller holds the lock.
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= len(entry.body)
+            self._evictions += 1
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    settings = get_settings()
+    return ResponseCache(
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+        enabled=settings.RESPONSE_CACHE_ENABLED,
+    )
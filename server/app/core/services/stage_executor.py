@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Callable, TypeVar
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class StageStats:
+    stage: str
+    completed: int
+    failed: int
+    in_flight: int
+    queued: int
+    queue_seconds_total: float
+    queue_seconds_max: float
+    run_seconds_total: float
+    run_seconds_max: float
+
+
+@dataclass
+class _StageCounters:
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    queue_seconds_total: float = 0.0
+    queue_seconds_max: float = 0.0
+    run_seconds_total: float = 0.0
+    run_seconds_max: float = 0.0
+
+
+class StageExecutor:
+    """
+    Bounded thread pool for CPU-bound and blocking stages of request pipelines.
+
+    Async routes `await executor.run("stage", fn, ...)` so pandas/sklearn/DB work happens off
+    the event loop. The pool is separate from the threadpool FastAPI uses for sync routes, so
+    heavy pipelines queue here instead of starving cheap GET handlers. Per-stage counters record
+    how long work waited for a worker (queueing) and how long it ran.
+    """
+
+    def __init__(self, *, max_workers: int, name: str) -> None:
+        self.max_workers = max(int(max_workers), 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._stages: dict[str, _StageCounters] = {}
+
+    async def run(self, stage: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        counters = self._counters(stage)
+        with self._lock:
+            counters.queued += 1
+        enqueued_at = perf_counter()
+
+        def _call() -> T:
+            started_at = perf_counter()
+            waited = started_at - enqueued_at
+            with self._lock:
+                counters.queued -= 1
+                counters.in_flight += 1
+                counters.queue_seconds_total += waited
+                counters.queue_seconds_max = max(counters.queue_seconds_max, waited)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                elapsed = perf_counter() - started_at
+                with self._lock:
+                    counters.in_flight -= 1
+                    counters.run_seconds_total += elapsed
+                    counters.run_seconds_max = max(counters.run_seconds_max, elapsed)
+                    if ok:
+                        counters.completed += 1
+                    else:
+                        counters.failed += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _call)
+
+    def stats(self) -> list[StageStats]:
+        with self._lock:
+            return [
+                StageStats(
+                    stage=stage,
+                    completed=c.completed,
+                    failed=c.failed,
+                    in_flight=c.in_flight,
+                    queued=c.queued,
+                    queue_seconds_total=c.queue_seconds_total,
+                    queue_seconds_max=c.queue_seconds_max,
+                    run_seconds_total=c.run_seconds_total,
+                    run_seconds_max=c.run_seconds_max,
+                )
+                for stage, c in sorted(self._stages.items())
+            ]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _counters(self, stage: str) -> _StageCounters:
+        with self._lock:
+            counters = self._stages.get(stage)
+            if counters is None:
+                counters = self._stages[stage] = _StageCounters()
+            return counters
+
+
+@lru_cache
+def get_predict_executor() -> StageExecutor:
+    return StageExecutor(max_workers=get_settings().PREDICT_EXECUTOR_WORKERS, name="predict")
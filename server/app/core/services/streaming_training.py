@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, BinaryIO, Callable, Iterator, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.core.services.estimators import get_estimator_backend
+from app.core.services.feature_service import (
+    FeatureSpec,
+    FeatureTailStore,
+    compute_features_in_input_order,
+    default_feature_spec,
+)
+from app.core.services.model_search import SearchConfig
+from app.core.services.processing_service import iter_csv_chunks, validate_training_dataframe
+from app.core.services.train_model_service import (
+    TrainResult,
+    save_trained_model,
+    train_from_matrix,
+    validation_metrics,
+)
+
+OutOfCoreMode = Literal["sample", "incremental"]
+OUT_OF_CORE_MODES: tuple[str, ...] = ("sample", "incremental")
+
+# Share of streamed rows held out for validation in incremental mode.
+_VALIDATION_FRACTION = 0.2
+# Seed of the held-out split; every pass over the upload draws the same split.
+_SPLIT_SEED = 42
+
+
+@dataclass
+class StreamStats:
+    """Row, label and asset statistics of a streamed training set, accumulated chunk by chunk."""
+
+    rows: int = 0
+    positives: int = 0
+    assets: set[str] = field(default_factory=set)
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.rows += int(df.shape[0])
+        self.positives += int(df["label"].sum())
+        self.assets.update(df["asset_id"].unique().tolist())
+
+    @property
+    def positive_rate(self) -> float:
+        return self.positives / self.rows if self.rows else 0.0
+
+
+class StratifiedReservoir:
+    """
+    Uniform random sample of at most `capacity` rows per class over a stream of (X, y) chunks.
+
+    Reservoir sampling (algorithm R), vectorized per chunk. Buffers grow with the stream up to
+    `capacity`, so small uploads do not pay for the full budget.
+    """
+
+    def __init__(self, capacity: int, *, seed: int = 42) -> None:
+        self.capacity = max(int(capacity), 1)
+        self._rng = np.random.default_rng(seed)
+        self._buffers: dict[int, np.ndarray] = {}
+        self._seen: dict[int, int] = {}
+
+    def add(self, X: np.ndarray, y: np.ndarray) -> None:
+        for label in np.unique(y):
+            self._add_class(int(label), X[y == label])
+
+    def _add_class(self, label: int, X: np.ndarray) -> None:
+        seen = self._seen.get(label, 0)
+        buf = self._buffers.get(label)
+        if buf is None:
+            buf = np.empty((0, X.shape[1]), dtype=float)
+
+        filled = min(seen, self.capacity)
+        take = min(self.capacity - filled, X.shape[0])
+        if take:
+            if buf.shape[0] < filled + take:
+                grown = np.empty((min(max(2 * buf.shape[0], filled + take), self.capacity), X.shape[1]), dtype=float)
+                grown[:filled] = buf[:filled]
+                buf = grown
+            buf[filled : filled + take] = X[:take]
+
+        rest = X[take:]
+        if rest.shape[0]:
+            # Row i of the stream (0-based) replaces a random slot with probability capacity/(i+1).
+            positions = seen + take + np.arange(rest.shape[0])
+            slots = self._rng.integers(0, positions + 1)
+            accepted = np.flatnonzero(slots < self.capacity)
+            # When several rows hit the same slot the last one wins, as in the sequential algorithm.
+            _, last = np.unique(slots[accepted][::-1], return_index=True)
+            winners = accepted[::-1][last]
+            buf[slots[winners]] = rest[winners]
+
+        self._buffers[label] = buf
+        self._seen[label] = seen + X.shape[0]
+
+    def sample(self, max_rows: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        At most `max_rows` rows with the stream's class proportions (at least one row per class).
+
+        Returns (X, y) in random order.
+        """
+        total = sum(self._seen.values())
+        parts_X, parts_y = [], []
+        for label, seen in sorted(self._seen.items()):
+            available = min(seen, self.capacity)
+            k = min(available, max(1, int(round(max_rows * seen / total))))
+            idx = self._rng.choice(available, size=k, replace=False)
+            parts_X.append(self._buffers[label][idx])
+            parts_y.append(np.full(k, label, dtype=int))
+        if not parts_X:
+            return np.empty((0, 0), dtype=float), np.empty(0, dtype=int)
+        X, y = np.concatenate(parts_X), np.concatenate(parts_y)
+        order = self._rng.permutation(y.shape[0])
+        return X[order], y[order]
+
+
+def iter_feature_chunks(
+    chunks: Iterator[pd.DataFrame], spec: Optional[FeatureSpec], stats: StreamStats
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    (X, y) per validated chunk, with window/lag features continued across chunk boundaries.
+
+    The last `history_rows` readings of every asset are carried into the next chunk, so features
+    match a whole-file computation as long as each asset's rows appear in time order across chunks
+    (as in time-ordered exports). `stats` is updated in the same pass.
+    """
+    tails = FeatureTailStore(max_rows=spec.history_rows if spec is not None else 0)
+    for df in chunks:
+        stats.update(df)
+        combined = tails.extend(df)
+        n_history = len(combined) - len(df)
+        X = compute_features_in_input_order(combined, spec)[n_history:]
+        yield X, df["label"].to_numpy(dtype=int)
+
+
+def train_out_of_core(
+    source: BinaryIO | str,
+    *,
+    mode: OutOfCoreMode = "sample",
+    estimator: Optional[str] = None,
+    search: Optional[SearchConfig] = None,
+    chunk_rows: Optional[int] = None,
+    sample_rows: Optional[int] = None,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> TrainResult:
+    """
+    Train from a CSV (open binary file or path) that need not fit in memory.
+
+    The CSV is streamed once in chunks through `validate_training_dataframe` and the feature
+    pipeline. Row count, positive rate and asset count are accumulated in that same pass.
+
+    - "sample": a stratified reservoir sample of at most `sample_rows` rows (default
+      `TRAIN_SAMPLE_ROWS`) is fitted with any backend (and `search`, if given).
+    - "incremental": an incremental backend (default `sgd_logistic`) learns from every chunk via
+      `partial_fit`; a random share of rows is held out (reservoir-bounded) for validation.
+      Preprocessing steps (the scaler) are fitted on all training rows first, one extra pass per
+      step, so a file `source` is rewound between passes and must be seekable.
+
+    `on_chunk` is called with the number of rows streamed so far.
+    """
+    settings = get_settings()
+    sample_rows = int(sample_rows or settings.TRAIN_SAMPLE_ROWS)
+    spec = default_feature_spec()
+    stats = StreamStats()
+    chunks = iter_csv_chunks(source, validate_training_dataframe, chunk_rows=chunk_rows)
+    features = iter_feature_chunks(chunks, spec, stats)
+
+    if mode == "sample":
+        backend = get_estimator_backend(estimator)
+        reservoir = StratifiedReservoir(sample_rows)
+        for X, y in features:
+            reservoir.add(X, y)
+            if on_chunk is not None:
+                on_chunk(stats.rows)
+        X, y = reservoir.sample(sample_rows)
+        result = train_from_matrix(
+            X,
+            y,
+            model=backend.build(),
+            spec=spec,
+            estimator_name=backend.name,
+            search=search,
+            rows_used=stats.rows,
+            assets=len(stats.assets),
+            positive_rate=stats.positive_rate,
+        )
+        result.metrics["sample_rows"] = float(y.shape[0])
+        return result
+
+    if mode == "incremental":
+        backend = get_estimator_backend(estimator or "sgd_logistic")
+        if not backend.incremental:
+            raise ValueError(f"Estimator {backend.name} cannot be trained incrementally (try sgd_logistic)")
+        if search is not None:
+            raise ValueError("Hyperparameter search is not supported for incremental training")
+        model = backend.build()
+        if getattr(model, "steps", None):
+            # Preprocessing passes come first; the training pass (which fills `stats`) rereads the source.
+            _fit_preprocessing(
+                model[:-1], lambda: iter_feature_chunks(_rewind_chunks(source, chunk_rows), spec, StreamStats())
+            )
+            features = iter_feature_chunks(_rewind_chunks(source, chunk_rows), spec, stats)
+        return _train_incremental(model, backend.name, features, spec, stats, sample_rows, on_chunk)
+
+    raise ValueError(f"Unknown out-of-core mode: {mode} (expected one of: {', '.join(OUT_OF_CORE_MODES)})")
+
+
+def _rewind_chunks(source: BinaryIO | str, chunk_rows: Optional[int]) -> Iterator[pd.DataFrame]:
+    if not isinstance(source, str):
+        source.seek(0)
+    return iter_csv_chunks(source, validate_training_dataframe, chunk_rows=chunk_rows)
+
+
+def _held_out(rng: np.random.Generator, rows: int) -> np.ndarray:
+    return rng.random(rows) < _VALIDATION_FRACTION
+
+
+def _fit_preprocessing(preprocess: Any, passes: Callable[[], Iterator[tuple[np.ndarray, np.ndarray]]]) -> None:
+    """
+    Fit the preprocessing steps of an incremental pipeline with `partial_fit` on all training rows.
+
+    One pass per step, in order (a step is fitted on the output of the steps before it). The
+    held-out split is replayed, so validation rows do not leak into the statistics.
+    """
+    for i, (name, step) in enumerate(preprocess.steps):
+        if not hasattr(step, "partial_fit"):
+            raise ValueError(f"Preprocessing step {name} cannot be fitted incrementally")
+        rng = np.random.default_rng(_SPLIT_SEED)
+        for X, y in passes():
+            X_train = X[~_held_out(rng, y.shape[0])]
+            if X_train.shape[0]:
+                step.partial_fit(preprocess[:i].transform(X_train) if i else X_train)
+
+
+def _train_incremental(
+    model: Any,
+    estimator_name: str,
+    features: Iterator[tuple[np.ndarray, np.ndarray]],
+    spec: Optional[FeatureSpec],
+    stats: StreamStats,
+    sample_rows: int,
+    on_chunk: Optional[Callable[[int], None]],
+) -> TrainResult:
+    # Pipelines: preprocessing steps are already fitted (`_fit_preprocessing`); the final estimator
+    # learns chunk by chunk.
+    steps = getattr(model, "steps", None)
+    preprocess = model[:-1] if steps else None
+    learner = model[-1] if steps else model
+
+    rng = np.random.default_rng(_SPLIT_SEED)
+    validation = StratifiedReservoir(max(sample_rows // 4, 1))
+    classes = np.array([0, 1])
+    fit_seconds = 0.0
+    fitted = False
+    X_last = None
+    for X, y in features:
+        X_last = X
+        held_out = _held_out(rng, y.shape[0])
+        validation.add(X[held_out], y[held_out])
+        X_train, y_train = X[~held_out], y[~held_out]
+        if y_train.size:
+            started = perf_counter()
+            if preprocess is not None:
+                X_train = preprocess.transform(X_train)
+            learner.partial_fit(X_train, y_train, classes=classes)
+            fit_seconds += perf_counter() - started
+            fitted = True
+        if on_chunk is not None:
+            on_chunk(stats.rows)
+
+    if stats.positives == 0 or stats.positives == stats.rows:
+        raise ValueError("Training data must contain at least one positive (label=1) and one negative (label=0) row")
+    if not fitted:
+        raise ValueError("Not enough training rows for incremental training")
+
+    X_val, y_val = validation.sample(max(sample_rows // 4, 1))
+    metrics = validation_metrics(model, X_val, y_val) if y_val.size else {}
+    return save_trained_model(
+        model,
+        spec=spec,
+        estimator_name=estimator_name,
+        metrics=metrics,
+        fit_seconds=fit_seconds,
+        X_eval=X_val if y_val.size else X_last,
+        rows_used=stats.rows,
+        assets=len(stats.assets),
+        positive_rate=stats.positive_rate,
+    )
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Iterator, Literal, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.services.feature_service import SENSOR_COLUMNS
+from app.core.services.predict_service import risk_levels_from_probabilities
+from app.crud.model_metadata import get_all_models, get_model_by_id
+from app.crud.prediction import create_predictions_from_columns
+from app.crud.training_data import create_training_data_from_dataframe
+
+# Health scenarios of the demo seed (routes/seed.py), generalized to any fleet size.
+SCENARIOS: tuple[str, ...] = ("normal", "degrading", "recovery", "fluctuating")
+
+ExportFormat = Literal["csv", "parquet"]
+EXPORT_FORMATS: tuple[str, ...] = ("csv", "parquet")
+
+_ASSET_PREFIXES: tuple[str, ...] = ("PUMP", "MOTOR", "COMPRESSOR", "FAN")
+
+# Assets are generated in fixed blocks, each with its own random stream, so the output depends
+# only on the spec and seed, never on how generation is chunked.
+_BLOCK_ASSETS = 64
+
+
+@dataclass(frozen=True)
+class FleetSpec:
+    """
+    Shape of a synthetic fleet: `assets` assets with `hours` readings each, one every
+    `interval_minutes`, starting at `start`. Output is fully determined by the spec and `seed`.
+
+    `scenario_weights` are the shares of assets in each of `SCENARIOS`.
+    """
+
+    assets: int = 100
+    hours: int = 168
+    interval_minutes: int = 60
+    seed: int = 42
+    start: datetime = datetime(2025, 1, 1)
+    scenario_weights: tuple[float, ...] = (0.7, 0.1, 0.1, 0.1)
+
+    @property
+    def steps(self) -> int:
+        return max(int(self.hours * 60 // max(self.interval_minutes, 1)), 1)
+
+    @property
+    def rows(self) -> int:
+        return self.assets * self.steps
+
+
+@dataclass(frozen=True)
+class FleetLoadResult:
+    model_id: str
+    assets: int
+    predictions: int
+    training_rows: int
+    seconds: float
+
+
+def fleet_asset_ids(assets: int, *, first: int = 0, count: Optional[int] = None) -> np.ndarray:
+    """
+    Asset ids like the sample data (PUMP_001, MOTOR_001, ...), cycling through asset types.
+
+    `first`/`count` select a slice of the fleet's ids (numbered as in the full fleet of `assets`).
+    """
+    idx = np.arange(first, assets if count is None else min(first + count, assets))
+    prefixes = np.array(_ASSET_PREFIXES, dtype=object)[idx % len(_ASSET_PREFIXES)]
+    numbers = idx // len(_ASSET_PREFIXES) + 1
+    width = max(3, len(str((assets - 1) // len(_ASSET_PREFIXES) + 1)))
+    return np.array([f"{p}_{n:0{width}d}" for p, n in zip(prefixes, numbers)], dtype=object)
+
+
+def fleet_timestamps(spec: FleetSpec) -> np.ndarray:
+    start = np.datetime64(spec.start.replace(tzinfo=None), "s")
+    return start + np.arange(spec.steps) * np.timedelta64(int(spec.interval_minutes), "m")
+
+
+def assign_scenarios(spec: FleetSpec, rng: np.random.Generator, n: int) -> np.ndarray:
+    """Scenario index (into `SCENARIOS`) for `n` assets."""
+    weights = np.asarray(spec.scenario_weights, dtype=float)
+    if weights.shape != (len(SCENARIOS),) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError(f"scenario_weights needs {len(SCENARIOS)} non-negative weights")
+    return rng.choice(len(SCENARIOS), size=n, p=weights / weights.sum())
+
+
+def health_curves(steps: int, scenarios: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Failure risk in [0.05, 0.95] per (asset, step), following the seed scenarios:
+    normal (low with occasional spikes), degrading (ramps to critical from a random onset),
+    recovery (high, falls after maintenance), fluctuating (cycles around the warning threshold).
+    """
+    n = scenarios.shape[0]
+    t = np.linspace(0.0, 1.0, steps)[None, :]
+
+    normal = 0.12 + 0.23 * (rng.random((n, steps)) < 0.04)
+    onset = rng.uniform(0.0, 0.6, size=(n, 1))
+    degrading = 0.15 + 0.75 * np.clip((t - onset) / (1.0 - onset), 0.0, 1.0) ** 1.5
+    repaired = rng.uniform(0.2, 0.7, size=(n, 1))
+    recovery = np.where(t < repaired, 0.85, 0.85 - 0.55 * np.clip((t - repaired) / (1.0 - repaired) * 3, 0.0, 1.0))
+    cycle = (np.arange(steps)[None, :] + rng.integers(0, 6, size=(n, 1))) % 6
+    fluctuating = 0.45 + 0.15 * (0.5 + 0.5 * cycle / 6)
+
+    curves = np.stack([normal, degrading, recovery, np.broadcast_to(fluctuating, (n, steps))])
+    health = curves[scenarios, np.arange(n)]
+    return np.clip(health + rng.normal(0.0, 0.05, size=(n, steps)), 0.05, 0.95)
+
+
+def _check(spec: FleetSpec) -> None:
+    if spec.assets < 1 or spec.hours < 1 or spec.interval_minutes < 1:
+        raise ValueError("assets, hours and interval_minutes must be positive")
+
+
+def _block_health(spec: FleetSpec, block: int) -> tuple[np.ndarray, np.random.Generator]:
+    # (asset, step) risk of one block, plus its random stream (sensors are drawn from it next).
+    rng = np.random.default_rng([spec.seed, block])
+    n = min(_BLOCK_ASSETS, spec.assets - block * _BLOCK_ASSETS)
+    return health_curves(spec.steps, assign_scenarios(spec, rng, n), rng), rng
+
+
+def _block_sensors(spec: FleetSpec, block: int, with_labels: bool) -> dict[str, np.ndarray]:
+    health, rng = _block_health(spec, block)
+    n, steps = health.shape
+
+    def sensor(base: float, spread: float, drift: float, noise: float) -> np.ndarray:
+        baseline = base + rng.normal(0.0, spread, size=(n, 1))
+        return baseline + drift * health + rng.normal(0.0, noise, size=(n, steps))
+
+    values = {
+        "temperature": sensor(66.0, 1.5, 16.0, 2.0).round(2),
+        "vibration": sensor(0.38, 0.03, 0.35, 0.05).round(3),
+        "pressure": sensor(32.5, 1.0, -6.0, 1.2).round(2),
+        "current": sensor(9.4, 0.3, 2.0, 0.4).round(2),
+    }
+    if with_labels:
+        values["label"] = (health + rng.normal(0.0, 0.05, size=(n, steps)) > 0.6).astype(int)
+    return values
+
+
+def _time_major(values: np.ndarray) -> np.ndarray:
+    # (asset, step) -> rows ordered by time, then asset (like the sample CSV).
+    return np.ascontiguousarray(values.T).reshape(-1)
+
+
+def _block_ranges(spec: FleetSpec, assets_per_chunk: Optional[int]) -> Iterator[range]:
+    """Block indices per chunk; chunks hold whole blocks (about `assets_per_chunk` assets)."""
+    _check(spec)
+    n_blocks = -(-spec.assets // _BLOCK_ASSETS)
+    if assets_per_chunk is None:
+        # Default: about CSV_CHUNK_ROWS rows per chunk.
+        assets_per_chunk = get_settings().CSV_CHUNK_ROWS // spec.steps
+    per_chunk = max(-(-int(assets_per_chunk) // _BLOCK_ASSETS), 1)
+    for lo in range(0, n_blocks, per_chunk):
+        yield range(lo, min(lo + per_chunk, n_blocks))
+
+
+def _sensor_frame(spec: FleetSpec, blocks: range, with_labels: bool) -> pd.DataFrame:
+    parts = [_block_sensors(spec, b, with_labels) for b in blocks]
+    values = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    n = next(iter(values.values())).shape[0]
+    asset_ids = fleet_asset_ids(spec.assets, first=blocks.start * _BLOCK_ASSETS, count=n)
+
+    columns: dict[str, Any] = {
+        "timestamp": pd.DatetimeIndex(np.repeat(fleet_timestamps(spec), n)).tz_localize("UTC"),
+        "asset_id": np.tile(asset_ids, spec.steps),
+    }
+    columns.update({k: _time_major(v) for k, v in values.items()})
+    return pd.DataFrame(columns).loc[:, ["timestamp", "asset_id", *SENSOR_COLUMNS, *(["label"] if with_labels else [])]]
+
+
+def generate_sensor_readings(spec: FleetSpec, *, with_labels: bool = True) -> pd.DataFrame:
+    """
+    Training/inference frame for the fleet: timestamp (UTC), asset_id, sensor columns (+ label).
+
+    Sensors drift with the asset's risk around per-asset baselines near the sample data's ranges
+    (temperature ~72, vibration ~0.5, pressure ~30, current ~10). `label` marks high-risk
+    readings, so models trained on the output learn the scenarios. Rows are ordered by time,
+    then asset.
+    """
+    _check(spec)
+    return _sensor_frame(spec, range(-(-spec.assets // _BLOCK_ASSETS)), with_labels)
+
+
+def iter_sensor_readings(
+    spec: FleetSpec, *, with_labels: bool = True, assets_per_chunk: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    `generate_sensor_readings` in chunks of assets (time-ordered within each chunk), for fleets
+    too large to hold in memory. Together the chunks hold exactly the rows of the full frame.
+    """
+    for blocks in _block_ranges(spec, assets_per_chunk):
+        yield _sensor_frame(spec, blocks, with_labels)
+
+
+def _prediction_columns(spec: FleetSpec, blocks: range) -> dict[str, np.ndarray]:
+    health = np.concatenate([_block_health(spec, b)[0] for b in blocks])
+    n = health.shape[0]
+    probabilities = _time_major(health).round(4)
+    return {
+        "asset_id": np.tile(fleet_asset_ids(spec.assets, first=blocks.start * _BLOCK_ASSETS, count=n), spec.steps),
+        "timestamp": np.repeat(fleet_timestamps(spec).astype("datetime64[us]"), n),
+        "failure_probability": probabilities,
+        "risk_level": risk_levels_from_probabilities(probabilities),
+    }
+
+
+def generate_prediction_history(spec: FleetSpec) -> dict[str, np.ndarray]:
+    """
+    Prediction history columns (asset_id, timestamp, failure_probability, risk_level) for the
+    fleet, shaped for `create_predictions_from_columns`. Probabilities follow the same health
+    curves as `generate_sensor_readings`.
+    """
+    _check(spec)
+    return _prediction_columns(spec, range(-(-spec.assets // _BLOCK_ASSETS)))
+
+
+def iter_prediction_history(spec: FleetSpec, *, assets_per_chunk: Optional[int] = None) -> Iterator[dict[str, np.ndarray]]:
+    """`generate_prediction_history` in chunks of assets."""
+    for blocks in _block_ranges(spec, assets_per_chunk):
+        yield _prediction_columns(spec, blocks)
+
+
+def write_sensor_readings(
+    spec: FleetSpec,
+    path: str | Path,
+    *,
+    fmt: ExportFormat = "csv",
+    with_labels: bool = True,
+    assets_per_chunk: Optional[int] = None,
+) -> int:
+    """
+    Write the fleet's sensor readings as an upload-ready CSV (or Parquet) file, chunk by chunk.
+
+    Returns the number of rows written. Parquet needs pyarrow.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (expected one of: {', '.join(EXPORT_FORMATS)})")
+    chunks = iter_sensor_readings(spec, with_labels=with_labels, assets_per_chunk=assets_per_chunk)
+    rows = 0
+    if fmt == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for df in chunks:
+                df.to_csv(f, header=rows == 0, index=False)
+                rows += int(df.shape[0])
+        return rows
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Parquet output needs pyarrow (pip install pyarrow)") from e
+    writer = None
+    try:
+        for df in chunks:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(str(path), table.schema)
+            writer.write_table(table)
+            rows += int(df.shape[0])
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def load_synthetic_fleet(
+    db: Session,
+    spec: FleetSpec,
+    *,
+    model_id: Optional[str] = None,
+    predictions: bool = True,
+    training_data: bool = False,
+    assets_per_chunk: Optional[int] = None,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> FleetLoadResult:
+    """
+    Bulk-load the fleet into the database, one committed chunk of assets at a time.
+
+    Prediction history goes through `create_predictions_from_columns` (asset_status included),
+    labelled sensor readings through `create_training_data_from_dataframe`. Rows are attributed
+    to `model_id` (default: the first stored model). `on_chunk` gets the rows written so far.
+    """
+    _check(spec)
+    if model_id is None:
+        models = get_all_models(db, limit=1)
+        if not models:
+            raise ValueError("No trained models found. Train a model first.")
+        model_id = models[0].model_id
+    elif get_model_by_id(db, model_id) is None:
+        raise ValueError(f"Unknown model_id: {model_id}")
+
+    started = perf_counter()
+    written_predictions = written_training = 0
+    if predictions:
+        for columns in iter_prediction_history(spec, assets_per_chunk=assets_per_chunk):
+            stats = create_predictions_from_columns(
+                db,
+                model_id=model_id,
+                asset_ids=columns["asset_id"],
+                timestamps=columns["timestamp"],
+                failure_probabilities=columns["failure_probability"],
+                risk_levels=columns["risk_level"],
+            )
+            written_predictions += stats.rows
+            if on_chunk is not None:
+                on_chunk(written_predictions + written_training)
+    if training_data:
+        for df in iter_sensor_readings(spec, assets_per_chunk=assets_per_chunk):
+            written_training += create_training_data_from_dataframe(db, model_id=model_id, df=df).rows
+            if on_chunk is not None:
+                on_chunk(written_predictions + written_training)
+
+    return FleetLoadResult(
+        model_id=model_id,
+        assets=spec.assets,
+        predictions=written_predictions,
+        training_rows=written_training,
+        seconds=perf_counter() - started,
+    )
@@ -2,14 +2,12 @@ from __future__ import annotations
 
 from datetime import datetime
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Optional
+from time import perf_counter
+from typing import Any, Optional
 from uuid import uuid4
 
-import joblib
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import (
     accuracy_score,
     average_precision_score,
@@ -23,6 +21,21 @@ from sklearn.metrics import (
 )
 from sklearn.model_selection import train_test_split
 
+from app.core.config import get_settings
+from app.core.metrics import stage_timer
+from app.core.services.estimators import backend_name_for_model, get_estimator_backend
+from app.core.services.feature_service import (
+    FeatureSpec,
+    SENSOR_COLUMNS,
+    attach_feature_spec,
+    compute_features_in_input_order,
+    default_feature_spec,
+    feature_spec_for_model,
+)
+from app.core.services.model_artifacts import artifact_size_bytes, save_model_artifact
+from app.core.services.model_search import SearchConfig, SearchResult, run_search
+from app.core.services.tree_engine import resolve_engine, supports_compiled
+
 
 @dataclass(frozen=True)
 class TrainResult:
@@ -34,41 +47,106 @@ class TrainResult:
     metrics: dict[str, float]
     # Python 3.9 compatibility: use Optional instead of `str | None`.
     model_path: Optional[str]
+    estimator: Optional[str] = None
+    # One row per search candidate (see `SearchResult.to_table`); metrics only keep the best.
+    search_candidates: Optional[list[dict[str, Any]]] = None
 
 
-def train_from_dataframe(df: pd.DataFrame) -> TrainResult:
+def train_from_dataframe(
+    df: pd.DataFrame,
+    *,
+    feature_spec: Optional[FeatureSpec] = None,
+    estimator: Optional[str] = None,
+    search: Optional[SearchConfig] = None,
+    warm_start_from: Optional[Any] = None,
+    add_estimators: int = 50,
+) -> TrainResult:
     """
     Train a simple baseline model from the validated training dataframe.
 
-    Expects the output of `validate_training_dataframe()` from processing_service.
+    Expects the output of `validate_training_dataframe()` from processing_service. Features come
+    from `feature_service` (`feature_spec` defaults to the configured spec) and the spec is stored
+    on the model so prediction computes the same features. `estimator` names a backend from the
+    `estimators` registry (defaults to `TRAIN_ESTIMATOR`). With `search`, hyperparameters are
+    picked by cross-validated search on the training split first (see `model_search`).
+
+    `warm_start_from` continues a fitted forest instead: its feature spec is kept, `add_estimators`
+    new trees are fitted on `df` and appended to the existing ones (saved under a new model_id).
     """
-    features = ["temperature", "vibration", "pressure", "current"]
+    features = list(SENSOR_COLUMNS)
     target = "label"
 
-    if any(c not in df.columns for c in features + [target, "asset_id"]):
+    if any(c not in df.columns for c in features + [target, "asset_id", "timestamp"]):
         raise ValueError("Training dataframe is missing required columns for training")
 
+    if warm_start_from is not None:
+        model = _prepare_warm_start(warm_start_from, add_estimators=add_estimators, search=search)
+        spec = feature_spec_for_model(model)
+        estimator_name = backend_name_for_model(model)
+    else:
+        backend = get_estimator_backend(estimator)
+        model = backend.build()
+        spec = feature_spec if feature_spec is not None else default_feature_spec()
+        estimator_name = backend.name
+
     y = df[target].astype(int).to_numpy()
+    with stage_timer("train_features") as timer:
+        X = compute_features_in_input_order(df, spec)
+        timer.rows = int(X.shape[0])
+
+    result = train_from_matrix(
+        X,
+        y,
+        model=model,
+        spec=spec,
+        estimator_name=estimator_name,
+        search=search,
+        rows_used=int(df.shape[0]),
+        assets=int(df["asset_id"].nunique()),
+        positive_rate=float(np.mean(y)) if y.size else 0.0,
+    )
+    if warm_start_from is not None:
+        result.metrics["warm_start_estimators_added"] = float(add_estimators)
+    return result
+
+
+def train_from_matrix(
+    X: np.ndarray,
+    y: np.ndarray,
+    *,
+    model: Any,
+    spec: Optional[FeatureSpec],
+    estimator_name: Optional[str],
+    search: Optional[SearchConfig] = None,
+    rows_used: int,
+    assets: int,
+    positive_rate: float,
+) -> TrainResult:
+    """
+    Split, fit, evaluate and save `model` on a prepared feature matrix.
+
+    `rows_used`/`assets`/`positive_rate` describe the full training set, which may be larger than
+    X (e.g. when X is a sample of a streamed upload, see `streaming_training`).
+    """
     unique = np.unique(y)
     if unique.size < 2:
         # This is common with purely “healthy” datasets. Surface a clear message for the MVP.
         raise ValueError("Training data must contain at least one positive (label=1) and one negative (label=0) row")
 
-    X = df[features].to_numpy(dtype=float)
-
     n_samples = int(y.shape[0])
     n_classes = int(unique.size)
 
     # Small datasets are common in demos. For MVP robustness:
     # - if too small to split, train on all rows and return minimal metadata.
+    search_result: Optional[SearchResult] = None
     if n_samples < 10:
-        model = RandomForestClassifier(
-            n_estimators=200,
-            random_state=42,
-            n_jobs=-1,
-        )
+        if search is not None:
+            raise ValueError("Hyperparameter search needs at least 10 training rows")
+        fit_started = perf_counter()
         model.fit(X, y)
+        fit_seconds = perf_counter() - fit_started
         metrics: dict[str, float] = {}
+        X_eval = X
     else:
         # Ensure validation set is large enough to hold at least one sample per class when stratifying.
         val_size = max(int(round(n_samples * 0.2)), n_classes)
@@ -90,52 +168,129 @@ def train_from_dataframe(df: pd.DataFrame) -> TrainResult:
             stratify=y if can_stratify else None,
         )
 
-        model = RandomForestClassifier(
-            n_estimators=200,
-            random_state=42,
-            n_jobs=-1,
-        )
-        model.fit(X_train, y_train)
-
-        y_pred = model.predict(X_val)
-        # Add a compact but insightful set of metrics (all floats for easy JSON/DB storage).
-        metrics = {
-            "accuracy": float(accuracy_score(y_val, y_pred)),
-            "balanced_accuracy": float(balanced_accuracy_score(y_val, y_pred)),
-            "precision": float(precision_score(y_val, y_pred, zero_division=0)),
-            "recall": float(recall_score(y_val, y_pred, zero_division=0)),
-            "f1": float(f1_score(y_val, y_pred, zero_division=0)),
-            # Helpful context for interpreting metrics in imbalanced datasets.
-            "val_samples": float(int(y_val.shape[0])),
-            "val_positives": float(int(np.sum(y_val == 1))),
-            "val_positive_rate": float(np.mean(y_val)),
-        }
-
-        # roc_auc requires probability estimates and both classes present in y_val.
-        if np.unique(y_val).size == 2:
-            y_proba = model.predict_proba(X_val)
-            y_prob = y_proba[:, 1]
-            metrics["roc_auc"] = float(roc_auc_score(y_val, y_prob))
-            metrics["avg_precision"] = float(average_precision_score(y_val, y_prob))
-            # Probability-quality metrics:
-            metrics["log_loss"] = float(log_loss(y_val, y_proba))
-            metrics["brier"] = float(brier_score_loss(y_val, y_prob))
+        if search is not None:
+            with stage_timer("train_search") as timer:
+                search_result = run_search(X_train, y_train, estimator=estimator_name, config=search)
+                timer.rows = int(y_train.shape[0])
+            model.set_params(**search_result.best_params)
+
+        with stage_timer("train_fit") as timer:
+            fit_started = perf_counter()
+            model.fit(X_train, y_train)
+            fit_seconds = perf_counter() - fit_started
+            timer.rows = int(y_train.shape[0])
+
+        metrics = validation_metrics(model, X_val, y_val)
+        X_eval = X_val
+
+    if search_result is not None:
+        metrics.update(search_result.to_metrics())
+    return save_trained_model(
+        model,
+        spec=spec,
+        estimator_name=estimator_name,
+        metrics=metrics,
+        fit_seconds=fit_seconds,
+        X_eval=X_eval,
+        rows_used=rows_used,
+        assets=assets,
+        positive_rate=positive_rate,
+        search_candidates=search_result.to_table() if search_result is not None else None,
+    )
+
+
+def validation_metrics(model: Any, X_val: np.ndarray, y_val: np.ndarray) -> dict[str, float]:
+    y_pred = model.predict(X_val)
+    # Add a compact but insightful set of metrics (all floats for easy JSON/DB storage).
+    metrics = {
+        "accuracy": float(accuracy_score(y_val, y_pred)),
+        "balanced_accuracy": float(balanced_accuracy_score(y_val, y_pred)),
+        "precision": float(precision_score(y_val, y_pred, zero_division=0)),
+        "recall": float(recall_score(y_val, y_pred, zero_division=0)),
+        "f1": float(f1_score(y_val, y_pred, zero_division=0)),
+        # Helpful context for interpreting metrics in imbalanced datasets.
+        "val_samples": float(int(y_val.shape[0])),
+        "val_positives": float(int(np.sum(y_val == 1))),
+        "val_positive_rate": float(np.mean(y_val)),
+    }
+
+    # roc_auc requires probability estimates and both classes present in y_val.
+    if np.unique(y_val).size == 2:
+        y_proba = model.predict_proba(X_val)
+        y_prob = y_proba[:, 1]
+        metrics["roc_auc"] = float(roc_auc_score(y_val, y_prob))
+        metrics["avg_precision"] = float(average_precision_score(y_val, y_prob))
+        # Probability-quality metrics:
+        metrics["log_loss"] = float(log_loss(y_val, y_proba))
+        metrics["brier"] = float(brier_score_loss(y_val, y_prob))
+    return metrics
+
+
+def save_trained_model(
+    model: Any,
+    *,
+    spec: Optional[FeatureSpec],
+    estimator_name: Optional[str],
+    metrics: dict[str, float],
+    fit_seconds: float,
+    X_eval: np.ndarray,
+    rows_used: int,
+    assets: int,
+    positive_rate: float,
+    search_candidates: Optional[list[dict[str, Any]]] = None,
+) -> TrainResult:
+    """Attach serving attributes to a fitted model, save its artifact and add cost metrics."""
+    if getattr(model, "warm_start", False):
+        # Later fits of this artifact start from scratch unless warm-started explicitly again.
+        model.set_params(warm_start=False)
+    attach_feature_spec(model, spec)
+    model.estimator_name_ = estimator_name
+    engine = resolve_engine(model, get_settings().INFERENCE_ENGINE)
+    model.inference_engine_ = engine if engine != "compiled" or supports_compiled(model) else "sklearn"
 
     model_id = str(uuid4())
     training_date = datetime.utcnow()
-    artifacts_dir = Path(__file__).resolve().parents[1] / "artifacts" / "models"
-    artifacts_dir.mkdir(parents=True, exist_ok=True)
-    model_path = artifacts_dir / f"{model_id}.joblib"
-    joblib.dump(model, model_path)
+    model_path = save_model_artifact(model, model_id)
+
+    # Cost profile of the backend, comparable across estimators.
+    metrics["fit_seconds"] = float(fit_seconds)
+    metrics["artifact_bytes"] = float(artifact_size_bytes(model_path))
+    metrics["predict_rows_per_sec"] = _predict_throughput(model, X_eval)
 
     return TrainResult(
         model_id=model_id,
         training_date=training_date,
-        rows_used=int(df.shape[0]),
-        assets=int(df["asset_id"].nunique()),
-        positive_rate=float(np.mean(y)),
+        rows_used=int(rows_used),
+        assets=int(assets),
+        positive_rate=float(positive_rate),
         metrics=metrics,
         model_path=str(model_path),
+        estimator=estimator_name,
+        search_candidates=search_candidates,
     )
 
 
+def _prepare_warm_start(model: Any, *, add_estimators: int, search: Optional[SearchConfig]) -> Any:
+    """Configure a fitted ensemble to grow `add_estimators` more members on its next `fit`."""
+    params = model.get_params() if hasattr(model, "get_params") else {}
+    if "warm_start" not in params or "n_estimators" not in params:
+        raise ValueError("Warm start is only supported for forest models")
+    if search is not None:
+        raise ValueError("Hyperparameter search cannot be combined with warm start")
+    if add_estimators < 1:
+        raise ValueError("add_estimators must be at least 1")
+    model.set_params(warm_start=True, n_estimators=int(params["n_estimators"]) + int(add_estimators))
+    # A compiled copy of the old forest must not be reused for the grown one.
+    model.__dict__.pop("compiled_forest_", None)
+    return model
+
+
+def _predict_throughput(model, X: np.ndarray, *, max_rows: int = 10_000) -> float:
+    """Rows per second of `predict_proba` on (up to `max_rows` of) X."""
+    sample = X[:max_rows]
+    started = perf_counter()
+    model.predict_proba(sample)
+    elapsed = perf_counter() - started
+    return float(sample.shape[0] / elapsed) if elapsed > 0 else 0.0
+
+
@@ -0,0 +1,427 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Literal, Optional
+from uuid import UUID, uuid4
+
+from app.core.config import get_settings
+from app.core.metrics import get_metrics
+from app.core.services.response_cache import get_response_cache
+from app.core.services.upload_cache import HashingReader, get_upload_cache
+from app.schemas.train import TrainResponse
+
+TrainingJobState = Literal["queued", "running", "succeeded", "failed"]
+
+_UPLOAD_FILENAME = "upload.csv"
+_PROGRESS_FILENAME = "progress.json"
+_JOB_FILENAME = "job.json"
+
+
+class TrainingQueueFullError(Exception):
+    """Raised when the number of queued/running training jobs reached TRAIN_QUEUE_MAX_DEPTH."""
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    state: TrainingJobState = "queued"
+    stage: str = "queued"
+    progress: float = 0.0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[TrainResponse] = None
+    error: Optional[str] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in ("succeeded", "failed")
+
+    def to_json(self, owner: str) -> str:
+        return json.dumps(
+            {
+                "job_id": self.job_id,
+                "state": self.state,
+                "stage": self.stage,
+                "progress": self.progress,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "result": self.result.model_dump(mode="json") if self.result is not None else None,
+                "error": self.error,
+                "owner": owner,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> tuple[TrainingJob, str]:
+        """(job, owner) from `to_json` output."""
+        data = json.loads(text)
+        owner = data.pop("owner")
+        for key in ("created_at", "started_at", "finished_at"):
+            if data[key] is not None:
+                data[key] = datetime.fromisoformat(data[key])
+        if data["result"] is not None:
+            data["result"] = TrainResponse.model_validate(data["result"])
+        return cls(**data), owner
+
+
+def _default_jobs_dir() -> Path:
+    return Path(__file__).resolve().parents[1] / "artifacts" / "jobs"
+
+
+def _report_progress(job_dir: Path, stage: str, progress: float) -> None:
+    # Written atomically so the API process never reads a half-written file.
+    tmp = job_dir / f"{_PROGRESS_FILENAME}.tmp"
+    tmp.write_text(json.dumps({"stage": stage, "progress": progress, "at": datetime.utcnow().isoformat()}))
+    os.replace(tmp, job_dir / _PROGRESS_FILENAME)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:  # e.g. no permission to signal it: it exists.
+        return True
+    return True
+
+
+def _init_job_worker(search_workers_cap: int) -> None:
+    # Runs once in every job worker process: share the cores between the concurrent jobs' searches.
+    from app.core.services.model_search import limit_search_workers
+
+    limit_search_workers(search_workers_cap)
+
+
+def _run_training_job(job_dir: str, options: Optional[dict[str, Any]] = None) -> TrainResponse:
+    """
+    Worker-process entry point: parse, validate, train and persist one spooled upload.
+
+    Runs in a separate process so the fit never blocks the API event loop. Uses its own
+    DB session (sessions/engines cannot be shared across processes). `options` are passed
+    through to `train_and_persist_from_dataframe` (e.g. `estimator`); with `out_of_core` set, the
+    upload is streamed by `train_and_persist_out_of_core` instead.
+    """
+    from app.core.db.dp import SessionLocal
+    from app.core.services.processing_service import read_validated_csv, validate_training_dataframe
+    from app.core.services.training_workflow_service import (
+        train_and_persist_from_dataframe,
+        train_and_persist_out_of_core,
+    )
+    from app.core.services.upload_cache import get_upload_cache
+
+    path = Path(job_dir)
+    options = dict(options or {})
+    out_of_core = options.pop("out_of_core", None)
+    digest = options.pop("upload_digest", None)
+    if out_of_core:
+        # Streams the spooled upload in chunks instead of loading it whole.
+        db = SessionLocal()
+        try:
+            return train_and_persist_out_of_core(
+                csv_path=str(path / _UPLOAD_FILENAME),
+                db=db,
+                mode=out_of_core,
+                on_progress=lambda stage, progress: _report_progress(path, stage, progress),
+                **options,
+            )
+        finally:
+            db.close()
+
+    _report_progress(path, "parsing", 0.1)
+    cache = get_upload_cache()
+    # A re-submitted upload skips parsing and validation: its typed frame is in the upload cache.
+    df = cache.get_frame("training", digest) if digest else None
+    if df is None:
+        df = read_validated_csv(str(path / _UPLOAD_FILENAME), validate_training_dataframe)
+        if digest:
+            cache.put_frame("training", digest, df)
+
+    db = SessionLocal()
+    try:
+        return train_and_persist_from_dataframe(
+            df=df,
+            db=db,
+            on_progress=lambda stage, progress: _report_progress(path, stage, progress),
+            **options,
+        )
+    finally:
+        db.close()
+
+
+def _run_retrain_job(job_dir: str, options: dict[str, Any]) -> TrainResponse:
+    """Worker-process entry point for a retrain from stored training rows (no upload)."""
+    from app.core.db.dp import SessionLocal
+    from app.core.services.training_workflow_service import retrain_and_persist_from_stored
+
+    path = Path(job_dir)
+    db = SessionLocal()
+    try:
+        return retrain_and_persist_from_stored(
+            db=db,
+            on_progress=lambda stage, progress: _report_progress(path, stage, progress),
+            **options,
+        )
+    finally:
+        db.close()
+
+
+class TrainingJobManager:
+    """
+    Registry of training jobs executed on a process pool.
+
+    Uploads are spooled to a per-job directory and fitted by a worker process. Each job's status
+    (state/stage/progress/result) is kept in `<jobs_dir>/<job_id>/job.json`, so every server
+    process (gunicorn worker) answers the job status endpoints for jobs submitted to any of them.
+    The submitting process owns the job: it runs the pool, updates job.json and enforces
+    TRAIN_QUEUE_MAX_DEPTH for its own jobs. Finished jobs keep only job.json, the newest
+    TRAIN_JOB_HISTORY of them.
+    """
+
+    def __init__(self, *, max_workers: int, max_queue_depth: int, max_history: int, jobs_dir: Path) -> None:
+        self.max_workers = max(int(max_workers), 1)
+        self.max_queue_depth = max(int(max_queue_depth), 1)
+        self.max_history = max(int(max_history), 1)
+        self.jobs_dir = jobs_dir
+        self._jobs: dict[str, TrainingJob] = {}
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        # Written into job.json: tells this process's jobs apart from other (live or dead) processes'.
+        self._owner = f"{os.getpid()}:{uuid4().hex}"
+
+    def submit(self, upload, *, options: Optional[dict[str, Any]] = None) -> tuple[TrainingJob, Future]:
+        """
+        Spool `upload` (a binary file object) to disk and queue it for training with `options`.
+
+        Raises TrainingQueueFullError when too many jobs are already pending.
+        """
+
+        options = dict(options or {})
+
+        def spool(job_dir: Path) -> None:
+            # The upload is hashed while it is copied, keying the upload cache (see upload_cache).
+            upload.seek(0)
+            reader = HashingReader(upload)
+            with open(job_dir / _UPLOAD_FILENAME, "wb") as dst:
+                shutil.copyfileobj(reader, dst, length=1024 * 1024)
+            options["upload_digest"] = reader.hexdigest()
+            if not options.get("out_of_core"):
+                # Hit/miss is counted here: the worker process's own counters are not visible.
+                get_upload_cache().has_frame("training", options["upload_digest"])
+
+        return self._submit(_run_training_job, options, spool=spool)
+
+    def submit_retrain(self, options: dict[str, Any]) -> tuple[TrainingJob, Future]:
+        """Queue a retrain from stored training rows (`retrain_and_persist_from_stored` keyword args)."""
+        return self._submit(_run_retrain_job, options)
+
+    def _submit(self, fn, options: Optional[dict[str, Any]], *, spool=None) -> tuple[TrainingJob, Future]:
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if not j.is_finished)
+            if pending >= self.max_queue_depth:
+                raise TrainingQueueFullError(
+                    f"Training queue is full ({pending} jobs pending); try again later"
+                )
+            job = TrainingJob(job_id=str(uuid4()))
+            self._jobs[job.job_id] = job
+            self._prune_history()
+
+        job_dir = self.jobs_dir / job.job_id
+        try:
+            job_dir.mkdir(parents=True, exist_ok=True)
+            self._save(job)
+            if spool is not None:
+                spool(job_dir)
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, str(job_dir), options)
+            except BrokenProcessPool:
+                # A worker died since the last job finished (e.g. OOM-killed): start a fresh pool.
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(fn, str(job_dir), options)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job.job_id, None)
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+
+        future.add_done_callback(lambda f, job_id=job.job_id: self._on_done(job_id, f, executor))
+        return job, future
+
+    def get(self, job_id: str) -> TrainingJob | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._refresh_progress(job)
+                return replace(job)
+        try:
+            # Also the path component of the job directory: only accept ids this manager creates.
+            if str(UUID(job_id)) != job_id:
+                return None
+        except ValueError:
+            return None
+        return self._load(self.jobs_dir / job_id)
+
+    def list(self) -> list[TrainingJob]:
+        """Jobs of every server process, newest first."""
+        with self._lock:
+            jobs = {job_id: replace(job) for job_id, job in self._jobs.items()}
+            for job in jobs.values():
+                self._refresh_progress(job)
+        if self.jobs_dir.exists():
+            for job_dir in self.jobs_dir.iterdir():
+                if job_dir.name not in jobs:
+                    job = self._load(job_dir)
+                    if job is not None:
+                        jobs[job.job_id] = job
+        return sorted(jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # "spawn" avoids forking the server process (threads, open DB connections).
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_job_worker,
+                    initargs=(max((os.cpu_count() or 1) // self.max_workers, 1),),
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool; the next submit builds a new one. Its jobs fail with BrokenProcessPool."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _save(self, job: TrainingJob) -> None:
+        _write_atomic(self.jobs_dir / job.job_id / _JOB_FILENAME, job.to_json(self._owner))
+
+    def _load(self, job_dir: Path) -> TrainingJob | None:
+        """A job from its job.json (None when missing or unreadable), with current progress."""
+        try:
+            job, owner = TrainingJob.from_json((job_dir / _JOB_FILENAME).read_text())
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if job.is_finished:
+            return job
+        if owner == self._owner:
+            with self._lock:
+                mine = self._jobs.get(job.job_id)
+                if mine is not None:
+                    self._refresh_progress(mine)
+                    return replace(mine)
+        if owner == self._owner or not _pid_alive(int(owner.split(":", 1)[0])):
+            # Ours but no longer registered, or its owner process is gone: it will never finish.
+            job.state, job.stage = "failed", "failed"
+            job.error = "Training job was lost: the server process that ran it exited"
+            return job
+        self._refresh_progress(job)
+        return job
+
+    def _refresh_progress(self, job: TrainingJob) -> None:
+        if job.is_finished:
+            return
+        try:
+            data = json.loads((self.jobs_dir / job.job_id / _PROGRESS_FILENAME).read_text())
+        except (OSError, ValueError):
+            return
+        if job.state == "queued":
+            job.state = "running"
+            job.started_at = datetime.fromisoformat(data["at"])
+        job.stage = str(data["stage"])
+        job.progress = float(data["progress"])
+
+    def _on_done(self, job_id: str, future: Future, executor: ProcessPoolExecutor) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            # Every job still queued or running on the pool fails the same way; later ones get a new pool.
+            self._discard_executor(executor)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._refresh_progress(job)
+                job.finished_at = datetime.utcnow()
+                if job.started_at is None:
+                    job.started_at = job.finished_at
+                if future.cancelled():
+                    job.state, job.stage, job.error = "failed", "cancelled", "Training job was cancelled"
+                elif future.exception() is not None:
+                    exc = future.exception()
+                    job.state, job.stage = "failed", "failed"
+                    if isinstance(exc, ValueError):
+                        job.error = str(exc)
+                    elif isinstance(exc, BrokenProcessPool):
+                        job.error = "Training worker process exited unexpectedly (e.g. out of memory)"
+                    else:
+                        job.error = "Training failed"
+                else:
+                    job.state, job.stage, job.progress = "succeeded", "done", 1.0
+                    job.result = future.result()
+                    # The worker's writes (training rows, new assets) are invisible to this process's
+                    # session hooks, and which assets it touched is not reported back.
+                    get_response_cache().invalidate_all()
+                self._save(job)
+                # Stage timers inside the worker process are lost with it; record the job here.
+                metrics = get_metrics()
+                metrics.observe_stage("training_job_queue", (job.started_at - job.created_at).total_seconds())
+                metrics.observe_stage(
+                    "training_job",
+                    (job.finished_at - job.started_at).total_seconds(),
+                    rows=job.result.rows_used if job.result is not None else None,
+                )
+        # Only job.json outlives the job (for status queries from any process).
+        for name in (_UPLOAD_FILENAME, _PROGRESS_FILENAME):
+            (self.jobs_dir / job_id / name).unlink(missing_ok=True)
+        self._prune_job_dirs()
+
+    def _prune_job_dirs(self) -> None:
+        """Remove the directories of finished jobs beyond the newest `max_history` (of all processes)."""
+        finished = [j for j in (self._load(d) for d in self.jobs_dir.iterdir()) if j is not None and j.is_finished]
+        finished.sort(key=lambda j: j.created_at, reverse=True)
+        for job in finished[self.max_history :]:
+            shutil.rmtree(self.jobs_dir / job.job_id, ignore_errors=True)
+
+    def _prune_history(self) -> None:
+        finished = [j for j in self._jobs.values() if j.is_finished]
+        overflow = len(self._jobs) - self.max_history
+        if overflow <= 0:
+            return
+        for job in sorted(finished, key=lambda j: j.created_at)[:overflow]:
+            del self._jobs[job.job_id]
+
+
+@lru_cache
+def get_training_job_manager() -> TrainingJobManager:
+    settings = get_settings()
+    return TrainingJobManager(
+        max_workers=settings.TRAIN_WORKERS,
+        max_queue_depth=settings.TRAIN_QUEUE_MAX_DEPTH,
+        max_history=settings.TRAIN_JOB_HISTORY,
+        jobs_dir=_default_jobs_dir(),
+    )
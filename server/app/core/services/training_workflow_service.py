@@ -1,31 +1,117 @@
 from __future__ import annotations
 
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
-from app.core.services.processing_service import read_csv_upload, validate_training_dataframe
-from app.core.services.train_model_service import train_from_dataframe
-from app.crud.model_metadata import create_model_metadata
-from app.crud.training_data import create_training_data_bulk
+from app.core.services.feature_service import SENSOR_COLUMNS
+from app.core.services.model_artifacts import default_artifact_path, load_estimator
+from app.core.services.model_search import SearchConfig
+from app.core.services.processing_service import (
+    iter_csv_chunks,
+    read_validated_csv_upload,
+    validate_training_dataframe,
+)
+from app.core.services.streaming_training import OutOfCoreMode, train_out_of_core
+from app.core.services.train_model_service import TrainResult, train_from_dataframe
+from app.crud.model_metadata import create_model_metadata, get_model_by_id
+from app.crud.training_data import create_training_data_from_dataframe, iter_training_data_columns
 from app.schemas.model_metadata import ModelMetadataCreate
 from app.schemas.train import TrainResponse
-from app.schemas.training_data import TrainingDataCreate
 
 
-async def train_and_persist_from_upload(*, file: UploadFile, db: Session) -> TrainResponse:
+async def train_and_persist_from_upload(
+    *, file: UploadFile, db: Session, estimator: Optional[str] = None, search: Optional[SearchConfig] = None
+) -> TrainResponse:
     """
     Orchestrates the MVP training workflow:
     upload -> parse -> validate -> train -> persist metadata (+ optional training rows).
 
     Keeps API routes thin and centralizes side effects.
     """
-    df = await read_csv_upload(file)
-    df = validate_training_dataframe(df)
-    result = train_from_dataframe(df)
+    # Chunked parse + validation on a worker thread: the event loop stays free.
+    df = await run_in_threadpool(read_validated_csv_upload, file, validate_training_dataframe)
+    return train_and_persist_from_dataframe(df=df, db=db, estimator=estimator, search=search)
+
+
+def train_and_persist_from_dataframe(
+    *,
+    df: pd.DataFrame,
+    db: Session,
+    on_progress: Optional[Callable[[str, float], None]] = None,
+    estimator: Optional[str] = None,
+    search: Optional[SearchConfig] = None,
+    warm_start_from: Optional[Any] = None,
+    add_estimators: int = 50,
+    store_training_data: Optional[bool] = None,
+) -> TrainResponse:
+    """
+    Synchronous train + persist step for an already validated training dataframe.
+
+    Shared by the in-request workflow and the background training jobs (which pass
+    `on_progress` to surface the current stage). `store_training_data` overrides
+    `STORE_TRAINING_DATA` (retrains do not store their already stored rows again).
+    """
+    if on_progress is not None:
+        on_progress("training", 0.3)
+    result = train_from_dataframe(
+        df, estimator=estimator, search=search, warm_start_from=warm_start_from, add_estimators=add_estimators
+    )
+
+    if store_training_data is None:
+        store_training_data = get_settings().STORE_TRAINING_DATA
+    return _persist_training_result(
+        db,
+        result,
+        training_chunks=[df] if store_training_data else None,
+        on_progress=on_progress,
+    )
+
+
+def train_and_persist_out_of_core(
+    *,
+    csv_path: str,
+    db: Session,
+    mode: OutOfCoreMode = "sample",
+    on_progress: Optional[Callable[[str, float], None]] = None,
+    estimator: Optional[str] = None,
+    search: Optional[SearchConfig] = None,
+) -> TrainResponse:
+    """
+    Train + persist for a CSV on disk that may not fit in memory (see `streaming_training`).
+
+    Training rows (with `STORE_TRAINING_DATA`) are stored by a second chunked pass over the file,
+    so memory stays bounded by the chunk size throughout.
+    """
+    if on_progress is not None:
+        on_progress("training", 0.3)
+    result = train_out_of_core(csv_path, mode=mode, estimator=estimator, search=search)
+
+    chunks = iter_csv_chunks(csv_path, validate_training_dataframe) if get_settings().STORE_TRAINING_DATA else None
+    return _persist_training_result(db, result, training_chunks=chunks, on_progress=on_progress)
+
 
-    settings = get_settings()
+def _persist_training_result(
+    db: Session,
+    result: TrainResult,
+    *,
+    training_chunks: Optional[Iterable[pd.DataFrame]],
+    on_progress: Optional[Callable[[str, float], None]] = None,
+) -> TrainResponse:
+    if on_progress is not None:
+        on_progress("persisting", 0.8)
 
+    stored_metrics: dict[str, Any] = dict(result.metrics)
+    if result.search_candidates is not None:
+        # Per-candidate scores and fit times of the search, kept with the model's metadata.
+        stored_metrics["search_table"] = result.search_candidates
     create_model_metadata(
         db,
         ModelMetadataCreate(
@@ -34,25 +120,13 @@ async def train_and_persist_from_upload(*, file: UploadFile, db: Session) -> Tra
             rows_used=result.rows_used,
             assets_count=result.assets,
             positive_rate=result.positive_rate,
-            metrics=result.metrics,
+            metrics=stored_metrics,
             model_path=result.model_path,
         ),
     )
 
-    if settings.STORE_TRAINING_DATA:
-        rows: list[TrainingDataCreate] = [
-            TrainingDataCreate(
-                model_id=result.model_id,
-                asset_id=str(r.asset_id),
-                temperature=float(r.temperature),
-                vibration=float(r.vibration),
-                pressure=float(r.pressure),
-                current=float(r.current),
-                label=int(r.label),
-            )
-            for r in df.itertuples(index=False)
-        ]
-        create_training_data_bulk(db, rows)
+    for chunk in training_chunks or ():
+        create_training_data_from_dataframe(db, model_id=result.model_id, df=chunk)
 
     return TrainResponse(
         model_id=result.model_id,
@@ -61,6 +135,92 @@ async def train_and_persist_from_upload(*, file: UploadFile, db: Session) -> Tra
         positive_rate=result.positive_rate,
         metrics=result.metrics,
         model_path=result.model_path,
+        estimator=result.estimator,
+        search_candidates=result.search_candidates,
+    )
+
+
+def load_stored_training_dataframe(
+    db: Session,
+    *,
+    model_ids: Optional[Sequence[str]] = None,
+    asset_ids: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """
+    Training dataframe built from stored `training_data` rows (see `iter_training_data_columns`).
+
+    Rows are fetched in chunks and concatenated column-wise into NumPy arrays. Stored rows have no
+    sensor timestamp, so `timestamp` is the row id: insertion order is upload order, which keeps
+    each asset's readings in time order for the windowed features.
+    """
+    chunks = list(
+        iter_training_data_columns(
+            db,
+            model_ids=model_ids,
+            asset_ids=asset_ids,
+            since=since,
+            until=until,
+            chunk_rows=get_settings().RETRAIN_FETCH_ROWS,
+        )
+    )
+    if not chunks:
+        raise ValueError("No stored training data matches the selection")
+
+    columns = {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+    return pd.DataFrame(
+        {
+            "timestamp": columns["id"],
+            "asset_id": columns["asset_id"],
+            **{name: columns[name] for name in SENSOR_COLUMNS},
+            "label": columns["label"],
+        }
+    )
+
+
+def retrain_and_persist_from_stored(
+    *,
+    db: Session,
+    model_ids: Optional[Sequence[str]] = None,
+    asset_ids: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    estimator: Optional[str] = None,
+    warm_start_model_id: Optional[str] = None,
+    add_estimators: int = 50,
+    on_progress: Optional[Callable[[str, float], None]] = None,
+) -> TrainResponse:
+    """
+    Train a new model from stored training rows instead of an upload.
+
+    With `warm_start_model_id`, that model's forest is loaded and grown by `add_estimators` trees
+    fitted on the selected rows; otherwise a fresh `estimator` is fitted.
+    """
+    if on_progress is not None:
+        on_progress("loading", 0.1)
+    df = load_stored_training_dataframe(db, model_ids=model_ids, asset_ids=asset_ids, since=since, until=until)
+
+    warm_start_from = None
+    if warm_start_model_id:
+        warm_start_from = _load_estimator_for_model(db, warm_start_model_id)
+
+    return train_and_persist_from_dataframe(
+        df=df,
+        db=db,
+        on_progress=on_progress,
+        estimator=estimator,
+        warm_start_from=warm_start_from,
+        add_estimators=add_estimators,
+        store_training_data=False,
     )
 
 
+def _load_estimator_for_model(db: Session, model_id: str) -> Any:
+    meta = get_model_by_id(db, model_id=model_id)
+    if not meta:
+        raise ValueError(f"Unknown model_id: {model_id}")
+    for path in (Path(meta.model_path) if meta.model_path else None, default_artifact_path(model_id)):
+        if path is not None and path.exists():
+            return load_estimator(path)
+    raise ValueError("Model artifact not found on disk for this model_id")
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Literal, Optional
+
+import pandas as pd
+
+from app.core.config import get_settings
+
+try:  # Parquet needs pyarrow; without it frames are cached as pickles.
+    import pyarrow  # noqa: F401
+
+    _FRAME_SUFFIX = ".parquet"
+except ImportError:  # pragma: no cover - depends on the environment
+    _FRAME_SUFFIX = ".pkl"
+
+FrameKind = Literal["inference", "training"]
+
+_HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    return Path(__file__).resolve().parents[1] / "artifacts" / "upload_cache"
+
+
+class HashingReader:
+    """Binary file wrapper that hashes (sha256) everything read through it."""
+
+    def __init__(self, raw: BinaryIO) -> None:
+        self._raw = raw
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self._hash.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def hash_file(handle: BinaryIO) -> str:
+    """sha256 of a binary file's content, read in blocks from the start (position is restored)."""
+    handle.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: handle.read(_HASH_BLOCK_BYTES), b""):
+        digest.update(block)
+    handle.seek(0)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class UploadCacheStats:
+    enabled: bool
+    entries: int
+    bytes: int
+    max_bytes: int
+    frame_hits: int
+    frame_misses: int
+    result_hits: int
+    result_misses: int
+    evictions: int
+
+    @property
+    def frame_hit_rate(self) -> float:
+        total = self.frame_hits + self.frame_misses
+        return self.frame_hits / total if total else 0.0
+
+    @property
+    def result_hit_rate(self) -> float:
+        total = self.result_hits + self.result_misses
+        return self.result_hits / total if total else 0.0
+
+
+class UploadCache:
+    """
+    Content-addressed on-disk cache of parsed uploads and prediction responses.
+
+    Keys are sha256 digests of the uploaded bytes. Validated frames are stored per kind
+    ("inference" / "training", which validate differently) as Parquet (pickle without pyarrow);
+    predict responses per (digest, model_id). Writes go through a temporary file and a rename, so
+    concurrent readers (other workers, training processes) never see partial entries.
+
+    The directory is shared by all processes, and so is the `max_bytes` budget. Each process keeps
+    an LRU index of the entries it knows of (one directory scan at start-up, plus its own writes
+    and hits) with a running byte total, so writes cost O(1). Only when that total goes over the
+    budget does it rescan the directory, picking up other processes' writes and evictions, and
+    evict the least recently used entries (by file mtime, bumped on hits) whoever wrote them; the
+    directory can therefore overshoot by what other processes wrote since the last rescan.
+    Hit/miss counters and `stats()` are per process.
+
+    Cached predict responses only save work; `POST /predict` idempotency is enforced by the
+    database (`prediction_upload`), so evicting or clearing entries never stores predictions twice.
+    """
+
+    def __init__(self, root: Path, *, max_bytes: int, enabled: bool = True) -> None:
+        self.root = root
+        self.max_bytes = max(int(max_bytes), 0)
+        self.enabled = enabled and self.max_bytes > 0
+        self._lock = threading.Lock()
+        self._frame_hits = self._frame_misses = 0
+        self._result_hits = self._result_misses = 0
+        self._evictions = 0
+        # Entry path -> size in bytes, least recently used first, and their running total.
+        self._entries: OrderedDict[Path, int] = OrderedDict()
+        self._bytes = 0
+        self._result_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        if self.enabled:
+            with self._lock:
+                self._rescan()
+                self._evict()
+
+    def frame_path(self, kind: FrameKind, digest: str) -> Path:
+        return self.root / kind / f"{digest}{_FRAME_SUFFIX}"
+
+    def result_path(self, digest: str, model_id: str) -> Path:
+        return self.root / "results" / f"{digest}.{model_id}.json"
+
+    def get_frame(self, kind: FrameKind, digest: str) -> Optional[pd.DataFrame]:
+        if not self.enabled:
+            return None
+        path = self.frame_path(kind, digest)
+        try:
+            df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_pickle(path)
+        except Exception:
+            # Missing (e.g. evicted by another process) or unreadable: treat as a miss.
+            self._forget(path)
+            self._record(frame_hit=False)
+            return None
+        self._touch(path)
+        self._record(frame_hit=True)
+        return df
+
+    def has_frame(self, kind: FrameKind, digest: str, *, record: bool = True) -> bool:
+        """Whether a frame is cached (counted as a hit/miss when `record`)."""
+        found = self.enabled and self.frame_path(kind, digest).exists()
+        if record and self.enabled:
+            self._record(frame_hit=found)
+        return found
+
+    def put_frame(self, kind: FrameKind, digest: str, df: pd.DataFrame) -> None:
+        if not self.enabled:
+            return
+        path = self.frame_path(kind, digest)
+        if path.suffix == ".parquet":
+            self._write(path, lambda tmp: df.to_parquet(tmp, index=False))
+        else:
+            self._write(path, lambda tmp: df.to_pickle(tmp))
+
+    def get_result(self, digest: str, model_id: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        path = self.result_path(digest, model_id)
+        try:
+            body = path.read_bytes()
+        except OSError:
+            self._forget(path)
+            self._record(result_hit=False)
+            return None
+        self._touch(path)
+        self._record(result_hit=True)
+        return body
+
+    def put_result(self, digest: str, model_id: str, body: bytes) -> None:
+        if self.enabled:
+            self._write(self.result_path(digest, model_id), lambda tmp: tmp.write_bytes(body))
+
+    def result_lock(self, digest: str, model_id: str) -> asyncio.Lock:
+        """Per-(digest, model_id) lock: identical concurrent predicts of this process are scored once."""
+        key = f"{digest}/{model_id}"
+        with self._lock:
+            lock = self._result_locks.get(key)
+            if lock is None:
+                lock = asyncio.Lock()
+                self._result_locks[key] = lock
+            return lock
+
+    def stats(self) -> UploadCacheStats:
+        """Counters of this process; entries and bytes as of its last scan plus its own writes."""
+        with self._lock:
+            return UploadCacheStats(
+                enabled=self.enabled,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                frame_hits=self._frame_hits,
+                frame_misses=self._frame_misses,
+                result_hits=self._result_hits,
+                result_misses=self._result_misses,
+                evictions=self._evictions,
+            )
+
+    def clear(self) -> None:
+        """Remove every entry, including those written by other processes."""
+        with self._lock:
+            if self.root.exists():
+                for path in self.root.rglob("*"):
+                    if path.is_file():
+                        path.unlink(missing_ok=True)
+            self._entries.clear()
+            self._bytes = 0
+
+    def _record(self, *, frame_hit: Optional[bool] = None, result_hit: Optional[bool] = None) -> None:
+        with self._lock:
+            if frame_hit is not None:
+                if frame_hit:
+                    self._frame_hits += 1
+                else:
+                    self._frame_misses += 1
+            if result_hit is not None:
+                if result_hit:
+                    self._result_hits += 1
+                else:
+                    self._result_misses += 1
+
+    def _disk_entries(self) -> list[tuple[Path, int, float]]:
+        """(path, size, last used) of every entry on disk, written by any process."""
+        entries = []
+        if not self.root.exists():
+            return entries
+        for path in self.root.rglob("*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                st = path.stat()
+            except OSError:  # Evicted by another process meanwhile.
+                continue
+            if path.is_file():
+                entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _touch(self, path: Path) -> None:
+        # The mtime is the LRU order shared with other processes.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+
+    def _forget(self, path: Path) -> None:
+        with self._lock:
+            self._bytes -= self._entries.pop(path, 0)
+
+    def _write(self, path: Path, write: Callable[[Path], object]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            write(tmp)
+            size = tmp.stat().st_size
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        with self._lock:
+            self._bytes += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+            if self._bytes > self.max_bytes:
+                # Over budget as far as this process knows: refresh from disk before evicting.
+                self._rescan()
+                self._evict()
+
+    def _rescan(self) -> None:
+        # Caller holds the lock.
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        self._entries = OrderedDict((path, size) for path, size, _ in entries)
+        self._bytes = sum(self._entries.values())
+
+    def _evict(self) -> None:
+        # Caller holds the lock (which only serializes this process's evictions).
+        while self._bytes > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            path.unlink(missing_ok=True)
+            self._bytes -= size
+            self._evictions += 1
+
+
+@lru_cache
+def get_upload_cache() -> UploadCache:
+    settings = get_settings()
+    return UploadCache(
+        Path(settings.UPLOAD_CACHE_DIR) if settings.UPLOAD_CACHE_DIR else default_cache_dir(),
+        max_bytes=settings.UPLOAD_CACHE_MAX_BYTES,
+        enabled=settings.UPLOAD_CACHE_ENABLED,
+    )
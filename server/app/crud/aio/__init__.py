@@ -0,0 +1,7 @@
+"""
+Async (`AsyncSession`) counterparts of the `app.crud` modules, used when the async database
+layer is enabled (see `app/core/db/async_db.py`).
+
+Reads are native `select()` statements. Bulk writes run the sync implementations through
+`AsyncSession.run_sync`, so the columnar executemany fast paths are shared, not duplicated.
+"""
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.assets import _bucket_index, _history_range_filter
+from app.models.asset import AssetStatus
+from app.models.prediction import Prediction
+from app.models.training_data import TrainingData
+
+
+async def get_assets_with_latest_prediction(db: AsyncSession) -> list[AssetStatus]:
+    """Every known asset with its latest prediction, from the `asset_status` table."""
+    return list(await db.scalars(select(AssetStatus).order_by(AssetStatus.asset_id.asc())))
+
+
+async def get_latest_prediction_for_asset(db: AsyncSession, asset_id: str) -> Prediction | None:
+    stmt = (
+        select(Prediction)
+        .where(Prediction.asset_id == asset_id)
+        .order_by(Prediction.timestamp.desc(), Prediction.created_at.desc())
+        .limit(1)
+    )
+    return await db.scalar(stmt)
+
+
+async def get_prediction_history_for_asset(db: AsyncSession, asset_id: str, *, limit: int = 50) -> list[Prediction]:
+    """Most recent `limit` predictions for the asset, in ascending timestamp order."""
+    stmt = (
+        select(Prediction)
+        .where(Prediction.asset_id == asset_id)
+        .order_by(Prediction.timestamp.desc(), Prediction.id.desc())
+        .limit(limit)
+    )
+    rows = list(await db.scalars(stmt))
+    rows.reverse()
+    return rows
+
+
+async def get_prediction_history_page(
+    db: AsyncSession,
+    asset_id: str,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    after: tuple[datetime, int] | None = None,
+    limit: int = 500,
+) -> list[Prediction]:
+    """One keyset page of predictions in [start, end), ascending by (timestamp, id)."""
+    stmt = _history_range_filter(select(Prediction), asset_id, start, end)
+    if after is not None:
+        after_ts, after_id = after
+        stmt = stmt.where(
+            or_(
+                Prediction.timestamp > after_ts,
+                and_(Prediction.timestamp == after_ts, Prediction.id > after_id),
+            )
+        )
+    stmt = stmt.order_by(Prediction.timestamp.asc(), Prediction.id.asc()).limit(limit)
+    return list(await db.scalars(stmt))
+
+
+async def get_prediction_history_bounds(
+    db: AsyncSession, asset_id: str, *, start: datetime | None = None, end: datetime | None = None
+) -> tuple[datetime | None, datetime | None]:
+    """First and last prediction timestamps in [start, end) (two index lookups)."""
+    stmt = _history_range_filter(select(Prediction.timestamp), asset_id, start, end)
+    first = await db.scalar(stmt.order_by(Prediction.timestamp.asc()).limit(1))
+    last = await db.scalar(stmt.order_by(Prediction.timestamp.desc()).limit(1))
+    return first, last
+
+
+async def get_prediction_history_buckets(
+    db: AsyncSession,
+    asset_id: str,
+    *,
+    start: datetime,
+    end: datetime,
+    buckets: int,
+):
+    """Rows of (bucket, count, first_ts, last_ts, min_p, max_p, mean_p) over [start, end], in SQL."""
+    width = max((end - start).total_seconds() / buckets, 1e-6)
+    bucket = _bucket_index(db, start=start, width_seconds=width, buckets=buckets).label("bucket")
+    stmt = _history_range_filter(
+        select(
+            bucket,
+            func.count(Prediction.id).label("count"),
+            func.min(Prediction.timestamp).label("first_ts"),
+            func.max(Prediction.timestamp).label("last_ts"),
+            func.min(Prediction.failure_probability).label("min_p"),
+            func.max(Prediction.failure_probability).label("max_p"),
+            func.avg(Prediction.failure_probability).label("mean_p"),
+        ),
+        asset_id,
+        start,
+        None,
+    ).where(Prediction.timestamp <= end)
+    return list(await db.execute(stmt.group_by(bucket).order_by(bucket)))
+
+
+async def get_predictions_by_ids(db: AsyncSession, ids: list[int]) -> list[Prediction]:
+    if not ids:
+        return []
+    stmt = (
+        select(Prediction)
+        .where(Prediction.id.in_(ids))
+        .order_by(Prediction.timestamp.asc(), Prediction.id.asc())
+    )
+    return list(await db.scalars(stmt))
+
+
+async def get_recent_training_samples_for_asset(
+    db: AsyncSession, asset_id: str, *, limit: int = 24
+) -> list[TrainingData]:
+    stmt = (
+        select(TrainingData)
+        .where(TrainingData.asset_id == asset_id)
+        .order_by(TrainingData.id.desc())
+        .limit(limit)
+    )
+    return list(await db.scalars(stmt))
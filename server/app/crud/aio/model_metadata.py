@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.model_metadata import ModelMetadata
+from app.schemas.model_metadata import ModelMetadataCreate
+
+
+async def create_model_metadata(db: AsyncSession, obj_in: ModelMetadataCreate) -> ModelMetadata:
+    db_obj = ModelMetadata(
+        model_id=obj_in.model_id,
+        training_date=obj_in.training_date,
+        rows_used=obj_in.rows_used,
+        assets_count=obj_in.assets_count,
+        positive_rate=obj_in.positive_rate,
+        metrics=obj_in.metrics,
+        model_path=obj_in.model_path,
+    )
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def get_model_by_id(db: AsyncSession, model_id: str) -> ModelMetadata | None:
+    return await db.scalar(select(ModelMetadata).where(ModelMetadata.model_id == model_id).limit(1))
+
+
+async def get_all_models(db: AsyncSession, *, skip: int = 0, limit: int = 100) -> list[ModelMetadata]:
+    return list(await db.scalars(select(ModelMetadata).offset(skip).limit(limit)))
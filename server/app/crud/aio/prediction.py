@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import prediction as sync_prediction
+from app.crud.bulk import BulkWriteStats
+from app.models.prediction import Prediction
+
+
+async def create_predictions_from_columns(
+    db: AsyncSession,
+    *,
+    model_id: str,
+    asset_ids: Sequence[str],
+    timestamps: np.ndarray,
+    failure_probabilities: np.ndarray,
+    risk_levels: Sequence[str],
+    commit: bool = True,
+) -> BulkWriteStats:
+    """Async `crud.prediction.create_predictions_from_columns` (same transaction semantics)."""
+    return await db.run_sync(
+        lambda session: sync_prediction.create_predictions_from_columns(
+            session,
+            model_id=model_id,
+            asset_ids=asset_ids,
+            timestamps=timestamps,
+            failure_probabilities=failure_probabilities,
+            risk_levels=risk_levels,
+            commit=commit,
+        )
+    )
+
+
+async def get_prediction_history(db: AsyncSession, asset_id: str, limit: int = 100) -> list[Prediction]:
+    """Predictions for an asset, ascending by timestamp (first `limit`)."""
+    stmt = (
+        select(Prediction)
+        .where(Prediction.asset_id == asset_id)
+        .order_by(Prediction.timestamp.asc())
+        .limit(limit)
+    )
+    return list(await db.scalars(stmt))
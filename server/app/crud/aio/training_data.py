@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import training_data as sync_training_data
+from app.crud.bulk import BulkWriteStats
+from app.models.training_data import TrainingData
+
+
+async def create_training_data_from_dataframe(db: AsyncSession, *, model_id: str, df: pd.DataFrame) -> BulkWriteStats:
+    """Async `crud.training_data.create_training_data_from_dataframe`."""
+    return await db.run_sync(
+        lambda session: sync_training_data.create_training_data_from_dataframe(session, model_id=model_id, df=df)
+    )
+
+
+async def get_training_data_by_model(
+    db: AsyncSession, model_id: str, *, skip: int = 0, limit: int = 1000
+) -> list[TrainingData]:
+    stmt = select(TrainingData).where(TrainingData.model_id == model_id).offset(skip).limit(limit)
+    return list(await db.scalars(stmt))
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import pandas as pd
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.crud.asset_status import _dialect_insert
+from app.models.asset_reading_tail import AssetReadingTail
+
+_TAIL_COLUMNS = ("asset_id", "timestamp", "temperature", "vibration", "pressure", "current")
+
+# asset ids per IN (...) list, well below SQLite's bound-parameter limit.
+_IN_CHUNK = 500
+
+
+def get_reading_tails(db: Session, asset_ids: Sequence[str]) -> pd.DataFrame:
+    """Stored tail readings of `asset_ids` (timestamps as UTC-aware), sorted by (asset_id, timestamp)."""
+    ids = list(dict.fromkeys(str(a) for a in asset_ids))
+    rows = []
+    for start in range(0, len(ids), _IN_CHUNK):
+        stmt = select(*(getattr(AssetReadingTail, c) for c in _TAIL_COLUMNS)).where(
+            AssetReadingTail.asset_id.in_(ids[start : start + _IN_CHUNK])
+        )
+        rows.extend(db.execute(stmt).all())
+    df = pd.DataFrame(rows, columns=list(_TAIL_COLUMNS))
+    df["timestamp"] = pd.to_datetime(df["timestamp"]).dt.tz_localize("UTC")
+    for col in _TAIL_COLUMNS[2:]:
+        df[col] = df[col].astype(float)
+    return df.sort_values(["asset_id", "timestamp"], kind="stable").reset_index(drop=True)
+
+
+def add_reading_tails(db: Session, df: pd.DataFrame, *, max_rows: int) -> int:
+    """
+    Add readings to the stored tails and trim every touched asset to its newest `max_rows` (does not commit).
+
+    Readings already stored (same asset and timestamp) are skipped. Trimming ranks the merged rows
+    by timestamp in SQL, so concurrent writers (other worker processes) never drop newer readings
+    in favour of older ones.
+    """
+    if df.empty:
+        return 0
+    ts = pd.to_datetime(df["timestamp"], utc=True).dt.tz_localize(None)
+    rows = [
+        dict(zip(_TAIL_COLUMNS, values))
+        for values in zip(
+            df["asset_id"].astype(str).tolist(),
+            [t.to_pydatetime() for t in ts],
+            *(df[c].astype(float).tolist() for c in _TAIL_COLUMNS[2:]),
+        )
+    ]
+
+    insert_fn = _dialect_insert(db)
+    if insert_fn is None:
+        db.execute(insert(AssetReadingTail), rows)
+    else:
+        db.execute(insert_fn(AssetReadingTail).on_conflict_do_nothing(), rows)
+
+    ids = list(dict.fromkeys(r["asset_id"] for r in rows))
+    for start in range(0, len(ids), _IN_CHUNK):
+        ranked = (
+            select(
+                AssetReadingTail.id,
+                func.row_number()
+                .over(
+                    partition_by=AssetReadingTail.asset_id,
+                    order_by=(AssetReadingTail.timestamp.desc(), AssetReadingTail.id.desc()),
+                )
+                .label("rank"),
+            )
+            .where(AssetReadingTail.asset_id.in_(ids[start : start + _IN_CHUNK]))
+            .subquery()
+        )
+        db.execute(
+            delete(AssetReadingTail)
+            .where(AssetReadingTail.id.in_(select(ranked.c.id).where(ranked.c.rank > max_rows)))
+            .execution_options(synchronize_session=False)
+        )
+    return len(rows)
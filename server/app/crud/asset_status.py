@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.services.response_cache import get_response_cache
+from app.crud.bulk import bulk_insert_columns
+from app.models.asset import AssetStatus
+from app.models.prediction import Prediction
+from app.models.training_data import TrainingData
+
+_PREDICTION_COLUMNS = ("risk_level", "failure_probability", "timestamp", "model_id")
+
+
+# Session.info key: asset ids written in the current transaction (None once every asset changed).
+_CHANGED_ASSETS = "changed_asset_ids"
+
+
+def mark_assets_changed(db: Session, asset_ids: Optional[Iterable[str]]) -> None:
+    """Invalidate these assets' cached responses once `db` commits (`None`: every asset)."""
+    if asset_ids is None:
+        db.info[_CHANGED_ASSETS] = None
+        return
+    changed = db.info.setdefault(_CHANGED_ASSETS, set())
+    if changed is not None:
+        changed.update(str(a) for a in asset_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_assets(session: Session) -> None:
+    if _CHANGED_ASSETS not in session.info:
+        return
+    changed = session.info.pop(_CHANGED_ASSETS)
+    if changed is None:
+        get_response_cache().invalidate_all()
+    else:
+        get_response_cache().invalidate_assets(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_assets(session: Session) -> None:
+    session.info.pop(_CHANGED_ASSETS, None)
+
+
+def _dialect_insert(db: Session):
+    name = db.get_bind().dialect.name
+    if name == "sqlite":
+        return sqlite.insert
+    if name == "postgresql":
+        return postgresql.insert
+    return None
+
+
+def upsert_latest_predictions(
+    db: Session,
+    *,
+    asset_ids: Sequence[str],
+    model_ids: Sequence[str],
+    timestamps: Any,
+    failure_probabilities: Any,
+    risk_levels: Sequence[str],
+) -> int:
+    """
+    Fold a batch of new predictions into `asset_status` (does not commit).
+
+    The batch is first reduced to its latest row per asset; a stored status is only replaced by a
+    prediction whose timestamp is the same or newer, so out-of-order writes never regress it.
+    Ties go to the most recent write, matching `get_latest_prediction_for_asset`.
+    """
+    if len(asset_ids) == 0:
+        return 0
+
+    batch = pd.DataFrame(
+        {
+            "asset_id": np.asarray(asset_ids, dtype=object),
+            "model_id": np.asarray(model_ids, dtype=object),
+            "timestamp": pd.to_datetime(np.asarray(timestamps)).astype("datetime64[us]"),
+            "failure_probability": np.asarray(failure_probabilities, dtype=float),
+            "risk_level": np.asarray(risk_levels, dtype=object),
+        }
+    )
+    latest = batch.sort_values("timestamp", kind="stable").drop_duplicates("asset_id", keep="last")
+    rows = [
+        {"asset_id": a, "model_id": m, "timestamp": ts, "failure_probability": p, "risk_level": r}
+        for a, m, ts, p, r in zip(
+            latest["asset_id"].tolist(),
+            latest["model_id"].tolist(),
+            latest["timestamp"].to_numpy().tolist(),
+            latest["failure_probability"].tolist(),
+            latest["risk_level"].tolist(),
+        )
+    ]
+
+    mark_assets_changed(db, latest["asset_id"].tolist())
+
+    insert_fn = _dialect_insert(db)
+    if insert_fn is None:
+        _merge_latest_generic(db, rows)
+        return len(rows)
+
+    stmt = insert_fn(AssetStatus)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AssetStatus.asset_id],
+        set_={c: stmt.excluded[c] for c in _PREDICTION_COLUMNS} | {"updated_at": func.now()},
+        where=AssetStatus.timestamp.is_(None) | (stmt.excluded.timestamp >= AssetStatus.timestamp),
+    )
+    db.execute(stmt, rows)
+    return len(rows)
+
+
+def register_assets(db: Session, asset_ids: Sequence[str]) -> int:
+    """Make sure every asset id has an `asset_status` row (does not commit, keeps existing rows)."""
+    unique = pd.unique(np.asarray(asset_ids, dtype=object))
+    if unique.size == 0:
+        return 0
+    rows = [{"asset_id": str(a)} for a in unique.tolist()]
+
+    mark_assets_changed(db, unique.tolist())
+
+    insert_fn = _dialect_insert(db)
+    if insert_fn is None:
+        known = set(db.scalars(select(AssetStatus.asset_id).where(AssetStatus.asset_id.in_(unique.tolist()))))
+        db.add_all(AssetStatus(asset_id=r["asset_id"]) for r in rows if r["asset_id"] not in known)
+        return len(rows)
+
+    db.execute(insert_fn(AssetStatus).on_conflict_do_nothing(index_elements=[AssetStatus.asset_id]), rows)
+    return len(rows)
+
+
+def _merge_latest_generic(db: Session, rows: list[dict[str, Any]]) -> None:
+    # Portable (slower) fallback for dialects without INSERT ... ON CONFLICT.
+    existing = {
+        s.asset_id: s
+        for s in db.scalars(select(AssetStatus).where(AssetStatus.asset_id.in_([r["asset_id"] for r in rows])))
+    }
+    for r in rows:
+        status = existing.get(r["asset_id"])
+        if status is None:
+            db.add(AssetStatus(**r))
+        elif status.timestamp is None or r["timestamp"] >= status.timestamp:
+            for c in _PREDICTION_COLUMNS:
+                setattr(status, c, r[c])
+
+
+def get_asset_statuses(db: Session) -> list[AssetStatus]:
+    return list(db.scalars(select(AssetStatus).order_by(AssetStatus.asset_id.asc())))
+
+
+def rebuild_asset_status(db: Session) -> int:
+    """
+    Recompute `asset_status` from the full prediction/training history and commit.
+
+    Backfill for databases created before the table existed (or to repair drift). This is the
+    expensive whole-history scan the table exists to avoid, so it is not used on request paths.
+    """
+    ranked = select(
+        Prediction.asset_id,
+        Prediction.risk_level,
+        Prediction.failure_probability,
+        Prediction.timestamp,
+        Prediction.model_id,
+        func.row_number()
+        .over(
+            partition_by=Prediction.asset_id,
+            order_by=(Prediction.timestamp.desc(), Prediction.id.desc()),
+        )
+        .label("rn"),
+    ).subquery("ranked")
+    latest = db.execute(
+        select(
+            ranked.c.asset_id,
+            ranked.c.risk_level,
+            ranked.c.failure_probability,
+            ranked.c.timestamp,
+            ranked.c.model_id,
+        ).where(ranked.c.rn == 1)
+    ).all()
+
+    predicted = {r.asset_id for r in latest}
+    training_only = [
+        a for a in db.scalars(select(TrainingData.asset_id).distinct()) if a not in predicted
+    ]
+
+    db.execute(delete(AssetStatus))
+    bulk_insert_columns(
+        db,
+        AssetStatus.__table__,
+        {
+            "asset_id": [r.asset_id for r in latest] + training_only,
+            "risk_level": [r.risk_level for r in latest] + [None] * len(training_only),
+            "failure_probability": [r.failure_probability for r in latest] + [None] * len(training_only),
+            "timestamp": [r.timestamp for r in latest] + [None] * len(training_only),
+            "model_id": [r.model_id for r in latest] + [None] * len(training_only),
+        },
+        commit=False,
+    )
+    mark_assets_changed(db, None)
+    db.commit()
+    return len(latest) + len(training_only)
+
+
+def backfill_asset_status_if_empty(db: Session) -> int:
+    """Rebuild `asset_status` once when it is empty but history exists (e.g. right after upgrading)."""
+    if db.scalar(select(AssetStatus.asset_id).limit(1)) is not None:
+        return 0
+    has_history = (
+        db.scalar(select(Prediction.id).limit(1)) is not None
+        or db.scalar(select(TrainingData.id).limit(1)) is not None
+    )
+    return rebuild_asset_status(db) if has_history else 0
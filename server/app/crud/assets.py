@@ -1,65 +1,24 @@
 from __future__ import annotations
 
-from sqlalchemy import func
+from datetime import datetime
+
+from sqlalchemy import Integer, and_, cast, func, or_
 from sqlalchemy.orm import Session
 
+from app.crud.asset_status import get_asset_statuses
+from app.models.asset import AssetStatus
 from app.models.prediction import Prediction
 from app.models.training_data import TrainingData
 
 
-def get_assets_with_latest_prediction(db: Session):
+def get_assets_with_latest_prediction(db: Session) -> list[AssetStatus]:
     """
     Return rows shaped as (asset_id, risk_level?, failure_probability?, timestamp?, model_id?)
     for every unique asset observed either in training_data or prediction tables.
-    """
-    # Distinct assets from training data and predictions; union them for completeness.
-    assets_td = db.query(TrainingData.asset_id.label("asset_id")).distinct()
-    assets_pred = db.query(Prediction.asset_id.label("asset_id")).distinct()
-    assets_union = assets_td.union(assets_pred).subquery("assets")
-
-    # Latest prediction timestamp per asset.
-    latest_ts = (
-        db.query(
-            Prediction.asset_id.label("asset_id"),
-            func.max(Prediction.timestamp).label("max_ts"),
-        )
-        .group_by(Prediction.asset_id)
-        .subquery("latest_ts")
-    )
-
-    # Join back to predictions to get the whole latest row.
-    latest_pred = (
-        db.query(
-            Prediction.asset_id.label("asset_id"),
-            Prediction.risk_level,
-            Prediction.failure_probability,
-            Prediction.timestamp,
-            Prediction.model_id,
-        )
-        .join(
-            latest_ts,
-            (Prediction.asset_id == latest_ts.c.asset_id)
-            & (Prediction.timestamp == latest_ts.c.max_ts),
-        )
-        .subquery("latest_pred")
-    )
-
-    # Outer join assets with their latest prediction (if any).
-    rows = (
-        db.query(
-            assets_union.c.asset_id,
-            latest_pred.c.risk_level,
-            latest_pred.c.failure_probability,
-            latest_pred.c.timestamp,
-            latest_pred.c.model_id,
-        )
-        .select_from(assets_union)
-        .outerjoin(latest_pred, latest_pred.c.asset_id == assets_union.c.asset_id)
-        .order_by(assets_union.c.asset_id.asc())
-        .all()
-    )
 
-    return rows
+    Reads the incrementally maintained `asset_status` table: O(#assets), independent of history size.
+    """
+    return get_asset_statuses(db)
 
 
 def get_latest_prediction_for_asset(db: Session, asset_id: str) -> Prediction | None:
@@ -74,13 +33,198 @@ def get_latest_prediction_for_asset(db: Session, asset_id: str) -> Prediction |
 def get_prediction_history_for_asset(
     db: Session, asset_id: str, *, limit: int = 50
 ) -> list[Prediction]:
-    return (
+    """Most recent `limit` predictions for the asset, in ascending timestamp order."""
+    rows = (
         db.query(Prediction)
         .filter(Prediction.asset_id == asset_id)
-        .order_by(Prediction.timestamp.asc(), Prediction.created_at.asc())
+        .order_by(Prediction.timestamp.desc(), Prediction.id.desc())
         .limit(limit)
         .all()
     )
+    rows.reverse()
+    return rows
+
+
+def _history_range_filter(query, asset_id: str, start: datetime | None, end: datetime | None):
+    query = query.filter(Prediction.asset_id == asset_id)
+    if start is not None:
+        query = query.filter(Prediction.timestamp >= start)
+    if end is not None:
+        query = query.filter(Prediction.timestamp < end)
+    return query
+
+
+def get_prediction_history_page(
+    db: Session,
+    asset_id: str,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    after: tuple[datetime, int] | None = None,
+    limit: int = 500,
+) -> list[Prediction]:
+    """
+    One page of predictions in [start, end), ascending by (timestamp, id).
+
+    `after` is the (timestamp, id) keyset cursor of the last row of the previous page; each page
+    is a range scan on the (asset_id, timestamp) index regardless of how deep it is.
+    """
+    query = _history_range_filter(db.query(Prediction), asset_id, start, end)
+    if after is not None:
+        after_ts, after_id = after
+        query = query.filter(
+            or_(
+                Prediction.timestamp > after_ts,
+                and_(Prediction.timestamp == after_ts, Prediction.id > after_id),
+            )
+        )
+    return query.order_by(Prediction.timestamp.asc(), Prediction.id.asc()).limit(limit).all()
+
+
+def get_prediction_history_bounds(
+    db: Session, asset_id: str, *, start: datetime | None = None, end: datetime | None = None
+) -> tuple[datetime | None, datetime | None]:
+    """First and last prediction timestamps in [start, end) (two index lookups)."""
+    query = _history_range_filter(db.query(Prediction.timestamp), asset_id, start, end)
+    first = query.order_by(Prediction.timestamp.asc()).limit(1).scalar()
+    last = query.order_by(Prediction.timestamp.desc()).limit(1).scalar()
+    return first, last
+
+
+def _bucket_index(db: Session, *, start: datetime, width_seconds: float, buckets: int):
+    """SQL expression for the 0-based time bucket of `Prediction.timestamp` (last bucket is closed)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        offset = (func.julianday(Prediction.timestamp) - func.julianday(start)) * 86400.0
+        # offset >= 0 inside the range, so CAST truncation is a floor.
+        return func.min(cast(offset / width_seconds, Integer), buckets - 1)
+    if dialect == "postgresql":
+        offset = func.extract("epoch", Prediction.timestamp - start)
+        return func.least(cast(func.floor(offset / width_seconds), Integer), buckets - 1)
+    # ValueError: surfaced as a 400 by the history route instead of an unhandled 500.
+    raise ValueError(f"Downsampled history is not supported on {dialect} databases (use mode=raw)")
+
+
+def get_prediction_history_buckets(
+    db: Session,
+    asset_id: str,
+    *,
+    start: datetime,
+    end: datetime,
+    buckets: int,
+):
+    """
+    Aggregate predictions in [start, end] into `buckets` equal-width time buckets, in SQL.
+
+    Returns rows shaped as (bucket, count, first_ts, last_ts, min_p, max_p, mean_p): at most
+    `buckets` rows no matter how many predictions fall in the range.
+    """
+    width = max((end - start).total_seconds() / buckets, 1e-6)
+    bucket = _bucket_index(db, start=start, width_seconds=width, buckets=buckets).label("bucket")
+
+    query = _history_range_filter(
+        db.query(
+            bucket,
+            func.count(Prediction.id).label("count"),
+            func.min(Prediction.timestamp).label("first_ts"),
+            func.max(Prediction.timestamp).label("last_ts"),
+            func.min(Prediction.failure_probability).label("min_p"),
+            func.max(Prediction.failure_probability).label("max_p"),
+            func.avg(Prediction.failure_probability).label("mean_p"),
+        ),
+        asset_id,
+        start,
+        None,
+    ).filter(Prediction.timestamp <= end)
+    return query.group_by(bucket).order_by(bucket).all()
+
+
+def get_prediction_history_extremes(
+    db: Session,
+    asset_id: str,
+    *,
+    start: datetime,
+    end: datetime,
+    buckets: int,
+):
+    """
+    The lowest- and highest-probability prediction of each of `buckets` equal-width time buckets
+    over [start, end], picked in SQL with window functions, plus the rows at `start` and `end`.
+
+    Returns (id, timestamp, failure_probability) rows ascending by (timestamp, id): about
+    `2 * buckets` rows no matter how many predictions fall in the range.
+    """
+    width = max((end - start).total_seconds() / buckets, 1e-6)
+    bucket = _bucket_index(db, start=start, width_seconds=width, buckets=buckets)
+    ranked = (
+        _history_range_filter(
+            db.query(
+                Prediction.id,
+                Prediction.timestamp,
+                Prediction.failure_probability,
+                func.row_number()
+                .over(partition_by=bucket, order_by=(Prediction.failure_probability.asc(), Prediction.id.asc()))
+                .label("rank_min"),
+                func.row_number()
+                .over(partition_by=bucket, order_by=(Prediction.failure_probability.desc(), Prediction.id.asc()))
+                .label("rank_max"),
+            ),
+            asset_id,
+            start,
+            None,
+        )
+        .filter(Prediction.timestamp <= end)
+        .subquery()
+    )
+    return (
+        db.query(ranked.c.id, ranked.c.timestamp, ranked.c.failure_probability)
+        .filter(
+            or_(
+                ranked.c.rank_min == 1,
+                ranked.c.rank_max == 1,
+                ranked.c.timestamp == start,
+                ranked.c.timestamp == end,
+            )
+        )
+        .order_by(ranked.c.timestamp.asc(), ranked.c.id.asc())
+        .all()
+    )
+
+
+def count_prediction_history(
+    db: Session, asset_id: str, *, start: datetime | None = None, end: datetime | None = None
+) -> int:
+    """Number of predictions in [start, end) (an index-only count)."""
+    return int(_history_range_filter(db.query(func.count(Prediction.id)), asset_id, start, end).scalar() or 0)
+
+
+def iter_prediction_history_points(
+    db: Session,
+    asset_id: str,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk_size: int = 10_000,
+):
+    """Stream (id, timestamp, failure_probability) tuples in [start, end), ascending, in chunks."""
+    query = _history_range_filter(
+        db.query(Prediction.id, Prediction.timestamp, Prediction.failure_probability),
+        asset_id,
+        start,
+        end,
+    ).order_by(Prediction.timestamp.asc(), Prediction.id.asc())
+    return query.yield_per(chunk_size)
+
+
+def get_predictions_by_ids(db: Session, ids: list[int]) -> list[Prediction]:
+    if not ids:
+        return []
+    return (
+        db.query(Prediction)
+        .filter(Prediction.id.in_(ids))
+        .order_by(Prediction.timestamp.asc(), Prediction.id.asc())
+        .all()
+    )
 
 
 def get_recent_training_samples_for_asset(
@@ -1,31 +1,83 @@
 from __future__ import annotations
 
+from typing import Sequence
+
+import numpy as np
 from sqlalchemy.orm import Session
 
+from app.core.metrics import timed_stage
+from app.crud.asset_status import upsert_latest_predictions
+from app.crud.bulk import BulkWriteStats, bulk_insert_columns, columns_from_records
 from app.models.prediction import Prediction
 from app.schemas.prediction import PredictionCreate
 
 
+_PREDICTION_FIELDS = ("asset_id", "risk_level", "failure_probability", "timestamp", "model_id")
+
+
+@timed_stage("persist_predictions")
 def create_predictions_bulk(db: Session, rows: list[PredictionCreate]) -> None:
     """
     Bulk insert prediction rows for the MVP.
 
     We don't return ORM objects to keep this light and avoid extra refresh queries.
     """
-    objs = [
-        Prediction(
-            asset_id=r.asset_id,
-            risk_level=r.risk_level,
-            failure_probability=r.failure_probability,
-            timestamp=r.timestamp,
-            model_id=r.model_id,
-        )
-        for r in rows
-    ]
-    db.add_all(objs)
+    columns = columns_from_records(rows, _PREDICTION_FIELDS)
+    bulk_insert_columns(db, Prediction.__table__, columns, commit=False)
+    upsert_latest_predictions(
+        db,
+        asset_ids=columns["asset_id"],
+        model_ids=columns["model_id"],
+        timestamps=columns["timestamp"],
+        failure_probabilities=columns["failure_probability"],
+        risk_levels=columns["risk_level"],
+    )
     db.commit()
 
 
+@timed_stage("persist_predictions", rows=lambda stats: stats.rows)
+def create_predictions_from_columns(
+    db: Session,
+    *,
+    model_id: str,
+    asset_ids: Sequence[str],
+    timestamps: np.ndarray,
+    failure_probabilities: np.ndarray,
+    risk_levels: Sequence[str],
+    commit: bool = True,
+) -> BulkWriteStats:
+    """
+    Bulk insert predictions straight from column arrays (no per-row schema/ORM objects).
+
+    `timestamps` must be naive UTC datetime64 values (or datetimes). `asset_status` is updated in
+    the same transaction; with `commit=False` the caller commits (e.g. several models at once).
+    """
+    model_ids = [model_id] * len(asset_ids)
+    stats = bulk_insert_columns(
+        db,
+        Prediction.__table__,
+        {
+            "asset_id": asset_ids,
+            "model_id": model_ids,
+            "timestamp": timestamps,
+            "failure_probability": failure_probabilities,
+            "risk_level": risk_levels,
+        },
+        commit=False,
+    )
+    upsert_latest_predictions(
+        db,
+        asset_ids=asset_ids,
+        model_ids=model_ids,
+        timestamps=timestamps,
+        failure_probabilities=failure_probabilities,
+        risk_levels=risk_levels,
+    )
+    if commit:
+        db.commit()
+    return stats
+
+
 def get_prediction_history(db: Session, asset_id: str, limit: int = 100) -> list[Prediction]:
     """
     Return all predictions for a given asset, ordered by timestamp ascending.
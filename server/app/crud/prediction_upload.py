@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud.asset_status import _dialect_insert
+from app.models.prediction_upload import PredictionUpload
+
+
+def get_prediction_upload_responses(db: Session, upload_digest: str, model_ids: Sequence[str]) -> dict[str, bytes]:
+    """
+    Stored responses for `upload_digest`, by model_id. Models without stored predictions are absent,
+    and so are those whose response has expired (see `expire_prediction_upload_responses`).
+    """
+    if not model_ids:
+        return {}
+    stmt = select(PredictionUpload.model_id, PredictionUpload.response).where(
+        PredictionUpload.upload_digest == upload_digest,
+        PredictionUpload.model_id.in_(list(model_ids)),
+        PredictionUpload.response.is_not(None),
+    )
+    return {model_id: bytes(response) for model_id, response in db.execute(stmt).all()}
+
+
+def claim_prediction_upload(db: Session, upload_digest: str, model_id: str, response: bytes) -> bool:
+    """
+    Record that this transaction stores the predictions of (`upload_digest`, `model_id`) (does not commit).
+
+    False when they are already stored (or being stored by a concurrent transaction that then
+    commits): the caller must not insert them again. Call it before inserting the predictions,
+    so a concurrent claim waits on this row until the transaction ends.
+    """
+    values = {"upload_digest": upload_digest, "model_id": model_id, "response": response}
+    insert_fn = _dialect_insert(db)
+    if insert_fn is not None:
+        result = db.execute(insert_fn(PredictionUpload).values(**values).on_conflict_do_nothing())
+        return result.rowcount == 1
+    try:
+        with db.begin_nested():
+            db.execute(insert(PredictionUpload).values(**values))
+    except IntegrityError:
+        return False
+    return True
+
+
+def expire_prediction_upload_responses(db: Session, older_than: datetime) -> int:
+    """
+    Drop the responses recorded before `older_than` (does not commit); returns how many.
+
+    The rows stay: they still mark the predictions as stored, so a re-submitted upload is scored
+    again for its response but `claim_prediction_upload` keeps it from being stored twice.
+    """
+    result = db.execute(
+        update(PredictionUpload)
+        .where(PredictionUpload.created_at < older_than, PredictionUpload.response.is_not(None))
+        .values(response=None)
+    )
+    return result.rowcount
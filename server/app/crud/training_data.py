@@ -1,29 +1,54 @@
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Any, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.metrics import timed_stage
+from app.crud.asset_status import register_assets
+from app.crud.bulk import BulkWriteStats, bulk_insert_columns, columns_from_records
 from app.models.training_data import TrainingData
 from app.schemas.training_data import TrainingDataCreate
 
 
+_TRAINING_DATA_FIELDS = ("model_id", "asset_id", "temperature", "vibration", "pressure", "current", "label")
+
+
 def create_training_data_bulk(db: Session, rows: list[TrainingDataCreate]) -> int:
     if not rows:
         return 0
-    objs = [
-        TrainingData(
-            model_id=r.model_id,
-            asset_id=r.asset_id,
-            temperature=r.temperature,
-            vibration=r.vibration,
-            pressure=r.pressure,
-            current=r.current,
-            label=int(r.label),
-        )
-        for r in rows
-    ]
-    db.bulk_save_objects(objs)
+    columns = columns_from_records(rows, _TRAINING_DATA_FIELDS)
+    stats = bulk_insert_columns(db, TrainingData.__table__, columns, commit=False)
+    register_assets(db, columns["asset_id"])
+    db.commit()
+    return stats.rows
+
+
+@timed_stage("persist_training_data", rows=lambda stats: stats.rows)
+def create_training_data_from_dataframe(db: Session, *, model_id: str, df: pd.DataFrame) -> BulkWriteStats:
+    """
+    Persist the rows of a validated training dataframe straight from its columns.
+
+    Avoids one `TrainingDataCreate` per row for large training sets. New asset ids are registered
+    in `asset_status` in the same transaction.
+    """
+    columns: dict[str, Any] = {
+        "model_id": [model_id] * int(df.shape[0]),
+        "asset_id": df["asset_id"].astype(str).to_numpy(dtype=object),
+        "temperature": df["temperature"].to_numpy(dtype=float),
+        "vibration": df["vibration"].to_numpy(dtype=float),
+        "pressure": df["pressure"].to_numpy(dtype=float),
+        "current": df["current"].to_numpy(dtype=float),
+        "label": df["label"].to_numpy(dtype=int),
+    }
+    stats = bulk_insert_columns(db, TrainingData.__table__, columns, commit=False)
+    register_assets(db, columns["asset_id"])
     db.commit()
-    return len(objs)
+    return stats
 
 
 def get_training_data_by_model(
@@ -38,3 +63,52 @@ def get_training_data_by_model(
     )
 
 
+
+
+def iter_training_data_columns(
+    db: Session,
+    *,
+    model_ids: Optional[Sequence[str]] = None,
+    asset_ids: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_rows: int = 50_000,
+) -> Iterator[dict[str, np.ndarray]]:
+    """
+    Stream stored training rows as column arrays, `chunk_rows` rows at a time, in insertion order.
+
+    Uses a server-side cursor (`yield_per`), so memory is bounded by one chunk of raw rows; no ORM
+    objects are built. The time window applies to `created_at` (stored rows carry no sensor
+    timestamp). Yields `id`, `asset_id`, the sensor columns and `label`.
+    """
+    table = TrainingData.__table__
+    stmt = select(
+        table.c.id,
+        table.c.asset_id,
+        table.c.temperature,
+        table.c.vibration,
+        table.c.pressure,
+        table.c.current,
+        table.c.label,
+    )
+    if model_ids:
+        stmt = stmt.where(table.c.model_id.in_(list(model_ids)))
+    if asset_ids:
+        stmt = stmt.where(table.c.asset_id.in_(list(asset_ids)))
+    if since is not None:
+        stmt = stmt.where(table.c.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(table.c.created_at < until)
+    stmt = stmt.order_by(table.c.id).execution_options(yield_per=max(int(chunk_rows), 1))
+
+    for rows in db.execute(stmt).partitions():
+        ids, asset, temperature, vibration, pressure, current, label = zip(*rows)
+        yield {
+            "id": np.fromiter(ids, dtype=np.int64, count=len(ids)),
+            "asset_id": np.array(asset, dtype=object),
+            "temperature": np.fromiter(temperature, dtype=float, count=len(ids)),
+            "vibration": np.fromiter(vibration, dtype=float, count=len(ids)),
+            "pressure": np.fromiter(pressure, dtype=float, count=len(ids)),
+            "current": np.fromiter(current, dtype=float, count=len(ids)),
+            "label": np.fromiter(label, dtype=np.int64, count=len(ids)),
+        }
@@ -1,9 +1,17 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.api.api_v1 import api_router
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.db.dp import Base, engine
-from app.models import ModelMetadata, Prediction, TrainingData  # noqa: F401
+from app.core.metrics import MetricsMiddleware, get_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.db.async_db import dispose_async_engine
+from app.core.db.dp import Base, SessionLocal, create_missing_indexes, engine
+from app.core.services.ingest_service import get_ingest_service
+from app.core.services.stage_executor import get_predict_executor
+from app.core.services.training_jobs import get_training_job_manager
+from app.crud.asset_status import backfill_asset_status_if_empty
+from app.models import AssetStatus, ModelMetadata, Prediction, TrainingData  # noqa: F401
 
 
 
@@ -11,6 +19,9 @@ app = FastAPI(title="AI Predictive Monitoring API")
 
 app.include_router(api_router, prefix="/api")
 
+# Added first, so it runs innermost: profiles cover the route, not the CORS/metrics wrappers.
+app.add_middleware(ProfilingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -21,14 +32,44 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 )
+app.add_middleware(MetricsMiddleware)
 
 
 @app.on_event("startup")
 def _init_db() -> None:
     # Ensure all model tables are created for the MVP (SQLite file DB).
     Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
+    # Databases created before `asset_status` existed get it backfilled once from history.
+    db = SessionLocal()
+    try:
+        backfill_asset_status_if_empty(db)
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+async def _stop_ingestion() -> None:
+    await get_ingest_service().close()
+
+
+@app.on_event("shutdown")
+async def _close_async_engine() -> None:
+    await dispose_async_engine()
+
+
+@app.on_event("shutdown")
+def _shutdown_executors() -> None:
+    get_training_job_manager().shutdown()
+    get_predict_executor().shutdown()
 
 
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of stage timers, DB/HTTP latencies and cache/executor stats."""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,17 @@
+from app.models.asset import AssetStatus
+from app.models.asset_reading_tail import AssetReadingTail
+from app.models.model_metadata import ModelMetadata
+from app.models.prediction import Prediction
+from app.models.prediction_upload import PredictionUpload
+from app.models.training_data import TrainingData
+
+__all__ = [
+    "AssetReadingTail",
+    "AssetStatus",
+    "ModelMetadata",
+    "Prediction",
+    "PredictionUpload",
+    "TrainingData",
+]
+
+
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Float, String, func
+
+from app.core.db.dp import Base
+
+
+class AssetStatus(Base):
+    """
+    Latest known status per asset, maintained incrementally on every prediction/training insert.
+
+    One row per asset (asset_id is the primary key), so the fleet overview reads O(#assets) rows
+    instead of aggregating the whole prediction/training history. Prediction columns stay NULL for
+    assets only seen in training data.
+    """
+
+    __tablename__ = "asset_status"
+
+    asset_id = Column(String, primary_key=True)
+    risk_level = Column(String, nullable=True)
+    failure_probability = Column(Float, nullable=True)
+    # Timestamp of the sensor row behind the latest prediction (naive UTC, like Prediction.timestamp).
+    timestamp = Column(DateTime, nullable=True)
+    model_id = Column(String, nullable=True)
+
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
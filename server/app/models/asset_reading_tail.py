@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+
+from app.core.db.dp import Base
+
+
+class AssetReadingTail(Base):
+    """
+    Most recent raw sensor readings per asset (at most FEATURE_TAIL_ROWS each), kept at predict time.
+
+    Window/lag features of a new upload are computed with these readings prepended. Stored in the
+    database so every worker process sees the same history.
+    """
+
+    __tablename__ = "asset_reading_tail"
+    __table_args__ = (
+        # One reading per (asset, timestamp); also serves the per-asset lookups.
+        UniqueConstraint("asset_id", "timestamp", name="uq_asset_reading_tail_asset_id_timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    asset_id = Column(String, nullable=False)
+    # Naive UTC, like Prediction.timestamp.
+    timestamp = Column(DateTime, nullable=False)
+
+    temperature = Column(Float, nullable=False)
+    vibration = Column(Float, nullable=False)
+    pressure = Column(Float, nullable=False)
+    current = Column(Float, nullable=False)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from sqlalchemy import JSON, Column, DateTime, Float, Integer, String, func
+
+from app.core.db.dp import Base
+
+
+class ModelMetadata(Base):
+    __tablename__ = "model_metadata"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Public identifier returned by /train and referenced by predictions and training rows.
+    model_id = Column(String, unique=True, index=True, nullable=False)
+    training_date = Column(DateTime, nullable=False)
+    rows_used = Column(Integer, nullable=False)
+    assets_count = Column(Integer, nullable=False)
+    positive_rate = Column(Float, nullable=False)
+    metrics = Column(JSON, nullable=False)
+
+    # Location of the trained artifact on disk (falls back to the default artifacts path).
+    model_path = Column(String, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
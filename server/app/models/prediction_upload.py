@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, UniqueConstraint, func
+
+from app.core.db.dp import Base
+
+
+class PredictionUpload(Base):
+    """
+    Uploads whose predictions were stored, per model: the idempotency record of `POST /predict`.
+
+    A row is inserted in the same transaction as the predictions it stands for, and the unique
+    (upload_digest, model_id) key lets only one request store them, whatever the upload cache
+    holds and however many worker processes serve the request.
+    """
+
+    __tablename__ = "prediction_upload"
+    __table_args__ = (
+        UniqueConstraint("upload_digest", "model_id", name="uq_prediction_upload_digest_model_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    # sha256 of the uploaded bytes.
+    upload_digest = Column(String(64), nullable=False)
+    model_id = Column(
+        String,
+        ForeignKey("model_metadata.model_id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+
+    # Response returned for the stored predictions; repeated uploads get the same bytes back. Cleared
+    # after PREDICTION_UPLOAD_RESPONSE_DAYS (the row itself stays, so predictions are not stored twice).
+    response = Column(LargeBinary, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, index=True, server_default=func.now())
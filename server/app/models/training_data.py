@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, func
+
+from app.core.db.dp import Base
+
+
+class TrainingData(Base):
+    __tablename__ = "training_data"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Model trained on this row (public model_id, consistent with Prediction).
+    model_id = Column(
+        String,
+        ForeignKey("model_metadata.model_id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    asset_id = Column(String, index=True, nullable=False)
+
+    temperature = Column(Float, nullable=False)
+    vibration = Column(Float, nullable=False)
+    pressure = Column(Float, nullable=False)
+    current = Column(Float, nullable=False)
+    label = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -58,3 +58,35 @@ class AssetDetailResponse(BaseModel):
     latest: Optional[PredictionSummary] = None
     history: list[HistoryPoint] = []
     metrics: Optional[MetricsSnapshot] = None
+
+
+class HistoryBucket(BaseModel):
+    """Aggregate of the predictions that fall into one time bucket."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    start: datetime
+    end: datetime
+    count: int
+    min_failure_probability: float
+    max_failure_probability: float
+    mean_failure_probability: float
+    # Risk level of the worst (max) probability in the bucket.
+    risk_level: RiskLevel
+
+
+class AssetHistoryResponse(BaseModel):
+    """
+    Prediction history for one asset.
+
+    `mode="raw"` pages through `points` with `next_cursor`; `mode="lttb"` returns at most the
+    requested number of representative `points`; `mode="buckets"` returns `buckets` instead.
+    """
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    asset_id: str
+    mode: Literal["raw", "lttb", "buckets"]
+    points: list[HistoryPoint] = []
+    buckets: list[HistoryBucket] = []
+    next_cursor: Optional[str] = None
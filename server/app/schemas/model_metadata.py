@@ -12,7 +12,8 @@ class ModelMetadataCreate(BaseModel):
     rows_used: int
     assets_count: int
     positive_rate: float
-    metrics: dict[str, float]
+    # Float metrics, plus the hyperparameter search table under "search_table" when a search ran.
+    metrics: dict[str, Any]
     model_path: Optional[str] = None
 
 
@@ -30,3 +31,10 @@ class ModelMetadataResponse(BaseModel):
     created_at: datetime
 
 
+class ModelCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    current_bytes: int
+    max_bytes: int
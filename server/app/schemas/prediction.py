@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -41,6 +41,12 @@ class PredictResponse(BaseModel):
     assessments: list[AssetAssessment]
 
 
+class BatchPredictResponse(BaseModel):
+    """Assessments of one upload by several models, in request order."""
+
+    results: list[PredictResponse]
+
+
 class PredictionHistoryItem(BaseModel):
     """A single prediction record for time-series display."""
 
@@ -61,3 +67,55 @@ class PredictionHistoryResponse(BaseModel):
     predictions: list[PredictionHistoryItem]
 
 
+class PredictStageStats(BaseModel):
+    """Queueing/run-time counters of one stage on the predict executor."""
+
+    stage: str
+    completed: int
+    failed: int
+    in_flight: int
+    queued: int
+    queue_seconds_total: float
+    queue_seconds_max: float
+    run_seconds_total: float
+    run_seconds_max: float
+
+
+class PredictExecutorStatsResponse(BaseModel):
+    max_workers: int
+    stages: list[PredictStageStats]
+
+
+class IngestResponse(BaseModel):
+    """
+    Summary of readings scored and persisted by one NDJSON ingestion request.
+
+    When a line is rejected the stream stops there: `error` says why, and the counts cover the
+    readings before it, which were already persisted.
+    """
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: str
+    readings: int
+    normal: int
+    warning: int
+    critical: int
+    error: Optional[str] = None
+
+
+class IngestBatcherStats(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: str
+    queued_chunks: int
+    batches: int
+    readings: int
+    failed_batches: int
+
+
+class IngestStatsResponse(BaseModel):
+    batch_size: int
+    max_latency_ms: int
+    queue_max: int
+    batchers: list[IngestBatcherStats]
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ProfileInfoResponse(BaseModel):
+    """A stored request profile (see core/profiling.py)."""
+
+    profile_id: str = Field(..., description="Request id (X-Request-ID or generated, returned in X-Profile-Id)")
+    mode: str = Field(..., description="sample (collapsed stacks) or cprofile (pstats)")
+    method: str
+    path: str
+    status: int
+    seconds: float = Field(..., ge=0.0)
+    bytes: int = Field(..., ge=0)
+    created_at: datetime
+
+
+class ProfileListResponse(BaseModel):
+    enabled: bool
+    profiles: list[ProfileInfoResponse]
@@ -1,10 +1,22 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Literal, Optional
 
 from pydantic import ConfigDict
 
 from pydantic import BaseModel, Field
 
 
+class SearchCandidate(BaseModel):
+    """One evaluated candidate of a hyperparameter search."""
+
+    params: dict[str, Any]
+    mean_score: Optional[float] = Field(default=None, description="Mean fold score (null if it could not be scored)")
+    fold_scores: list[Optional[float]] = Field(default_factory=list)
+    fit_seconds: float
+    folds_evaluated: int
+    pruned_after_fold: Optional[int] = Field(default=None, description="Fold after which early stopping dropped it")
+
+
 class TrainResponse(BaseModel):
     """
     Response returned after a successful training run.
@@ -24,5 +36,55 @@ class TrainResponse(BaseModel):
     model_path: Optional[str] = Field(
         default=None, description="Filesystem path where the model artifact was saved"
     )
+    estimator: Optional[str] = Field(default=None, description="Estimator backend used for training")
+    search_candidates: Optional[list[SearchCandidate]] = Field(
+        default=None, description="Hyperparameter search table (also stored in the model's metrics as `search_table`)"
+    )
+
+
+class RetrainRequest(BaseModel):
+    """Selection of stored training rows (and options) for `POST /train/retrain`."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_ids: list[str] = Field(
+        default_factory=list, description="Use rows stored for these models (all stored rows if empty)"
+    )
+    asset_ids: Optional[list[str]] = Field(default=None, description="Only rows of these assets")
+    since: Optional[datetime] = Field(default=None, description="Rows stored at or after this time (UTC)")
+    until: Optional[datetime] = Field(default=None, description="Rows stored before this time (UTC)")
+    estimator: Optional[str] = Field(default=None, description="Estimator backend for a fresh fit")
+    warm_start_model_id: Optional[str] = Field(
+        default=None, description="Add trees to this model's forest instead of fitting from scratch"
+    )
+    add_estimators: int = Field(default=50, ge=1, le=5_000, description="Trees added when warm-starting")
+
+
+class EstimatorInfo(BaseModel):
+    name: str
+    description: str
+
+
+class EstimatorListResponse(BaseModel):
+    default: str
+    estimators: list[EstimatorInfo]
+
+
+class TrainJobResponse(BaseModel):
+    """Status of a background training job (see `POST /train/jobs`)."""
+
+    model_config = ConfigDict(from_attributes=True, protected_namespaces=())
+
+    job_id: str
+    state: Literal["queued", "running", "succeeded", "failed"]
+    stage: str = Field(..., description="Current pipeline stage (parsing, training, persisting, ...)")
+    progress: float = Field(..., ge=0.0, le=1.0)
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[TrainResponse] = Field(default=None, description="Set once the job succeeded")
+    error: Optional[str] = Field(default=None, description="Set once the job failed")
 
 
+class TrainJobListResponse(BaseModel):
+    jobs: list[TrainJobResponse]
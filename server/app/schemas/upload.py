@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+
+class UploadCacheStatsResponse(BaseModel):
+    """Size of the content-addressed upload cache (shared directory) and this server process's counters."""
+
+    enabled: bool
+    entries: int = Field(..., ge=0, description="Cached frames and predict responses, of all processes")
+    bytes: int = Field(..., ge=0, description="Bytes on disk, of all processes")
+    max_bytes: int = Field(..., ge=0)
+    frame_hits: int = Field(..., ge=0, description="Uploads served from a cached parsed frame")
+    frame_misses: int = Field(..., ge=0)
+    frame_hit_rate: float = Field(..., ge=0.0, le=1.0)
+    result_hits: int = Field(..., ge=0, description="Predict responses served from the cache")
+    result_misses: int = Field(..., ge=0)
+    result_hit_rate: float = Field(..., ge=0.0, le=1.0)
+    evictions: int = Field(..., ge=0)
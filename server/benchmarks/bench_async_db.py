@@ -0,0 +1,275 @@
+"""
+Concurrency benchmark of the database access paths available to async routes.
+
+Run from the `server` directory:
+
+    python -m benchmarks.bench_async_db
+    python -m benchmarks.bench_async_db --concurrency 1,16,64 --requests 2000 --write-every 10
+    python -m benchmarks.bench_async_db --database-url postgresql://user:pw@host/db
+
+Each simulated request does what `GET /assets/{asset_id}` does (latest prediction plus recent
+history of a random asset); with --write-every N, every Nth request also inserts a small batch of
+predictions like `/predict`. Requests run as coroutines on one event loop, at most --concurrency
+at a time, through three paths:
+
+- sync_on_loop:    sync `Session` called directly from the coroutine (blocks the event loop)
+- sync_threadpool: sync `Session` per request on a worker thread (FastAPI threadpool / executor)
+- async:           `AsyncSession` on the async engine (aiosqlite / asyncpg, see core/db/async_db.py)
+
+Reported per path and concurrency: requests/s, p50/p95 latency and the worst event-loop stall
+seen by a 1 ms heartbeat task (what every other request on the worker waits for). The database
+is a throwaway SQLite file seeded with a synthetic fleet, or --database-url (tables are created,
+rows are added and left in place).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+PATHS: tuple[str, ...] = ("sync_on_loop", "sync_threadpool", "async")
+_MODEL_ID = "bench-async-db"
+_WRITE_ROWS = 20
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+async def _heartbeat(stop: asyncio.Event, stalls: list[float], interval: float = 0.001) -> None:
+    while not stop.is_set():
+        started = perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(perf_counter() - started - interval)
+
+
+async def _drive(
+    request: Callable[[int], Awaitable[None]], *, concurrency: int, requests: int
+) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    stalls: list[float] = []
+    stop = asyncio.Event()
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = perf_counter()
+            await request(i)
+            latencies.append(perf_counter() - started)
+
+    heartbeat = asyncio.create_task(_heartbeat(stop, stalls))
+    started = perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = perf_counter() - started
+    stop.set()
+    await heartbeat
+    return {
+        "requests": requests,
+        "seconds": elapsed,
+        "requests_per_sec": requests / elapsed if elapsed > 0 else None,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "max_loop_stall_ms": max(stalls, default=0.0) * 1000,
+    }
+
+
+def _write_columns(asset_id: str, i: int) -> dict[str, Any]:
+    base = np.datetime64("2030-01-01T00:00:00") + np.timedelta64(i * _WRITE_ROWS, "s")
+    return {
+        "model_id": _MODEL_ID,
+        "asset_ids": [asset_id] * _WRITE_ROWS,
+        "timestamps": base + np.arange(_WRITE_ROWS).astype("timedelta64[s]"),
+        "failure_probabilities": np.full(_WRITE_ROWS, 0.1),
+        "risk_levels": ["normal"] * _WRITE_ROWS,
+    }
+
+
+def _seed(spec: Any) -> list[str]:
+    from app.core.db.dp import Base, SessionLocal, create_missing_indexes, engine
+    from app.core.services.synthetic_data import generate_prediction_history
+    from app.crud.model_metadata import create_model_metadata, get_model_by_id
+    from app.crud.prediction import create_predictions_from_columns
+    from app.schemas.model_metadata import ModelMetadataCreate
+    import app.models  # noqa: F401  (register tables)
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
+    history = generate_prediction_history(spec)
+    db = SessionLocal()
+    try:
+        if get_model_by_id(db, _MODEL_ID) is None:
+            create_model_metadata(
+                db,
+                ModelMetadataCreate(
+                    model_id=_MODEL_ID,
+                    training_date=datetime.utcnow(),
+                    rows_used=0,
+                    assets_count=spec.assets,
+                    positive_rate=0.0,
+                    metrics={},
+                    model_path=None,
+                ),
+            )
+        create_predictions_from_columns(
+            db,
+            model_id=_MODEL_ID,
+            asset_ids=history["asset_id"],
+            timestamps=history["timestamp"],
+            failure_probabilities=history["failure_probability"],
+            risk_levels=history["risk_level"],
+        )
+    finally:
+        db.close()
+    return sorted(set(history["asset_id"].tolist()))
+
+
+async def _run_path(path: str, args: argparse.Namespace, asset_ids: list[str], concurrency: int) -> dict[str, Any]:
+    from app.core.db import async_db
+    from app.core.db.dp import SessionLocal
+    from app.crud import assets as assets_crud
+    from app.crud import prediction as prediction_crud
+    from app.crud.aio import assets as aio_assets
+    from app.crud.aio import prediction as aio_prediction
+
+    rng = random.Random(args.seed)
+    picks = [rng.choice(asset_ids) for _ in range(args.requests)]
+
+    def sync_request(i: int) -> None:
+        db = SessionLocal()
+        try:
+            assets_crud.get_latest_prediction_for_asset(db, picks[i])
+            assets_crud.get_prediction_history_for_asset(db, picks[i], limit=args.history)
+            if args.write_every and i % args.write_every == 0:
+                prediction_crud.create_predictions_from_columns(db, **_write_columns(picks[i], i))
+        finally:
+            db.close()
+
+    if path == "sync_on_loop":
+
+        async def request(i: int) -> None:
+            sync_request(i)
+
+        return await _drive(request, concurrency=concurrency, requests=args.requests)
+
+    if path == "sync_threadpool":
+        pool = ThreadPoolExecutor(max_workers=args.threads)
+        loop = asyncio.get_running_loop()
+
+        async def request(i: int) -> None:
+            await loop.run_in_executor(pool, sync_request, i)
+
+        try:
+            return await _drive(request, concurrency=concurrency, requests=args.requests)
+        finally:
+            pool.shutdown()
+
+    # One engine per event loop: pooled aiosqlite/asyncpg connections are bound to their loop.
+    async_db.get_async_engine.cache_clear()
+    async_db.get_async_sessionmaker.cache_clear()
+    sessions = async_db.get_async_sessionmaker()
+
+    async def request(i: int) -> None:
+        async with sessions() as db:
+            await aio_assets.get_latest_prediction_for_asset(db, picks[i])
+            await aio_assets.get_prediction_history_for_asset(db, picks[i], limit=args.history)
+            if args.write_every and i % args.write_every == 0:
+                await aio_prediction.create_predictions_from_columns(db, **_write_columns(picks[i], i))
+
+    try:
+        return await _drive(request, concurrency=concurrency, requests=args.requests)
+    finally:
+        await async_db.dispose_async_engine()
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    # Imported here: the database engine is created from DATABASE_URL at import time.
+    from app.core.services.synthetic_data import FleetSpec
+
+    spec = FleetSpec(assets=args.assets, hours=args.hours, seed=args.seed)
+    asset_ids = _seed(spec)
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    results = []
+    for path in args.paths.split(","):
+        if path not in PATHS:
+            raise SystemExit(f"Unknown path {path!r}; expected one of {', '.join(PATHS)}")
+        for concurrency in levels:
+            result = asyncio.run(_run_path(path, args, asset_ids, concurrency))
+            results.append({"path": path, "concurrency": concurrency, **result})
+    return {
+        "benchmark": "async_db",
+        "schema_version": SCHEMA_VERSION,
+        "params": {
+            "assets": args.assets,
+            "hours": args.hours,
+            "rows": spec.rows,
+            "requests": args.requests,
+            "history": args.history,
+            "write_every": args.write_every,
+            "threads": args.threads,
+            "database": os.environ["DATABASE_URL"].split("://", 1)[0],
+        },
+        "results": results,
+    }
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    params = report["params"]
+    print(
+        f"database={params['database']} rows={params['rows']} requests={params['requests']} "
+        f"write_every={params['write_every']} threads={params['threads']}"
+    )
+    print(f"{'path':<16} {'conc':>5} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'max stall ms':>13}")
+    by_level: dict[int, dict[str, float]] = {}
+    for r in report["results"]:
+        print(
+            f"{r['path']:<16} {r['concurrency']:>5} {r['requests_per_sec']:>10,.0f} "
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['max_loop_stall_ms']:>13.2f}"
+        )
+        by_level.setdefault(r["concurrency"], {})[r["path"]] = r["requests_per_sec"]
+    for level, rates in sorted(by_level.items()):
+        if "async" in rates and "sync_on_loop" in rates:
+            print(f"async vs sync_on_loop at concurrency {level}: {rates['async'] / rates['sync_on_loop']:.2f}x req/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--hours", type=int, default=168)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated in-flight request limits")
+    parser.add_argument("--paths", default=",".join(PATHS), help="comma-separated subset of " + ", ".join(PATHS))
+    parser.add_argument("--history", type=int, default=50, help="history rows read per request")
+    parser.add_argument("--write-every", type=int, default=0, help="every Nth request also writes (0: reads only)")
+    parser.add_argument("--threads", type=int, default=8, help="worker threads of the sync_threadpool path")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-async-db-") as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        report = run(args)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
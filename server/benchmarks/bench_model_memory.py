@@ -0,0 +1,142 @@
+"""
+Per-worker memory of serving one forest from N processes: joblib copies vs memory-mapped
+compiled artifacts.
+
+Run from the `server` directory (Linux; reads /proc/self/smaps_rollup):
+
+    python -m benchmarks.bench_model_memory --workers 4 --trees 300
+
+Each worker scores one single-row batch and one `--batch-rows` batch (above
+COMPILED_ENGINE_MAX_ROWS by default), the way the predict path does. Mapped workers must serve
+both from the shared arrays: `estimator_loaded` reports whether any of them loaded a private
+copy of the sklearn estimator.
+
+RSS counts shared file-backed pages in every process; PSS splits them between the processes
+mapping them, so PSS is the number to compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from app.core.services.model_artifacts import load_model_artifact, write_forest_sidecar
+from app.core.services.tree_engine import predict_proba
+
+
+def _memory_kb() -> dict[str, int]:
+    out = {}
+    with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                out[key.lower()] = int(rest.split()[0])
+    return out
+
+
+def _worker(mode: str, model_path: str, n_features: int, batch_rows: int, ready, done, results) -> None:
+    before = _memory_kb()
+    rng = np.random.default_rng(1)
+    batches = [rng.normal(size=(1, n_features)), rng.normal(size=(batch_rows, n_features))]
+    timings = []
+    if mode == "joblib":
+        model = joblib.load(model_path)
+        model.set_params(n_jobs=1)
+        for X in batches:
+            started = perf_counter()
+            model.predict_proba(X)
+            timings.append(perf_counter() - started)
+        estimator_loaded = True
+    else:
+        model, _ = load_model_artifact(Path(model_path))
+        # Touch every page, like steady-state traffic across all trees would.
+        for name in ("feature", "threshold", "children", "missing_left", "value"):
+            np.asarray(getattr(model.compiled_forest_, name)).sum()
+        for X in batches:
+            started = perf_counter()
+            predict_proba(model, X, engine="compiled")
+            timings.append(perf_counter() - started)
+        estimator_loaded = model._estimator is not None
+    ready.wait()  # all workers loaded: PSS now reflects sharing
+    after = _memory_kb()
+    results.put(
+        {
+            "mode": mode,
+            "rss_kb": after["rss"] - before["rss"],
+            "pss_kb": after["pss"] - before["pss"],
+            "single_row_ms": timings[0] * 1000,
+            "batch_ms": timings[1] * 1000,
+            "estimator_loaded": estimator_loaded,
+        }
+    )
+    done.wait()
+
+
+def _run(mode: str, workers: int, model_path: str, n_features: int, batch_rows: int) -> list[dict]:
+    ctx = mp.get_context("spawn")
+    ready, done, results = ctx.Barrier(workers + 1), ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, model_path, n_features, batch_rows, ready, done, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    out = [results.get() for _ in procs]
+    done.set()
+    for p in procs:
+        p.join()
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--train-rows", type=int, default=20_000)
+    parser.add_argument("--batch-rows", type=int, default=1000, help="rows of the large scoring batch")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.train_rows, args.features))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=args.train_rows) > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=args.trees, random_state=42, n_jobs=-1).fit(X, y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / "model.joblib"
+        joblib.dump(model, model_path)
+        write_forest_sidecar(model, model_path)
+        report = {
+            "artifact_bytes": model_path.stat().st_size,
+            "workers": args.workers,
+            "batch_rows": args.batch_rows,
+            "modes": {
+                mode: _run(mode, args.workers, str(model_path), args.features, args.batch_rows)
+                for mode in ("joblib", "mmap")
+            },
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"artifact={report['artifact_bytes'] / 1e6:.1f}MB workers={args.workers} batch_rows={args.batch_rows}")
+    for mode, rows in report["modes"].items():
+        pss = [r["pss_kb"] / 1024 for r in rows]
+        rss = [r["rss_kb"] / 1024 for r in rows]
+        print(
+            f"{mode:>7}: per-worker PSS {np.mean(pss):7.1f}MB (total {np.sum(pss):7.1f}MB), RSS {np.mean(rss):7.1f}MB, "
+            f"1 row {np.mean([r['single_row_ms'] for r in rows]):6.1f}ms, "
+            f"{args.batch_rows} rows {np.mean([r['batch_ms'] for r in rows]):7.1f}ms, "
+            f"estimator loaded in {sum(r['estimator_loaded'] for r in rows)}/{len(rows)} workers"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+End-to-end pipeline benchmark on a synthetic fleet: upload parsing, validation, training, model
+loading, inference, bulk persistence and the /assets queries.
+
+Run from the `server` directory:
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --assets 1000 --hours 720 --output bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json
+
+The fleet comes from `synthetic_data` and is fully determined by --assets/--hours/--seed, so
+runs with the same parameters are comparable across commits and machines. Everything is written
+to a throwaway SQLite database (or --database-url); trained artifacts are removed afterwards.
+Timings are best and median of --repeat runs after one warm-up; stages that write (training,
+persistence) run once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+SCHEMA_VERSION = 1
+
+
+def _samples(fn: Callable[[], Any], repeat: int, *, warmup: bool = True) -> list[float]:
+    if warmup:
+        fn()
+    out = []
+    for _ in range(max(repeat, 1)):
+        started = perf_counter()
+        fn()
+        out.append(perf_counter() - started)
+    return out
+
+
+def _stage(name: str, samples: list[float], rows: Optional[int] = None) -> dict[str, Any]:
+    best = min(samples)
+    return {
+        "name": name,
+        "runs": len(samples),
+        "rows": rows,
+        "best_s": best,
+        "median_s": statistics.median(samples),
+        "rows_per_sec": rows / best if rows and best > 0 else None,
+    }
+
+
+def _environment() -> dict[str, Any]:
+    import numpy
+    import pandas
+    import sklearn
+    import sqlalchemy
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+    }
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    # Imported here: the database engine is created from DATABASE_URL at import time.
+    from starlette.datastructures import UploadFile
+
+    from app.core.db.dp import Base, SessionLocal, create_missing_indexes, engine
+    from app.core.services.feature_service import (
+        FeatureTailStore,
+        compute_features_in_input_order,
+        feature_spec_for_model,
+    )
+    from app.core.services.model_artifacts import forest_sidecar_path
+    from app.core.services.predict_service import invalidate_model, latest_rows_with_features, load_model
+    from app.core.services.processing_service import read_csv_upload, validate_training_dataframe
+    from app.core.services.synthetic_data import FleetSpec, generate_prediction_history, generate_sensor_readings
+    from app.core.services.train_model_service import train_from_dataframe
+    from app.core.services.tree_engine import predict_proba
+    from app.crud import assets as assets_crud
+    from app.crud.model_metadata import create_model_metadata
+    from app.crud.prediction import create_predictions_from_columns
+    from app.schemas.model_metadata import ModelMetadataCreate
+    import app.models  # noqa: F401  (register tables)
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
+
+    spec = FleetSpec(assets=args.assets, hours=args.hours, seed=args.seed)
+    rows = spec.rows
+    stages = []
+
+    stages.append(_stage("generate", _samples(lambda: generate_sensor_readings(spec), args.repeat), rows))
+    fleet = generate_sensor_readings(spec)
+    csv_bytes = fleet.to_csv(index=False).encode("utf-8")
+
+    def parse():
+        upload = UploadFile(io.BytesIO(csv_bytes), filename="fleet.csv")
+        return asyncio.run(read_csv_upload(upload))
+
+    stages.append(_stage("read_csv_upload", _samples(parse, args.repeat), rows))
+    raw = parse()
+    stages.append(
+        _stage("validate_training", _samples(lambda: validate_training_dataframe(raw.copy()), args.repeat), rows)
+    )
+    df = validate_training_dataframe(raw.copy())
+
+    started = perf_counter()
+    result = train_from_dataframe(df, estimator=args.estimator)
+    stages.append(_stage("train", [perf_counter() - started], rows))
+
+    db = SessionLocal()
+    try:
+        meta = ModelMetadataCreate(
+            model_id=result.model_id,
+            training_date=result.training_date,
+            rows_used=result.rows_used,
+            assets_count=result.assets,
+            positive_rate=result.positive_rate,
+            metrics=result.metrics,
+            model_path=result.model_path,
+        )
+        started = perf_counter()
+        create_model_metadata(db, meta)
+        stages.append(_stage("persist_model_metadata", [perf_counter() - started]))
+
+        def load_cold():
+            invalidate_model(result.model_id)
+            return load_model(model_id=result.model_id, db=db)
+
+        stages.append(_stage("load_model_cold", _samples(load_cold, args.repeat)))
+        model = load_model(model_id=result.model_id, db=db)
+        stages.append(
+            _stage("load_model_warm", _samples(lambda: load_model(model_id=result.model_id, db=db), args.repeat))
+        )
+
+        feature_spec = feature_spec_for_model(model)
+        history_rows = feature_spec.history_rows if feature_spec is not None else 0
+
+        def latest_features():
+            # Fresh tails per run: the upload is scored as if it were the first one.
+            return latest_rows_with_features(df, feature_spec, FeatureTailStore(max_rows=history_rows))
+
+        stages.append(_stage("features_latest", _samples(latest_features, args.repeat), rows))
+        latest, X_latest = latest_features()
+        stages.append(
+            _stage("predict_proba_latest", _samples(lambda: predict_proba(model, X_latest), args.repeat), len(latest))
+        )
+        X_all = compute_features_in_input_order(df, feature_spec)
+        stages.append(
+            _stage("features_batch", _samples(lambda: compute_features_in_input_order(df, feature_spec), args.repeat), rows)
+        )
+        stages.append(_stage("predict_proba_batch", _samples(lambda: predict_proba(model, X_all), args.repeat), rows))
+
+        history = generate_prediction_history(spec)
+        started = perf_counter()
+        create_predictions_from_columns(
+            db,
+            model_id=result.model_id,
+            asset_ids=history["asset_id"],
+            timestamps=history["timestamp"],
+            failure_probabilities=history["failure_probability"],
+            risk_levels=history["risk_level"],
+        )
+        stages.append(_stage("persist_predictions", [perf_counter() - started], rows))
+
+        asset_id = str(history["asset_id"][0])
+        start = spec.start
+        end = spec.start + timedelta(hours=spec.hours)
+        queries: dict[str, Callable[[], Any]] = {
+            "assets_latest": lambda: assets_crud.get_assets_with_latest_prediction(db),
+            "asset_latest_prediction": lambda: assets_crud.get_latest_prediction_for_asset(db, asset_id),
+            "asset_history_recent": lambda: assets_crud.get_prediction_history_for_asset(db, asset_id, limit=100),
+            "asset_history_page": lambda: assets_crud.get_prediction_history_page(db, asset_id, start=start, end=end),
+            "asset_history_buckets": lambda: assets_crud.get_prediction_history_buckets(
+                db, asset_id, start=start, end=end, buckets=100
+            ),
+        }
+        for name, query in queries.items():
+            stages.append(_stage(name, _samples(query, args.repeat)))
+    finally:
+        db.close()
+        if result.model_path:
+            path = Path(result.model_path)
+            path.unlink(missing_ok=True)
+            shutil.rmtree(forest_sidecar_path(path), ignore_errors=True)
+
+    return {
+        "benchmark": "pipeline",
+        "schema_version": SCHEMA_VERSION,
+        "params": {
+            "assets": args.assets,
+            "hours": args.hours,
+            "seed": args.seed,
+            "rows": rows,
+            "repeat": args.repeat,
+            "estimator": result.estimator,
+        },
+        "environment": _environment(),
+        "stages": stages,
+    }
+
+
+def _print_report(report: dict[str, Any], baseline: Optional[dict[str, Any]]) -> None:
+    params = report["params"]
+    print(f"assets={params['assets']} hours={params['hours']} rows={params['rows']} estimator={params['estimator']}")
+    previous = {s["name"]: s for s in (baseline or {}).get("stages", [])}
+    header = f"{'stage':<26} {'best ms':>10} {'median ms':>10} {'rows/s':>12}"
+    print(header + (f" {'vs base':>8}" if baseline else ""))
+    for s in report["stages"]:
+        rate = f"{s['rows_per_sec']:>12,.0f}" if s["rows_per_sec"] else f"{'':>12}"
+        line = f"{s['name']:<26} {s['best_s'] * 1000:>10.2f} {s['median_s'] * 1000:>10.2f} {rate}"
+        base = previous.get(s["name"])
+        if base and base["best_s"] > 0:
+            # > 1.0 means slower than the baseline.
+            line += f" {s['best_s'] / base['best_s']:>7.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--hours", type=int, default=168)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--estimator", default=None, help="training backend (defaults to TRAIN_ESTIMATOR)")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file")
+    parser.add_argument("--compare", default=None, help="JSON report of an earlier run to compare against")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    with tempfile.TemporaryDirectory(prefix="bench-pipeline-") as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        report = run(args)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    _print_report(report, baseline)
+
+
+if __name__ == "__main__":
+    main()
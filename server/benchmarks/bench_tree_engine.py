@@ -0,0 +1,83 @@
+"""
+Latency of forest inference: sklearn `predict_proba` vs the compiled flat-array engine.
+
+Run from the `server` directory:
+
+    python -m benchmarks.bench_tree_engine
+    python -m benchmarks.bench_tree_engine --trees 200 --sizes 1,10,100,1000 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from time import perf_counter
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from app.core.services.tree_engine import compile_forest
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        fn()
+        best = min(best, perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--train-rows", type=int, default=20_000)
+    parser.add_argument("--sizes", default="1,10,100,1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X_train = rng.normal(size=(args.train_rows, args.features))
+    y_train = (X_train[:, 0] + 0.5 * X_train[:, 1] + rng.normal(scale=0.5, size=args.train_rows) > 0).astype(int)
+    # Same estimator settings as train_model_service.
+    model = RandomForestClassifier(n_estimators=args.trees, random_state=42, n_jobs=-1).fit(X_train, y_train)
+
+    started = perf_counter()
+    compiled = compile_forest(model)
+    compile_seconds = perf_counter() - started
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        X = rng.normal(size=(size, args.features))
+        repeat = args.repeat if size <= 10_000 else 1
+        sklearn_s = _time(lambda: model.predict_proba(X), repeat)
+        compiled_s = _time(lambda: compiled.predict_proba(X), repeat)
+        max_abs_diff = float(np.max(np.abs(model.predict_proba(X) - compiled.predict_proba(X))))
+        results.append(
+            {
+                "batch_size": size,
+                "sklearn_ms": sklearn_s * 1000,
+                "compiled_ms": compiled_s * 1000,
+                "speedup": sklearn_s / compiled_s if compiled_s > 0 else float("inf"),
+                "max_abs_diff": max_abs_diff,
+            }
+        )
+
+    if args.json:
+        print(json.dumps({"compile_seconds": compile_seconds, "nbytes": compiled.nbytes, "results": results}, indent=2))
+        return
+
+    print(f"trees={args.trees} features={args.features} compile={compile_seconds * 1000:.1f}ms size={compiled.nbytes / 1e6:.1f}MB")
+    print(f"{'batch':>8} {'sklearn ms':>12} {'compiled ms':>12} {'speedup':>8} {'max diff':>10}")
+    for r in results:
+        print(
+            f"{r['batch_size']:>8} {r['sklearn_ms']:>12.3f} {r['compiled_ms']:>12.3f} "
+            f"{r['speedup']:>8.1f} {r['max_abs_diff']:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
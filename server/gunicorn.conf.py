@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for serving the API with several uvicorn workers:
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+The app is imported once in the master and models listed in PRELOAD_MODEL_IDS are loaded there
+before workers are forked, so workers start warm. Forest artifacts are memory-mapped (MODEL_MMAP),
+so their arrays live once in the OS page cache no matter how many workers use them.
+"""
+
+import os
+
+from app.core.config import get_settings
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    from app.core.db.dp import engine
+    from app.core.services.predict_service import preload_models
+
+    model_ids = [m.strip() for m in get_settings().PRELOAD_MODEL_IDS.split(",") if m.strip()]
+    if model_ids:
+        loaded = preload_models(model_ids)
+        server.log.info("Preloaded %d model(s) before forking workers: %s", len(loaded), ", ".join(loaded))
+    # Connections must not be shared across the fork; workers open their own.
+    engine.dispose()
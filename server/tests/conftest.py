@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Point the app at a throwaway database before anything imports app.core.config.
+_TMP_DIR = Path(tempfile.mkdtemp(prefix="maintenance-predictor-tests-"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP_DIR / 'test.db'}")
+os.environ.setdefault("UPLOAD_CACHE_DIR", str(_TMP_DIR / "upload-cache"))
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
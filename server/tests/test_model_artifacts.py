@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.services.model_artifacts import MappedForestModel, default_artifact_path, forest_sidecar_path
+from app.core.services.model_cache import get_model_cache
+from app.main import app
+
+SAMPLE_CSV = Path(__file__).resolve().parents[2] / "sample_maintenance_data.csv"
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def _upload():
+    return {"file": ("data.csv", SAMPLE_CSV.read_bytes(), "text/csv")}
+
+
+def test_default_config_predict_serves_mapped_forest_without_loading_estimator(client):
+    settings = get_settings()
+    assert settings.MODEL_MMAP and settings.INFERENCE_ENGINE == "sklearn"
+
+    response = client.post("/api/v1/train", files=_upload())
+    assert response.status_code == 200, response.text
+    model_id = response.json()["model_id"]
+    model_path = default_artifact_path(model_id)
+    try:
+        response = client.post("/api/v1/predict", data={"model_id": model_id}, files=_upload())
+        assert response.status_code == 200, response.text
+
+        model = get_model_cache().get(model_id)
+        assert isinstance(model, MappedForestModel)
+        assert model._estimator is None
+    finally:
+        get_model_cache().invalidate(model_id)
+        model_path.unlink(missing_ok=True)
+        shutil.rmtree(forest_sidecar_path(model_path), ignore_errors=True)